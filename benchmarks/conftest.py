@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fixtures for the benchmarks. All benchmarks run against the
+SimulatedDetectorApi so no hardware or shared memory is needed.
+"""
+import pytest
+
+from sls_detector import Eiger
+from sls_detector.sim import SimulatedDetectorApi
+
+module_counts = [1, 8, 32, 128]
+
+
+def pytest_addoption(parser):
+    parser.addoption('--api-latency', type=float, default=0,
+                     help='Simulated time in seconds for each DetectorApi call')
+
+
+@pytest.fixture
+def latency(request):
+    return request.config.getoption('--api-latency')
+
+
+@pytest.fixture(params=module_counts, ids=['{}mod'.format(n) for n in module_counts])
+def n_modules(request):
+    return request.param
+
+
+@pytest.fixture
+def eiger(n_modules, latency):
+    return Eiger(api=SimulatedDetectorApi(n_modules=n_modules, latency=latency))
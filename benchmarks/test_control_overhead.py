@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cost of common control operations in the Python layer for 1 to 128
+modules. The detector fixtures come from conftest.py
+"""
+import pytest
+
+from sls_detector import Eiger
+from sls_detector.decorators import error_handling
+from sls_detector.sim import SimulatedDetectorApi
+
+
+def test_dacs_get_asarray(benchmark, eiger):
+    benchmark(eiger.dacs.get_asarray)
+
+def test_dacs_repr(benchmark, eiger):
+    benchmark(repr, eiger.dacs)
+
+def test_detector_property_read(benchmark, eiger):
+    benchmark(eiger.active.__getitem__, slice(None))
+
+def test_detector_property_write(benchmark, eiger):
+    benchmark(eiger.active.__setitem__, slice(None), True)
+
+def test_temp_repr(benchmark, eiger):
+    benchmark(repr, eiger.temp)
+
+def test_set_rx_udpport(benchmark, eiger):
+    ports = list(range(50000, 50000 + 2 * eiger.n_modules))
+
+    def set_ports():
+        eiger.rx_udpport = ports
+    benchmark(set_ports)
+
+
+def test_setup500k(benchmark, latency):
+    d = Eiger(api=SimulatedDetectorApi(latency=latency))
+    benchmark(d.setup500k, ['beb083', 'beb098'])
+
+
+class _Bare:
+    """Minimal object with an api to measure the decorator alone"""
+    def __init__(self, latency):
+        self._api = SimulatedDetectorApi(n_modules=1, latency=latency)
+        self._batch = None
+
+    @property
+    def error_mask(self):
+        return self._api.getErrorMask()
+
+    @property
+    def error_message(self):
+        return self._api.getErrorMessage()
+
+    def plain(self):
+        return self._api.getExposureTime()
+
+    @error_handling
+    def decorated(self):
+        return self._api.getExposureTime()
+
+
+@pytest.mark.parametrize('name', ['plain', 'decorated'])
+def test_error_handling_overhead(benchmark, latency, name):
+    benchmark(getattr(_Bare(latency), name))
+
+
+@pytest.mark.parametrize('attribute', [False, True], ids=['trace', 'trace_attribute'])
+def test_trace_overhead(benchmark, latency, attribute):
+    d = Eiger(api=SimulatedDetectorApi(latency=latency))
+    d.start_trace(attribute=attribute)
+
+    def read():
+        return d.exposure_time
+    benchmark(read)
@@ -144,6 +144,7 @@ setup(
     packages=find_packages(exclude=['contrib', 'docs', 'tests']),
     ext_modules=ext_modules,
     install_requires=['pybind11>=2.2'],
+    entry_points={'console_scripts': ['sls-detector = sls_detector.cli:main']},
     cmdclass={'build_ext': BuildExt},
     zip_safe=False,
 )
@@ -6,8 +6,8 @@ Created on Tue May 22 14:13:48 2018
 @author: l_frojdh
 """
 import os
-from sls_detector_tools.io import write_trimbit_file
-from sls_detector_tools import mask
+import numpy as np
+from sls_detector.io.trimbits import write_trimbit_file
 
 energy = [5000, 6000, 7000]
 vrf =     [500, 1000, 1500]
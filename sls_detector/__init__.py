@@ -1,5 +1,29 @@
+import sys
+
 from .detector import Detector, DetectorError, free_shared_memory
-from .eiger import Eiger
-from .jungfrau import Jungfrau
-from .jungfrau_ctb import JungfrauCTB
 from _sls_detector import DetectorApi
+
+#The detector classes are imported on first use so that scripts that only
+#need Detector skip them, module level __getattr__ requires Python 3.7
+_lazy = {'Eiger': '.eiger',
+         'Jungfrau': '.jungfrau',
+         'JungfrauCTB': '.jungfrau_ctb'}
+
+__all__ = ['Detector', 'DetectorError', 'free_shared_memory', 'DetectorApi',
+           'Eiger', 'Jungfrau', 'JungfrauCTB']
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        if name in _lazy:
+            import importlib
+            value = getattr(importlib.import_module(_lazy[name], __name__), name)
+            globals()[name] = value
+            return value
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+    def __dir__():
+        return sorted(list(globals()) + list(_lazy))
+else:
+    from .eiger import Eiger
+    from .jungfrau import Jungfrau
+    from .jungfrau_ctb import JungfrauCTB
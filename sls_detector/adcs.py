@@ -1,4 +1,9 @@
+from collections import Iterable
 from functools import partial
+
+from .decorators import property_error_handling
+
+
 class Adc:
     def __init__(self, name, detector):
         self.name = name
@@ -21,20 +26,47 @@ class Adc:
 
     def __repr__(self):
         """String representation for a single adc in all modules"""
-        degree_sign = u'\N{DEGREE SIGN}'
-        r_str = ['{:14s}: '.format(self.name)]
-        r_str += ['{:6.2f}{:s}C, '.format(self.get(i)/1000, degree_sign) for i in range(self.get_nmod())]
-        return ''.join(r_str).strip(', ')
+        return _format_adc(self.name, self[:])
+
 
+def _format_adc(name, values):
+    degree_sign = u'\N{DEGREE SIGN}'
+    r_str = ['{:14s}: '.format(name)]
+    r_str += ['{:6.2f}{:s}C, '.format(v, degree_sign) for v in values]
+    return ''.join(r_str).strip(', ')
 
 
 class DetectorAdcs:
     """
     Interface to the ADCs on the readout board
     """
+    def __init__(self, detector):
+        self._detector = detector
+
     def __iter__(self):
         for attr, value in self.__dict__.items():
-            yield value
+            if not attr.startswith('_'):
+                yield value
+
+    @property_error_handling
+    def as_array(self):
+        """
+        Read all adcs into a numpy array in \N{DEGREE SIGN}C with dimensions
+        [nadcs, nmodules]. All adcs are read in a single call to the
+        detector API.
+
+        Examples
+        ---------
+
+        ::
+
+            a = detector.temp.as_array()
+            a.max(axis = 1)
+            >> array([48.1, 49.2, 44.5, 38.9, 40.4, 40.9, 47.3, 46.8])
+
+        """
+        return self._detector._api.getAdcs([adc.name for adc in self])
 
     def __repr__(self):
-        return '\n'.join([str(t) for t in self])
\ No newline at end of file
+        values = self.as_array()
+        return '\n'.join(_format_adc(adc.name, v) for adc, v in zip(self, values))
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Opt-in cache for detector properties that rarely change, such as the
+hostname or firmware version. Used together with the cached and
+invalidates_cache decorators.
+"""
+import time
+
+
+class PropertyCache:
+    """
+    Holds cached property values for a Detector. Disabled by default.
+
+    Each property has a time to live in seconds, :py:obj:`None` means the
+    value is kept until it is invalidated by a setter, load_config or
+    free_shared_memory.
+
+    Examples
+    ---------
+
+    ::
+
+        d.cache.enabled = True
+        d.cache.ttl['hostname'] = 5
+
+        d.hostname
+        d.hostname
+
+        d.cache
+        >> PropertyCache(enabled=True, hits=1, misses=1)
+
+    """
+    def __init__(self, ttl=None):
+        self.enabled = False
+        self.ttl = dict(ttl) if ttl is not None else {}
+        self.hits = 0
+        self.misses = 0
+        self._values = {}
+
+    def __repr__(self):
+        return 'PropertyCache(enabled={}, hits={}, misses={})'.format(self.enabled,
+                                                                     self.hits,
+                                                                     self.misses)
+
+    def lookup(self, name):
+        """Return (True, value) on a valid hit otherwise (False, None)"""
+        try:
+            value, t = self._values[name]
+        except KeyError:
+            self.misses += 1
+            return False, None
+
+        ttl = self.ttl.get(name)
+        if ttl is not None and time.monotonic() - t > ttl:
+            del self._values[name]
+            self.misses += 1
+            return False, None
+
+        self.hits += 1
+        if isinstance(value, list):
+            return True, list(value)
+        return True, value
+
+    def store(self, name, value):
+        """Store a value read from the detector"""
+        if isinstance(value, list):
+            value = list(value)
+        self._values[name] = (value, time.monotonic())
+
+    def invalidate(self, *names):
+        """Drop the cached values of names, or everything if no names given"""
+        if not names:
+            self._values.clear()
+        for name in names:
+            self._values.pop(name, None)
+
+    def reset_stats(self):
+        """Reset the hit and miss counters"""
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Command line tool for reading and setting single values from shell scripts.
+
+::
+
+    sls-detector get exposure_time
+    sls-detector set exposure_time 0.5
+    sls-detector get dacs.vrf temp.fpga
+    sls-detector dacs
+    sls-detector status
+
+Each call normally attaches to the shared memory and builds a new Detector.
+To avoid this start a daemon that keeps one Detector open and serves the
+commands over a Unix socket. While the daemon is running the commands are
+sent to it, requests from several clients are executed one at a time.
+
+::
+
+    sls-detector daemon &
+    sls-detector get status
+
+The socket is $XDG_RUNTIME_DIR/sls_detector_<id>.sock, or in the directory
+/tmp/sls_detector_<uid> that only the user can access if XDG_RUNTIME_DIR is
+not set, unless given with --socket or the SLS_DETECTOR_SOCKET environment
+variable. Commands are only sent to a socket owned by the user.
+"""
+import argparse
+import ast
+import json
+import os
+import socket
+import socketserver
+import stat
+import struct
+import sys
+import tempfile
+import threading
+
+from .detector_property import DetectorProperty
+
+#Maximum size of a request, they only hold a few names and values
+_max_request = 1 << 16
+
+
+def _private_dir():
+    """
+    Directory for the sockets of the user, XDG_RUNTIME_DIR or a directory
+    in the temp dir created with mode 0700
+
+    Raises
+    -------
+    PermissionError
+        If the directory exists but is not owned by the user or can be
+        accessed by others
+
+    """
+    path = os.environ.get('XDG_RUNTIME_DIR')
+    if path and os.path.isdir(path):
+        return path
+    path = os.path.join(tempfile.gettempdir(), 'sls_detector_{}'.format(os.getuid()))
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise PermissionError('{} should be a directory only accessible by the user'.format(path))
+    return path
+
+
+def socket_path(multi_id=0):
+    """Default path of the daemon socket for multi_id"""
+    path = os.environ.get('SLS_DETECTOR_SOCKET')
+    if path:
+        return path
+    return os.path.join(_private_dir(), 'sls_detector_{}.sock'.format(multi_id))
+
+
+def _check_owner(path, s=None):
+    """
+    Raise PermissionError unless the socket file, and if the connected
+    socket s is given the process listening on it, belong to the user
+    """
+    uid = os.getuid()
+    if os.stat(path).st_uid != uid:
+        raise PermissionError('{} is not owned by the user'.format(path))
+    if s is not None and hasattr(socket, 'SO_PEERCRED'):
+        cred = s.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+        _, peer_uid, _ = struct.unpack('3i', cred)
+        if peer_uid != uid:
+            raise PermissionError('The daemon on {} runs as another user'.format(path))
+
+
+def open_detector(multi_id=0):
+    """
+    Create the detector class matching the type of the detector in shared
+    memory, Eiger, Jungfrau, JungfrauCTB or Detector if it is unknown or mixed
+    """
+    from . import Detector, Eiger, Jungfrau, JungfrauCTB
+    classes = {'Eiger': Eiger, 'Jungfrau': Jungfrau, 'JungfrauCTB': JungfrauCTB}
+    d = Detector(multi_id)
+    try:
+        cls = classes.get(d.detector_type, Detector)
+    except Exception:
+        cls = Detector
+    if cls is Detector:
+        return d
+    return cls(multi_id, api=d._api)
+
+
+def _parse(value):
+    """Python literal if possible otherwise the string itself"""
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return value
+
+
+def _resolve(d, name):
+    """Return (object, attribute) for a dotted name such as dacs.vrf"""
+    parts = name.split('.')
+    if any(not p or p.startswith('_') for p in parts):
+        raise ValueError('Invalid property: {}'.format(name))
+    obj = d
+    for p in parts[:-1]:
+        obj = getattr(obj, p)
+    return obj, parts[-1]
+
+
+def _get(d, name):
+    obj, attr = _resolve(d, name)
+    value = getattr(obj, attr)
+    if callable(value) and not hasattr(value, '__getitem__'):
+        raise ValueError('{} is a function not a property'.format(name))
+    return value
+
+
+def _set(d, name, value):
+    """
+    Set a property with a setter or all modules of a DetectorProperty such
+    as dacs.vrf, anything else, for example a method, is refused
+    """
+    obj, attr = _resolve(d, name)
+    descriptor = getattr(type(obj), attr, None)
+    if isinstance(descriptor, property):
+        if descriptor.fset is None:
+            raise ValueError('{} is read only'.format(name))
+        setattr(obj, attr, value)
+        return
+    if descriptor is None and hasattr(obj, attr):
+        prop = getattr(obj, attr)
+        if isinstance(prop, DetectorProperty):
+            prop[:] = value
+            return
+    raise ValueError('Unknown property: {}'.format(name))
+
+
+def execute(d, command, args):
+    """
+    Run a command on the detector d and return the output as a string.
+    Used both when running directly and by the daemon.
+
+    Parameters
+    -----------
+    d:
+        Detector, Eiger etc.
+    command: str
+        'get', 'set', 'dacs' or 'status'
+    args: list
+        Property names for get, property name and value for set
+
+    """
+    if command == 'get':
+        if not args:
+            raise ValueError('get needs at least one property')
+        if len(args) == 1:
+            return str(_get(d, args[0]))
+        return '\n'.join('{}: {}'.format(name, _get(d, name)) for name in args)
+
+    elif command == 'set':
+        if len(args) < 2:
+            raise ValueError('set needs a property and a value')
+        values = [_parse(v) for v in args[1:]]
+        _set(d, args[0], values[0] if len(values) == 1 else values)
+        return ''
+
+    elif command == 'dacs':
+        if not hasattr(d, 'dacs'):
+            raise ValueError('{} has no dacs'.format(type(d).__name__))
+        return repr(d.dacs)
+
+    elif command == 'status':
+        return str(d.status)
+
+    raise ValueError('Unknown command: {}'.format(command))
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline(_max_request)
+        if not line:
+            #connection check from another daemon
+            return
+        try:
+            request = json.loads(line.decode())
+            #one command at the time, the detector is not thread safe
+            with self.server.lock:
+                reply = {'output': execute(self.server.detector,
+                                           request['command'], request['args'])}
+        except Exception as e:
+            reply = {'error': str(e)}
+        self.wfile.write(json.dumps(reply).encode() + b'\n')
+
+
+class DetectorServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Unix socket server that runs the commands of the clients on one
+    Detector. Each client is handled in a thread but the commands are
+    serialized with a lock.
+
+    Parameters
+    -----------
+    path: str
+        Socket file, an existing socket that nobody listens on is removed
+    detector:
+        Detector, Eiger etc. to run the commands on
+
+    """
+    daemon_threads = True
+
+    def __init__(self, path, detector):
+        if os.path.exists(path):
+            if _daemon_running(path):
+                raise RuntimeError('A daemon is already listening on {}'.format(path))
+            os.unlink(path)
+        self.detector = detector
+        self.lock = threading.Lock()
+
+        #only the user can connect
+        umask = os.umask(0o177)
+        try:
+            super().__init__(path, _Handler)
+        finally:
+            os.umask(umask)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+
+def _daemon_running(path):
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.connect(path)
+        return True
+    except OSError:
+        return False
+
+
+def send(path, command, args, timeout=None):
+    """
+    Send a command to the daemon listening on path and return the output
+
+    Raises
+    -------
+    OSError
+        If no daemon is listening on path
+    PermissionError
+        If the socket or the daemon belongs to another user
+    RuntimeError
+        If the command failed in the daemon
+
+    """
+    _check_owner(path)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.settimeout(timeout)
+        s.connect(path)
+        _check_owner(path, s)
+        s.sendall(json.dumps({'command': command, 'args': args}).encode() + b'\n')
+        with s.makefile('rb') as f:
+            reply = json.loads(f.readline().decode())
+    if 'error' in reply:
+        raise RuntimeError(reply['error'])
+    return reply['output']
+
+
+def _parser():
+    parser = argparse.ArgumentParser(prog='sls-detector',
+                                     description='Get and set detector properties')
+    parser.add_argument('--id', type=int, default=0, help='multi detector id')
+    parser.add_argument('--socket', help='daemon socket, default sls_detector_<id>.sock in '
+                        '$XDG_RUNTIME_DIR or /tmp/sls_detector_<uid>')
+    parser.add_argument('--no-daemon', action='store_true',
+                        help='always open the detector in this process')
+    parser.add_argument('--timeout', type=float, default=60,
+                        help='seconds to wait for the daemon')
+    sub = parser.add_subparsers(dest='command')
+    p = sub.add_parser('get', help='print the value of one or more properties')
+    p.add_argument('args', nargs='+', metavar='property')
+    p = sub.add_parser('set', help='set a property, values are Python literals')
+    p.add_argument('args', nargs='+', metavar='property value')
+    sub.add_parser('dacs', help='print all dacs')
+    sub.add_parser('status', help='print the run status')
+    sub.add_parser('daemon', help='serve commands over the socket until killed')
+    return parser
+
+
+def main(argv=None):
+    parser = _parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_usage()
+        return 2
+    try:
+        path = args.socket or socket_path(args.id)
+    except OSError as e:
+        print('sls-detector: {}'.format(e), file=sys.stderr)
+        return 1
+    command_args = getattr(args, 'args', [])
+
+    if args.command == 'daemon':
+        server = DetectorServer(path, open_detector(args.id))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return 0
+
+    try:
+        if not args.no_daemon and os.path.exists(path):
+            try:
+                output = send(path, args.command, command_args, args.timeout)
+            except (ConnectionRefusedError, FileNotFoundError):
+                #stale socket from a daemon that was killed
+                output = execute(open_detector(args.id), args.command, command_args)
+        else:
+            output = execute(open_detector(args.id), args.command, command_args)
+    except Exception as e:
+        print('sls-detector: {}'.format(e), file=sys.stderr)
+        return 1
+
+    if output:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Offline corrections of frames read from file or from the stream.
+
+::
+
+    from sls_detector.corrections import rate_correct
+
+    #same tau as used by the detector, one per module
+    tau = d.rate_correction
+    corrected = rate_correct(frames, tau, d.exposure_time,
+                             geometry = d.module_geometry)
+"""
+import functools
+
+import numpy as np
+
+from .utils import stream_regions
+
+#Number of elements processed at a time, keeps the temporaries in cache
+_chunk_size = 1 << 16
+
+#Maximum of m*tau in the paralyzable model
+_x_max = np.exp(-1)
+
+
+@functools.lru_cache()
+def _paralyzable_table(n=4096):
+    """
+    Lookup table for the inverse of the paralyzable model m = n*exp(-n*tau).
+    With x = m*tau and y = n*tau, x = y*exp(-y) for 0 <= y <= 1 and the
+    correction factor n/m is exp(y). The table is uniform in
+    s = sqrt(1/e - x), which removes the square root behaviour of y(x) at
+    the maximum so that linear interpolation is accurate everywhere.
+
+    Returns the step in s and the value and slope of the factor at each
+    point, with one extra point so that index n is valid.
+    """
+    #dense solution of x = y*exp(-y), denser towards y = 1
+    y = 1 - (1 - np.linspace(0, 1, 1 << 18))**2
+    s_y = np.sqrt(np.maximum(_x_max - y * np.exp(-y), 0))
+    step = np.sqrt(_x_max) / n
+    s = np.arange(n + 2) * step
+    factor = np.interp(s, s_y[::-1], np.exp(y)[::-1])
+    return step, factor[:-1], np.diff(factor)
+
+
+def _expand_tau(tau, frame_shape, geometry):
+    """tau in ns as a scalar or an array broadcastable to one frame"""
+    tau = np.asarray(tau, dtype=np.float64)
+    if tau.ndim == 0 or tau.shape == frame_shape:
+        return tau
+    if tau.ndim != 1:
+        raise ValueError('tau should be a scalar, one value per module or one per pixel')
+    if len(tau) == 1:
+        return tau[0]
+    if geometry is None:
+        raise ValueError('geometry is needed to apply one tau per module')
+    regions = stream_regions(frame_shape, geometry, geometry[0] * geometry[1])
+    if len(regions) != len(tau):
+        raise ValueError('Got {} tau for {} modules'.format(len(tau), len(regions)))
+    tau_map = np.empty(frame_shape)
+    for region, t in zip(regions, tau):
+        tau_map[region] = t
+    return tau_map
+
+
+def rate_correct(frames, tau, exposure_time, model='paralyzable', geometry=None,
+                 out=None, chunk_size=_chunk_size):
+    """
+    Correct measured counts for pile-up. The frames are processed in chunks
+    of chunk_size pixels so that large stacks can be corrected in place
+    without large temporary arrays.
+
+    For the paralyzable model, the default and what is used by Eiger, the
+    measured rate is m = n*exp(-n*tau), inverted with a lookup table.
+    Measured rates above the maximum of 1/(e*tau) are set to the
+    corrected value at the maximum. For the non-paralyzable model,
+    m = n/(1+n*tau), pixels with m*tau >= 1 are set to inf.
+
+    Parameters
+    -----------
+    frames: numpy.ndarray
+        Counts as [rows, cols] or [frame, rows, cols]
+    tau:
+        Dead time in ns, scalar, one value per module as in
+        Detector.rate_correction, or an array with the shape of a frame.
+        A tau of 0 leaves the pixels unchanged.
+    exposure_time: float
+        Exposure time of a frame in s
+    model: str
+        'paralyzable' or 'non-paralyzable'
+    geometry:
+        (horizontal, vertical) number of modules, Detector.module_geometry,
+        needed if tau is given per module
+    out: numpy.ndarray
+        Float array to write to, can be frames to correct in place. By
+        default a new float64 array is returned
+    chunk_size: int
+        Number of pixels per chunk
+
+    Returns
+    --------
+    numpy.ndarray
+        Corrected counts
+
+    """
+    if model not in ('paralyzable', 'non-paralyzable'):
+        raise ValueError("model should be 'paralyzable' or 'non-paralyzable'")
+    frames = np.asarray(frames)
+    if frames.ndim < 2:
+        raise ValueError('frames should be [rows, cols] or [frame, rows, cols]')
+    if out is None:
+        out = np.empty(frames.shape)
+    elif out.shape != frames.shape or out.dtype.kind != 'f' or not out.flags.c_contiguous:
+        raise ValueError('out should be a contiguous float array with the shape of frames')
+
+    frame_shape = frames.shape[-2:]
+    tau = _expand_tau(tau, frame_shape, geometry)
+
+    # measured rate times tau per count
+    scale = tau * 1e-9 / exposure_time
+    if model == 'paralyzable':
+        step, values, slopes = _paralyzable_table()
+        n = len(values) - 1
+        index = np.empty(chunk_size, dtype=np.intp)
+        factor = np.empty(chunk_size)
+    x = np.empty(chunk_size)
+
+    for m, c, k in _chunks(frames, out, scale, chunk_size):
+        xc = x[:len(m)]
+        np.multiply(m, k, out=xc)
+        if model == 'paralyzable':
+            #position in the table from s = sqrt(1/e - x)
+            np.subtract(_x_max, xc, out=xc)
+            np.maximum(xc, 0, out=xc)
+            np.sqrt(xc, out=xc)
+            np.multiply(xc, 1 / step, out=xc)
+            np.minimum(xc, n, out=xc)
+            i = index[:len(m)]
+            np.copyto(i, xc, casting='unsafe')
+            np.subtract(xc, i, out=xc)
+            f = factor[:len(m)]
+            np.take(slopes, i, out=f, mode='clip')
+            np.multiply(f, xc, out=f)
+            np.take(values, i, out=xc, mode='clip')
+            np.add(f, xc, out=f)
+        else:
+            f = xc
+            with np.errstate(divide='ignore'):
+                np.subtract(1, xc, out=f)
+                np.divide(1, f, out=f)
+            f[f < 0] = np.inf
+        np.multiply(m, f, out=c)
+    return out
+
+
+def _chunks(frames, out, scale, chunk_size):
+    """
+    Yield matching flat chunks of frames, out and scale of at most
+    chunk_size elements
+    """
+    src = frames.reshape(-1)
+    dst = out.reshape(-1)
+    if scale.ndim == 0:
+        for i in range(0, src.size, chunk_size):
+            yield src[i:i+chunk_size], dst[i:i+chunk_size], scale
+        return
+
+    scale = scale.reshape(-1)
+    n_pixels = scale.size
+    for offset in range(0, src.size, n_pixels):
+        for i in range(0, n_pixels, chunk_size):
+            j = min(i + chunk_size, n_pixels)
+            yield src[offset+i:offset+j], dst[offset+i:offset+j], scale[i:j]
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Decoding of the raw data from the chip test board. A frame consists of
+JungfrauCTB.samples samples, each with one 16 bit value per enabled ADC and
+optionally a 64 bit word with the digital bits. The analog data is returned
+as a view of the buffer without copying, the digital bits are unpacked to one
+byte per bit.
+
+::
+
+    from sls_detector.ctb_decoder import CTBDecoder
+
+    decoder = CTBDecoder(d.samples, adc_mask = 0x0000ffff)
+    data = decoder.decode(buffer)
+
+    #[samples, adc] for the enabled adcs, see decoder.adcs
+    data.analog.shape
+    >> (1000, 16)
+
+    #[samples, bit] as 0 or 1
+    data.digital.shape
+    >> (1000, 64)
+"""
+from collections import namedtuple
+
+import numpy as np
+
+CTBData = namedtuple('CTBData', ['analog', 'digital', 'words'])
+
+#Number of ADCs and digital bits of the chip test board
+n_adcs = 32
+n_bits = 64
+
+
+class CTBDecoder:
+    """
+    Decoder for frames of a fixed layout. Build once for a configuration
+    and reuse for every frame.
+
+    Parameters
+    -----------
+    samples: int
+        Number of samples per frame, JungfrauCTB.samples
+    adc_mask: int
+        Bit mask of the enabled ADCs, only these are in the data
+    digital: bool
+        True if each sample has a 64 bit word with the digital bits
+    layout: str
+        'sample' if the digital word follows the ADC values of each sample,
+        'block' if all ADC values of the frame come before all digital words
+    bits:
+        Digital bits to unpack, by default all 64
+
+    Attributes
+    -----------
+    adcs: list
+        ADC number of each column in the analog data
+    frame_size: int
+        Size of one frame in bytes
+
+    """
+    def __init__(self, samples, adc_mask=0xffffffff, digital=True, layout='sample', bits=None):
+        if layout not in ('sample', 'block'):
+            raise ValueError("layout should be 'sample' or 'block'")
+        if not 0 <= adc_mask < 1 << n_adcs:
+            raise ValueError('adc_mask should be a {} bit mask'.format(n_adcs))
+        self.samples = samples
+        self.adc_mask = adc_mask
+        self.digital = digital
+        self.layout = layout
+        self.adcs = [i for i in range(n_adcs) if adc_mask & (1 << i)]
+        self.bits = None if bits is None else np.asarray(bits, dtype=np.intp)
+        if self.bits is not None and ((self.bits < 0) | (self.bits >= n_bits)).any():
+            raise ValueError('bits should be between 0 and {}'.format(n_bits - 1))
+
+        self._analog_size = 2 * len(self.adcs)
+        self._digital_size = n_bits // 8 if digital else 0
+        self.frame_size = samples * (self._analog_size + self._digital_size)
+        self._columns = {adc: i for i, adc in enumerate(self.adcs)}
+
+    def __repr__(self):
+        return 'CTBDecoder({} samples, adc_mask={:#010x}, digital={})'.format(
+            self.samples, self.adc_mask, self.digital)
+
+    def column(self, adc):
+        """Column of ADC number adc in the analog data"""
+        try:
+            return self._columns[adc]
+        except KeyError:
+            raise ValueError('ADC {} is not enabled in the mask {:#010x}'.format(
+                adc, self.adc_mask)) from None
+
+    def decode(self, buffer):
+        """
+        Decode one frame
+
+        Parameters
+        -----------
+        buffer:
+            bytes, bytearray, memoryview or numpy array with the raw frame
+
+        Returns
+        --------
+        CTBData
+            analog as [samples, adc] uint16, digital as [samples, bit] uint8
+            and words as [samples] uint64. analog and words are views of
+            buffer. digital and words are None without digital data.
+
+        """
+        n = _nbytes(buffer)
+        if n != self.frame_size:
+            raise ValueError('Expected a frame of {} bytes got {}'.format(self.frame_size, n))
+        analog, digital, words = self.decode_frames(buffer)
+        return CTBData(analog[0],
+                       None if digital is None else digital[0],
+                       None if words is None else words[0])
+
+    def decode_frames(self, buffer):
+        """
+        Decode a buffer with any number of consecutive frames, the arrays in
+        the result have an additional first axis for the frame.
+        """
+        n = _nbytes(buffer)
+        if n % self.frame_size != 0:
+            raise ValueError('Buffer of {} bytes is not a multiple of the frame size {}'.format(
+                n, self.frame_size))
+        n_frames = n // self.frame_size
+        raw = np.frombuffer(buffer, dtype=np.uint8)
+
+        #strided views of the buffer, frame_size apart for each frame
+        if self.layout == 'sample':
+            sample_stride = self._analog_size + self._digital_size
+            words_offset = self._analog_size
+        else:
+            sample_stride = self._analog_size
+            words_offset = self.samples * self._analog_size
+        analog = np.ndarray((n_frames, self.samples, len(self.adcs)), dtype='<u2', buffer=raw,
+                            strides=(self.frame_size, sample_stride, 2))
+        if not self.digital:
+            return CTBData(analog, None, None)
+        if self.layout == 'block':
+            sample_stride = self._digital_size
+        words = np.ndarray((n_frames, self.samples), dtype='<u8', buffer=raw,
+                           offset=words_offset, strides=(self.frame_size, sample_stride))
+        return CTBData(analog, self.unpack(words), words)
+
+    def unpack(self, words):
+        """
+        Digital words to one uint8 per bit, bit 0 first, with the selected
+        bits as the last axis
+        """
+        words = np.ascontiguousarray(words, dtype='<u8')
+        digital = np.unpackbits(words.view(np.uint8).reshape(words.shape + (8,)),
+                                axis=-1, bitorder='little')
+        if self.bits is not None:
+            digital = digital[..., self.bits]
+        return digital
+
+
+def _nbytes(buffer):
+    return memoryview(buffer).nbytes
+
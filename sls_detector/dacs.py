@@ -1,4 +1,5 @@
 from .detector_property import DetectorProperty
+from .decorators import property_error_handling
 from functools import partial
 import numpy as np
 
@@ -91,29 +92,66 @@ class DetectorDacs:
         r_str += [repr(dac) for dac in self]
         return '\n'.join(r_str)
 
+    @property_error_handling
     def get_asarray(self):
         """
-        Read the dacs into a numpy array with dimensions [ndacs, nmodules]
+        Read the dacs into a float numpy array with dimensions
+        [ndacs, nmodules]. All dacs are read in a single call to the
+        detector API.
         """
-        dac_array = np.zeros((len(self._dacs), self._detector.n_modules))
-        for i, _d in enumerate(self):
-            dac_array[i,:] = _d[:]
-        return dac_array
+        return self._detector._api.getDacs(self._dacnames).astype(float)
 
-    def set_from_array(self, dac_array):
+    @property_error_handling
+    def set_from_array(self, dac_array, current=None):
         """
         Set the dacs from an numpy array with dac values. [ndacs, nmodules]
+        Only values that differ from the current state of the detector are
+        sent, and all of them in a single call to the detector API.
+
+        Parameters
+        -----------
+        dac_array:
+            :py:obj:`numpy.ndarray` New dac values [ndacs, nmodules]
+
+        current:
+            :py:obj:`numpy.ndarray` Dac values currently on the detector,
+            for example from an earlier call to get_asarray(). If
+            :py:obj:`None` the dacs are read back before setting.
+
+        Examples
+        ---------
+
+        ::
+
+            a = d.dacs.get_asarray()
+            a[2,:] = 3300
+
+            #Only vrf is sent to the detector
+            d.dacs.set_from_array(a)
+
         """
-        dac_array = dac_array.astype(np.int)
-        for i, _d in enumerate(self):
-            _d[:] = dac_array[i]
+        dac_array = np.asarray(dac_array).astype(np.int32)
+        if current is None:
+            current = self.get_asarray()
+
+        changed = dac_array != current
+        rows = changed.any(axis=1)
+        if not rows.any():
+            return
+
+        # -1 leaves the dac untouched on the C++ side
+        values = np.where(changed, dac_array, -1)[rows]
+        names = [n for n, r in zip(self._dacnames, rows) if r]
+        self._detector._api.setDacs(names, values)
 
     def set_default(self):
         """
         Set all dacs to their default values
         """
-        for _d in self:
-            _d[:] = _d.default
+        current = self.get_asarray()
+        default = np.array([_d[3] for _d in self._dacs], dtype=np.int32)
+        self.set_from_array(np.repeat(default[:, np.newaxis], current.shape[1], axis=1),
+                            current)
 
     def update_nmod(self):
         """
@@ -5,6 +5,12 @@ Function decorators for the sls_detector.
 """
 from .errors import DetectorError
 import functools
+import threading
+
+
+def _describe(func, args):
+    """Readable description of a call, used to report errors in a batch"""
+    return '{}({})'.format(func.__name__, ', '.join(repr(a) for a in args))
 
 
 def error_handling(func):
@@ -13,7 +19,12 @@ def error_handling(func):
     """
     @functools.wraps(func)
     def wrapper(self, *args, **kwargs):
-        
+
+        # inside detector.batch() the error mask is checked once at exit
+        if self._batch is not None and self._batch_owner == threading.get_ident():
+            self._batch.append(_describe(func, args))
+            return func(self, *args, **kwargs)
+
         # remove any previous errors
         self._api.clearErrorMask()
         
@@ -38,6 +49,11 @@ def property_error_handling(func):
 
     @functools.wraps(func)
     def wrapper(self, *args, **kwargs):
+        if (self._detector._batch is not None and
+                self._detector._batch_owner == threading.get_ident()):
+            self._detector._batch.append(_describe(func, args))
+            return func(self, *args, **kwargs)
+
         # remove any previous errors
         self._detector._api.clearErrorMask()
 
@@ -52,4 +68,72 @@ def property_error_handling(func):
             raise DetectorError(msg)
         return result
 
-    return wrapper
\ No newline at end of file
+    return wrapper
+
+
+def cached(func):
+    """
+    Serve a property from the detector cache when it is enabled. Should
+    be placed outside error_handling so that a hit skips the error checks.
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(self):
+        cache = self._cache
+        if not cache.enabled:
+            return func(self)
+
+        hit, value = cache.lookup(name)
+        if hit:
+            return value
+
+        value = func(self)
+        cache.store(name, value)
+        return value
+
+    return wrapper
+
+
+def invalidates_cache(*names):
+    """
+    Invalidate cached properties after calling the function, with no
+    names the whole cache is cleared
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                self._cache.invalidate(*names)
+
+        return wrapper
+
+    return decorator
+
+
+class lazy_property:
+    """
+    Attribute computed on first access and then stored on the instance,
+    used for helper objects such as dacs and adcs that are not needed
+    by every script.
+    """
+    def __init__(self, func):
+        self.func = func
+        self.__name__ = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __get__(self, obj, cls):
+        if obj is None:
+            return self
+        value = obj.__dict__[self.__name__] = self.func(obj)
+        return value
+
+    @staticmethod
+    def reset(obj):
+        """Remove the stored values so that they are built again"""
+        for cls in type(obj).__mro__:
+            for name, attr in vars(cls).items():
+                if isinstance(attr, lazy_property):
+                    obj.__dict__.pop(name, None)
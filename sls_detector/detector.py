@@ -6,39 +6,59 @@ Python - sls
 
 """
 import os
+import threading
 from collections import Iterable, namedtuple
+from contextlib import contextmanager
 
 from _sls_detector import DetectorApi
-from .decorators import error_handling
+from .cache import PropertyCache
+from .decorators import error_handling, cached, invalidates_cache, lazy_property
 from .detector_property import DetectorProperty
 from .errors import DetectorError, DetectorValueError
 from .registers import Register
+from .trace import ApiTracer
 from .utils import element_if_equal
 
+AcquisitionProgress = namedtuple('AcquisitionProgress', ['frame_index', 'frames_caught'])
+
 
 class Detector:
     """
     Base class used as interface with the slsDetectorSoftware. To control a specific detector use the
     derived classes such as Eiger and Jungfrau. Functions as an interface to the C++ API and provides a 
     more Pythonic interface
+
+    Pass api to use another implementation of the DetectorApi, for example
+    :py:class:`sls_detector.sim.SimulatedDetectorApi` to run without hardware.
     """
 
     _speed_names = {0: 'Full Speed', 1: 'Half Speed', 2: 'Quarter Speed', 3: 'Super Slow Speed'}
     _speed_int = {'Full Speed': 0, 'Half Speed': 1, 'Quarter Speed': 2, 'Super Slow Speed': 3}
     _settings = []
 
-    def __init__(self, multi_id=0):
-        self._api = DetectorApi(multi_id)
-        self._register = Register(self)
-
-        self._flippeddatax = DetectorProperty(self._api.getFlippedDataX,
-                                              self._api.setFlippedDataX,
-                                              self._api.getNumberOfDetectors,
-                                              'flippeddatax')
-        self._flippeddatay = DetectorProperty(self._api.getFlippedDataY,
-                                              self._api.setFlippedDataY,
-                                              self._api.getNumberOfDetectors,
-                                              'flippeddatay')
+    #Properties that can be cached and their time to live in seconds,
+    #None means until invalidated
+    _cache_ttl = {'detector_type': None,
+                  'firmware_version': None,
+                  'hostname': None,
+                  'image_size': None,
+                  'module_geometry': None,
+                  'n_modules': None,
+                  'server_version': None,
+                  'settings_path': None}
+
+    def __init__(self, multi_id=0, api=None):
+        self._api = DetectorApi(multi_id) if api is None else api
+        self._cache = PropertyCache(self._cache_ttl)
+        self._batch = None
+        #thread that opened the batch, calls from other threads are checked as usual
+        self._batch_owner = None
+        self._batch_lock = threading.RLock()
+        self._acq_future = None
+        self._connect()
+
+    def _connect(self):
+        """Put the detector and receiver online"""
         try:
             self.online = True
             self.receiver_online = True
@@ -46,6 +66,24 @@ class Detector:
             print('WARNING: Cannot connect to detector')
 
 
+    @lazy_property
+    def _register(self):
+        return Register(self)
+
+    @lazy_property
+    def _flippeddatax(self):
+        return DetectorProperty(self._api.getFlippedDataX,
+                                self._api.setFlippedDataX,
+                                self._api.getNumberOfDetectors,
+                                'flippeddatax')
+
+    @lazy_property
+    def _flippeddatay(self):
+        return DetectorProperty(self._api.getFlippedDataY,
+                                self._api.setFlippedDataY,
+                                self._api.getNumberOfDetectors,
+                                'flippeddatay')
+
     def __len__(self):
         return self._api.getNumberOfDetectors()
 
@@ -60,6 +98,164 @@ class Detector:
         """
         self._api.acq()
 
+    def start(self):
+        """
+        Non blocking version of acq(). Runs the acquisition in a background
+        thread, which exits when the measurement is finished, and returns a
+        :py:class:`concurrent.futures.Future` that is done at that point.
+
+        Raises
+        -------
+        RuntimeError
+            If an acquisition started with start() is still running
+
+        Examples
+        ---------
+
+        ::
+
+            f = d.start()
+
+            #do other work
+            while not f.done():
+                print(d.progress)
+                time.sleep(0.5)
+
+            #or block until the acquisition is done
+            d.wait()
+
+        """
+        if self._acq_future is not None and not self._acq_future.done():
+            raise RuntimeError('Acquisition already running')
+        from concurrent.futures import ThreadPoolExecutor
+        executor = ThreadPoolExecutor(max_workers=1)
+        self._acq_future = executor.submit(self._api.acq)
+        #the thread finishes the acquisition and then exits
+        executor.shutdown(wait=False)
+        return self._acq_future
+
+    def wait(self, timeout=None):
+        """
+        Wait for an acquisition launched with start() to finish. Re-raises
+        any exception from the acquisition.
+
+        Parameters
+        -----------
+        timeout:
+            :py:obj:`float` Max time to wait in seconds, None to wait forever
+
+        Raises
+        -------
+        concurrent.futures.TimeoutError
+            If the acquisition did not finish within timeout
+
+        """
+        if self._acq_future is not None:
+            self._acq_future.result(timeout)
+
+    async def acq_async(self, interval=0.1, callback=None):
+        """
+        Coroutine running the programmed measurement without blocking the
+        event loop. While waiting the receiver is polled every interval
+        seconds and callback is called with the current progress. The
+        progress is read in the default executor of the loop.
+
+        Parameters
+        -----------
+        interval:
+            :py:obj:`float` Time between progress updates in seconds
+
+        callback:
+            Function called as callback(progress) with an
+            AcquisitionProgress(frame_index, frames_caught)
+
+        Returns
+        --------
+        AcquisitionProgress
+            Progress read after the acquisition finished
+
+        Examples
+        ---------
+
+        ::
+
+            async def measure(d):
+                await d.acq_async(interval = 0.5, callback = print)
+
+            asyncio.run(measure(d))
+
+        """
+        import asyncio
+        #get_running_loop is new in Python 3.7, before that get_event_loop
+        #returns the running loop inside a coroutine
+        loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)()
+
+        def read_progress():
+            return self.progress
+
+        future = asyncio.wrap_future(self.start(), loop=loop)
+        while not future.done():
+            if callback is not None:
+                #reading the receiver blocks, keep it off the event loop
+                callback(await loop.run_in_executor(None, read_progress))
+            await asyncio.wait({future}, timeout=interval)
+        future.result()
+        return await loop.run_in_executor(None, read_progress)
+
+
+    @contextmanager
+    def batch(self):
+        """
+        Context manager that suspends the per call error checking. Instead
+        the error mask is checked once when leaving the block, saving the
+        extra calls to the slsDetectorSoftware for each property.
+
+        Raises
+        -------
+        DetectorError
+            On exit if any operation in the block registered an error. The
+            message lists the operations issued in the block together with
+            the error message from the slsDetectorSoftware.
+
+        .. note ::
+
+            Only calls made by the thread that opened the batch are
+            batched, calls from other threads are checked as usual. A
+            batch() opened by another thread waits until this one is done.
+
+        Examples
+        ---------
+
+        ::
+
+            with d.batch():
+                d.exposure_time = 0.1
+                d.period = 0.2
+                d.n_frames = 100
+                d.file_name = 'run'
+
+        """
+        with self._batch_lock:
+            if self._batch_owner == threading.get_ident():
+                #already inside a batch, the outer one checks the errors
+                yield
+                return
+
+            self._api.clearErrorMask()
+            self._batch = []
+            self._batch_owner = threading.get_ident()
+            try:
+                yield
+            finally:
+                operations = self._batch
+                self._batch = None
+                self._batch_owner = None
+
+            if self.error_mask != 0:
+                msg = self.error_message
+                self._api.clearErrorMask()
+                raise DetectorError('Error in batch of {} operations: {}\n{}'.format(
+                    len(operations), ', '.join(operations), msg))
 
     @property
     @error_handling
@@ -97,6 +293,33 @@ class Detector:
     def busy(self, value):
         self._api.setAcquiringFlag(value)
 
+    @property
+    def cache(self):
+        """
+        :py:class:`PropertyCache` for slow changing properties like hostname,
+        detector_type, module_geometry etc. Disabled by default, when enabled
+        the values are kept until the corresponding setter, load_config or
+        free_shared_memory is called or the time to live has passed.
+
+        Examples
+        ----------
+
+        ::
+
+            d.cache.enabled = True
+
+            #Refresh the hostname at least every 10s
+            d.cache.ttl['hostname'] = 10
+
+            d.cache.hits
+            >> 157
+
+            #Drop all cached values
+            d.cache.invalidate()
+
+        """
+        return self._cache
+
     def clear_errors(self):
         """Clear the error mask for the detector. Used to reset after checking."""
         self._api.clearErrorMask()
@@ -139,6 +362,7 @@ class Detector:
         return [self._api.getDetectorNumber(i) for i in range(self.n_modules)]
 
     @property
+    @cached
     def detector_type(self):
         """
         Return either a string or list of strings with the detector type.
@@ -338,6 +562,7 @@ class Detector:
         self._api.setFileWrite(fwrite)
 
     @property
+    @cached
     @error_handling
     def firmware_version(self):
         """
@@ -399,7 +624,25 @@ class Detector:
 
         """
         self._api.freeSharedMemory()
-        self.__init__(self._api.getMultiDetectorId())
+        tracer = self._api if isinstance(self._api, ApiTracer) else None
+        api = tracer.api if tracer else self._api
+        if isinstance(api, DetectorApi):
+            api = DetectorApi(api.getMultiDetectorId())
+        if tracer:
+            tracer.api = api
+            api = tracer
+        self._set_api(api)
+        self._cache.invalidate()
+        self._connect()
+
+    def _set_api(self, api):
+        """
+        Replace the api, the helper objects holding the old one (dacs, adcs
+        etc.) are built again on first use. Settings, a running acquisition
+        and the batch state are kept.
+        """
+        self._api = api
+        lazy_property.reset(self)
 
     @property
     def flipped_data_x(self):
@@ -409,7 +652,7 @@ class Detector:
     @property
     def flipped_data_y(self):
         """Flips data on y axis."""
-        return self._flippeddatax
+        return self._flippeddatay
 
     @property
     @error_handling
@@ -429,6 +672,7 @@ class Detector:
 
 
     @property
+    @cached
     @error_handling
     def hostname(self):
         """
@@ -450,6 +694,7 @@ class Detector:
 
 
     @hostname.setter
+    @invalidates_cache()
     @error_handling
     def hostname(self, hn):
         if isinstance(hn, str):
@@ -459,6 +704,7 @@ class Detector:
             self._api.setHostname(name)
 
     @property
+    @cached
     def image_size(self):
         """
         :py:obj:`collections.namedtuple` with the image size of the detector
@@ -489,10 +735,12 @@ class Detector:
         return size(*self._api.getImageSize())
 
     @image_size.setter
+    @invalidates_cache('image_size')
     @error_handling
     def image_size(self, size):
         self._api.setImageSize(*size)
 
+    @invalidates_cache()
     @error_handling
     def load_config(self, fname):
         """
@@ -509,6 +757,7 @@ class Detector:
         else:
             raise FileNotFoundError('Cannot find configuration file')
 
+    @invalidates_cache()
     @error_handling
     def load_parameters(self, fname):
         """
@@ -597,6 +846,7 @@ class Detector:
         self._api.setReceiverLock(value)
 
     @property
+    @cached
     @error_handling
     def module_geometry(self):
         """
@@ -700,6 +950,7 @@ class Detector:
             raise DetectorValueError('Number of measurements must be positive')
 
     @property
+    @cached
     @error_handling
     def n_modules(self):
         """
@@ -854,6 +1105,25 @@ class Detector:
             raise ValueError('Period must be 0 or larger')
         self._api.setPeriod(ns_time)
 
+    @property
+    def progress(self):
+        """
+        :py:obj:`namedtuple` AcquisitionProgress(frame_index, frames_caught)
+        read from the receiver. Useful for monitoring an acquisition started
+        with start() or acq_async().
+
+        Examples
+        ---------
+
+        ::
+
+            d.progress
+            >> AcquisitionProgress(frame_index=57, frames_caught=58)
+
+        """
+        return AcquisitionProgress(self._api.getReceiverCurrentFrameIndex(),
+                                   self._api.getFramesCaughtByReceiver())
+
     @property
     @error_handling
     def rate_correction(self):
@@ -1061,6 +1331,7 @@ class Detector:
 #        return self._api.getSoftwareVersion();
 
     @property
+    @cached
     @error_handling
     def server_version(self):
         """
@@ -1095,6 +1366,7 @@ class Detector:
 
 
     @property
+    @cached
     @error_handling
     def settings_path(self):
         """
@@ -1103,6 +1375,7 @@ class Detector:
         return self._api.getSettingsDir()
 
     @settings_path.setter
+    @invalidates_cache('settings_path')
     @error_handling
     def settings_path(self, path):
         if os.path.isdir(path):
@@ -1143,6 +1416,52 @@ class Detector:
     def stop_receiver(self):
         self._api.stopReceiver()
 
+    def start_trace(self, maxlen=100000, attribute=True, record=None):
+        """
+        Record every call made to the DetectorApi together with its
+        duration and the property or function that made it. Returns the
+        :py:class:`sls_detector.trace.ApiTracer` holding the calls.
+
+        With record set to a file name all calls, arguments and return
+        values are also written to a trace that can be replayed offline,
+        see :py:mod:`sls_detector.replay`
+
+        Examples
+        ---------
+
+        ::
+
+            t = d.start_trace()
+            d.dacs
+            d.exposure_time = 1
+            d.stop_trace()
+
+            print(t.summary(by='caller'))
+            caller                                      calls  total [ms]  p50 [us] ...
+            EigerDacs.__repr__                             18       20.39   1100.00 ...
+            Eiger.exposure_time                             3        3.01   1000.00 ...
+
+            t.to_chrome_trace('trace.json')
+
+            d.start_trace(record='session.trace.gz')
+
+        """
+        if isinstance(self._api, ApiTracer):
+            return self._api
+        tracer = ApiTracer(self._api, maxlen, attribute, record)
+        self._set_api(tracer)
+        tracer.clear()
+        return tracer
+
+    def stop_trace(self):
+        """Stop recording calls, returns the ApiTracer or None if not tracing"""
+        tracer = self._api
+        if not isinstance(tracer, ApiTracer):
+            return None
+        self._set_api(tracer.api)
+        tracer.close()
+        return tracer
+
     @property
     def threaded(self):
         """
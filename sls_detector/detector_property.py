@@ -1,45 +1,89 @@
+import weakref
 from collections import Iterable
-import numpy as np
+from itertools import repeat
+from numbers import Integral
 
 class DetectorProperty:
     """
     Base class for a detector property that should be accessed by name and index
+
+    Setting max_workers to a value larger than 1 fans out the per module
+    get calls over a thread pool. The C++ bindings release the GIL so the
+    network round trips to the different modules can overlap. Set calls are
+    always made one module at a time, they update the error mask and shared
+    memory of the multiSlsDetector that all modules go through, which is not
+    protected against concurrent writers. The pool is shut down when the
+    property is garbage collected, for example after the helpers of a
+    Detector are rebuilt.
+
+    ::
+
+        d.dacs.vrf.max_workers = 32
+        d.dacs.vrf[:]
+
     """
-    def __init__(self, get_func, set_func, nmod_func, name):
+    def __init__(self, get_func, set_func, nmod_func, name, max_workers=None):
         self.get = get_func
         self.set = set_func
         self.get_nmod = nmod_func
         self.__name__ = name
+        self._pool = None
+        self.max_workers = max_workers
+
+    @property
+    def max_workers(self):
+        """Number of threads used for per module calls, None for serial"""
+        return self._max_workers
+
+    @max_workers.setter
+    def max_workers(self, n):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+        self._max_workers = n
+
+    def _map_get(self, keys):
+        """Get the values of keys, concurrently if enabled"""
+        if self._max_workers is None or self._max_workers < 2:
+            return [self.get(k) for k in keys]
+        if self._pool is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._pool = ThreadPoolExecutor(max_workers=self._max_workers)
+            #release the threads together with the property
+            weakref.finalize(self, self._pool.shutdown, False)
+        return list(self._pool.map(self.get, keys))
+
+    def _map(self, func, *iterables):
+        """Call func for each set of arguments, one at a time"""
+        return [func(*args) for args in zip(*iterables)]
 
     def __getitem__(self, key):
         if key == slice(None, None, None):
-            return [self.get(i) for i in range(self.get_nmod())]
+            return self._map_get(range(self.get_nmod()))
         elif isinstance(key, Iterable):
-            return [self.get(k) for k in key]
+            return self._map_get(key)
         else:
             return self.get(key)
 
     def __setitem__(self, key, value):
         #operate on all values
         if key == slice(None, None, None):
-            if isinstance(value, (np.integer, int)):
-                for i in range(self.get_nmod()):
-                    self.set(i, value)
+            n = self.get_nmod()
+            if isinstance(value, Integral):
+                self._map(self.set, range(n), repeat(value, n))
             elif isinstance(value, Iterable):
-                for i in range(self.get_nmod()):
-                    self.set(i, value[i])
+                self._map(self.set, range(n), [value[i] for i in range(n)])
             else:
                 raise ValueError('Value should be int or np.integer not', type(value))
-        
+
         #Iterate over some
         elif isinstance(key, Iterable):
             if isinstance(value, Iterable):
-                for k,v in zip(key, value):
-                    self.set(k,v)
+                self._map(self.set, key, value)
 
             elif isinstance(value, int):
-                for k in key:
-                    self.set(k, value)
+                key = list(key)
+                self._map(self.set, key, repeat(value, len(key)))
 
         #Set single value
         elif isinstance(key, int):
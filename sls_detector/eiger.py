@@ -9,12 +9,16 @@ Created on Wed Dec  6 11:51:18 2017
 import socket
 from collections import Iterable, namedtuple
 from functools import partial
+from numbers import Integral
+
+import numpy as np
 
 from .adcs import Adc, DetectorAdcs
 from .dacs import DetectorDacs
-from .decorators import error_handling
+from .decorators import error_handling, lazy_property
 from .detector import Detector
 from .detector_property import DetectorProperty
+from .errors import DetectorValueError
 from .utils import element_if_equal
 
 
@@ -143,29 +147,45 @@ class Eiger(Detector):
     _settings = ['standard', 'highgain', 'lowgain', 'veryhighgain', 'verylowgain']
     """available settings for Eiger, note almost always standard"""
 
-    def __init__(self, id=0):
-        super().__init__(id)
+    _trimbit_limits = namedtuple('trimbit_limits', ['min', 'max'])(0, 63)
 
-        self._active = DetectorProperty(self._api.getActive,
-                                        self._api.setActive,
-                                        self._api.getNumberOfDetectors,
-                                        'active')
+    def __init__(self, id=0, api=None):
+        super().__init__(id, api)
 
-        self._vcmp = EigerVcmp(self)
-        self._dacs = EigerDacs(self)
-        self._trimbit_limits = namedtuple('trimbit_limits', ['min', 'max'])(0, 63)
-        self._delay = DetectorDelays(self)
-        
+    # Helper objects are built on first use since most scripts only
+    # touch a few of them
+    @lazy_property
+    def _active(self):
+        return DetectorProperty(self._api.getActive,
+                                self._api.setActive,
+                                self._api.getNumberOfDetectors,
+                                'active')
+
+    @lazy_property
+    def _vcmp(self):
+        return EigerVcmp(self)
+
+    @lazy_property
+    def _dacs(self):
+        return EigerDacs(self)
+
+    @lazy_property
+    def _delay(self):
+        return DetectorDelays(self)
+
+    @lazy_property
+    def _temp(self):
         # Eiger specific adcs
-        self._temp = DetectorAdcs()
-        self._temp.fpga = Adc('temp_fpga', self)
-        self._temp.fpgaext = Adc('temp_fpgaext', self)
-        self._temp.t10ge = Adc('temp_10ge', self)
-        self._temp.dcdc = Adc('temp_dcdc', self)
-        self._temp.sodl = Adc('temp_sodl', self)
-        self._temp.sodr = Adc('temp_sodr', self)
-        self._temp.fpgafl = Adc('temp_fpgafl', self)
-        self._temp.fpgafr = Adc('temp_fpgafr', self)
+        temp = DetectorAdcs(self)
+        temp.fpga = Adc('temp_fpga', self)
+        temp.fpgaext = Adc('temp_fpgaext', self)
+        temp.t10ge = Adc('temp_10ge', self)
+        temp.dcdc = Adc('temp_dcdc', self)
+        temp.sodl = Adc('temp_sodl', self)
+        temp.sodr = Adc('temp_sodr', self)
+        temp.fpgafl = Adc('temp_fpgafl', self)
+        temp.fpgafr = Adc('temp_fpgafr', self)
+        return temp
 
     @property
     @error_handling
@@ -348,6 +368,94 @@ class Eiger(Detector):
             v = '0'
         self._api.setNetworkParameter('flow_control_10g', v, -1)
 
+    def _module_list(self, modules):
+        """Convert None, int or iterable to a list of module indices"""
+        if modules is None:
+            return list(range(self.n_modules))
+        elif isinstance(modules, Integral):
+            return [int(modules)]
+        return [int(m) for m in modules]
+
+    @error_handling
+    def get_trimbits(self, modules=None):
+        """
+        Read the trimbits of all or selected modules into a numpy array.
+        The full map is transferred in a single call without going through
+        a trimbit file.
+
+        Parameters
+        -----------
+        modules:
+            :py:obj:`int` or :py:obj:`list` of modules to read, None for all
+
+        Returns
+        --------
+        numpy.ndarray
+            uint8 array with shape [nmodules, 256, 1024]
+
+        Examples
+        ---------
+
+        ::
+
+            tb = d.get_trimbits()
+            tb.shape
+            >> (2, 256, 1024)
+
+            tb = d.get_trimbits(1)
+            tb.shape
+            >> (1, 256, 1024)
+
+        """
+        return self._api.getTrimbits(self._module_list(modules))
+
+    @error_handling
+    def set_trimbits(self, trimbits, modules=None):
+        """
+        Write trimbits from a numpy array to all or selected modules. A
+        single [256, 1024] map is written to every selected module.
+
+        Parameters
+        -----------
+        trimbits:
+            :py:obj:`numpy.ndarray` with shape [nmodules, 256, 1024] or [256, 1024]
+
+        modules:
+            :py:obj:`int` or :py:obj:`list` of modules to write, None for all
+
+        Raises
+        -------
+        ValueError
+            If the shape does not match the selected modules
+        DetectorValueError
+            If any trimbit is outside of the allowed range
+
+        Examples
+        ---------
+
+        ::
+
+            tb = d.get_trimbits()
+            tb[0, 100:110, :] = 63
+            d.set_trimbits(tb)
+
+            #Same map on module 1 and 3
+            d.set_trimbits(tb[0], [1, 3])
+
+        """
+        modules = self._module_list(modules)
+        trimbits = np.asarray(trimbits)
+        shape = (len(modules),) + tuple(self._api.getModuleShape())
+        if trimbits.shape == shape[1:]:
+            trimbits = np.broadcast_to(trimbits, shape)
+        elif trimbits.shape != shape:
+            raise ValueError('Trimbits should have shape {} or {}, got {}'.format(
+                shape, shape[1:], trimbits.shape))
+        if trimbits.min() < self._trimbit_limits.min or trimbits.max() > self._trimbit_limits.max:
+            raise DetectorValueError('Trimbits outside of range: {:d}-{:d}'.format(self._trimbit_limits.min,
+                                                                                   self._trimbit_limits.max))
+        self._api.setTrimbits(modules, trimbits.astype(np.uint8))
+
     @error_handling
     def pulse_all_pixels(self, n):
         """
@@ -556,6 +664,9 @@ class Eiger(Detector):
             a
             >> [36.568, 45.542]
 
+            #All adcs as [nadcs, nmodules] in one call
+            a = detector.temp.as_array()
+
 
         """
         return self._temp
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Insertion of gap pixels on the client side, as an alternative to
+Eiger.add_gappixels which does the same work in the receiver.
+
+The Eiger and Jungfrau chips have 256x256 pixels. The pixels at the chip
+borders inside a module are twice as large and cover the gap to the
+next chip, so the full image has two extra pixels between neighbouring
+chips. Optionally there is an additional gap between the modules, which
+are 512x1024 pixels for both Eiger and Jungfrau.
+
+::
+
+    from sls_detector.geometry import insert_gap_pixels
+
+    d.add_gappixels = False
+    image = insert_gap_pixels(frames)
+
+    #1 module 512x1024 -> 514x1030
+    image.shape
+    >> (514, 1030)
+"""
+import functools
+
+import numpy as np
+
+
+def _axis_map(n, module_size, chip_size, chip_gap, module_gap):
+    """
+    Source index, gap flag and charge weight for each output pixel along
+    one axis of the image.
+    """
+    if n % module_size != 0:
+        raise ValueError('{} pixels is not a multiple of the module size {}'.format(n, module_size))
+    n_modules = n // module_size
+    if module_size % chip_size != 0:
+        raise ValueError('Module size {} is not a multiple of the chip size {}'.format(
+            module_size, chip_size))
+    n_chips = module_size // chip_size
+    half = chip_gap // 2
+
+    source = []
+    gap = []
+    weight = []
+    for m in range(n_modules):
+        if m > 0:
+            source += [m * module_size] * module_gap
+            gap += [True] * module_gap
+            weight += [0.] * module_gap
+        for c in range(n_chips):
+            first = m * module_size + c * chip_size
+            last = first + chip_size - 1
+            w = np.ones(chip_size)
+            if c > 0:
+                w[0] = 1 / (1 + half)
+                source += [first] * half
+                gap += [True] * half
+                weight += [w[0]] * half
+            if c < n_chips - 1:
+                w[-1] = 1 / (1 + half)
+            source += list(range(first, last + 1))
+            gap += [False] * chip_size
+            weight += list(w)
+            if c < n_chips - 1:
+                source += [last] * half
+                gap += [True] * half
+                weight += [w[-1]] * half
+    return np.array(source), np.array(gap), np.array(weight)
+
+
+class GapPixelMap:
+    """
+    Precomputed index maps to go from the raw detector image to the image
+    with gap pixels. Build once and apply to every frame or stack of frames.
+
+    Parameters
+    -----------
+    image_size:
+        (rows, cols) of the raw image, Detector.image_size
+    module_size: tuple
+        (rows, cols) of a full module. An Eiger module counts as two
+        modules in Detector.module_geometry, one per half module, but the
+        chip gap between the halves is inside the module.
+    chip_size: tuple
+        (rows, cols) of a chip
+    chip_gap: int
+        Number of gap pixels between two chips, needs to be even
+    module_gap: tuple
+        (rows, cols) of empty pixels added between modules
+    split: bool
+        Share the counts of the large pixels at the chip borders with the
+        gap pixels they cover. Otherwise the gap pixels are 0 and the
+        border pixels keep all counts.
+
+    Attributes
+    -----------
+    shape: tuple
+        (rows, cols) of the image with gap pixels
+
+    """
+    def __init__(self, image_size, module_size=(512, 1024), chip_size=(256, 256), chip_gap=2,
+                 module_gap=(0, 0), split=False):
+        if chip_gap % 2 != 0:
+            raise ValueError('chip_gap needs to be even')
+        rows, cols = image_size
+        src_r, gap_r, w_r = _axis_map(rows, module_size[0], chip_size[0], chip_gap, module_gap[0])
+        src_c, gap_c, w_c = _axis_map(cols, module_size[1], chip_size[1], chip_gap, module_gap[1])
+
+        self.image_size = (rows, cols)
+        self.shape = (len(src_r), len(src_c))
+        self.split = split
+        self.index = (src_r[:, None] * cols + src_c[None, :]).reshape(-1)
+        weight = (w_r[:, None] * w_c[None, :]).reshape(-1)
+        if split:
+            #only module gaps are empty, chip gaps share the border counts
+            self.weight_index = np.flatnonzero((weight != 1) & (weight != 0))
+            self.weight = weight[self.weight_index]
+            self.empty = np.flatnonzero(weight == 0)
+        else:
+            self.weight_index = self.weight = None
+            self.empty = np.flatnonzero((gap_r[:, None] | gap_c[None, :]).reshape(-1))
+
+    @classmethod
+    def from_detector(cls, detector, **kwargs):
+        """
+        Map for the current image_size and module_geometry of detector. The
+        module size is the image size divided by the geometry, for Eiger two
+        half modules on top of each other make up one module.
+        """
+        rows, cols = detector.image_size
+        horizontal, vertical = detector.module_geometry
+        module_size = (rows // vertical, cols // horizontal)
+        if detector.detector_type == 'Eiger' and vertical % 2 == 0:
+            module_size = (2 * module_size[0], module_size[1])
+        kwargs.setdefault('module_size', module_size)
+        return cls((rows, cols), **kwargs)
+
+    def __call__(self, frames, out=None):
+        """
+        Insert the gap pixels in frames, [rows, cols] or [frame, rows, cols]
+
+        Parameters
+        -----------
+        out: numpy.ndarray
+            Contiguous array with the output shape to write to. By default a
+            new array of the same type as frames, or float64 with split, is
+            returned. With split out needs to be a float array, otherwise
+            any type the values are cast to.
+
+        """
+        frames = np.asarray(frames)
+        if frames.shape[-2:] != self.image_size:
+            raise ValueError('Expected frames of size {} got {}'.format(self.image_size,
+                                                                        frames.shape[-2:]))
+        shape = frames.shape[:-2] + self.shape
+        if out is None:
+            dtype = np.float64 if self.split else frames.dtype
+            out = np.empty(shape, dtype=dtype)
+        elif out.shape != shape or not out.flags.c_contiguous:
+            raise ValueError('out should be a contiguous array of shape {}'.format(shape))
+        elif self.split and out.dtype.kind != 'f':
+            raise ValueError('out should be a float array with split')
+
+        src = frames.reshape(-1, self.image_size[0] * self.image_size[1])
+        dst = out.reshape(-1, self.shape[0] * self.shape[1])
+        if dst.dtype == src.dtype:
+            np.take(src, self.index, axis=1, out=dst)
+        else:
+            #take only writes to the same type, cast on assignment
+            dst[:] = np.take(src, self.index, axis=1)
+        dst[:, self.empty] = 0
+        if self.split:
+            dst[:, self.weight_index] *= self.weight
+        return out
+
+
+@functools.lru_cache(maxsize=16)
+def _cached_map(image_size, module_size, chip_size, chip_gap, module_gap, split):
+    return GapPixelMap(image_size, module_size, chip_size, chip_gap, module_gap, split)
+
+
+def insert_gap_pixels(frames, module_size=(512, 1024), chip_size=(256, 256), chip_gap=2,
+                      module_gap=(0, 0), split=False, out=None):
+    """
+    Insert the gap pixels between chips (and optionally modules) in raw
+    frames from the stream or from file. The index maps are computed once
+    per geometry and reused, see GapPixelMap for the parameters.
+
+    Examples
+    ---------
+
+    ::
+
+        #Eiger 1.5M, three modules on top of each other
+        image = insert_gap_pixels(frames, module_gap = (36, 0), split = True)
+        image.shape
+        >> (1614, 1030)
+
+    """
+    frames = np.asarray(frames)
+    gap_map = _cached_map(tuple(frames.shape[-2:]), tuple(module_size), tuple(chip_size),
+                          chip_gap, tuple(module_gap), split)
+    return gap_map(frames, out)
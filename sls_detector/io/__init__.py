@@ -0,0 +1,5 @@
+"""
+Reading and writing files used by the slsDetectorSoftware
+"""
+from .raw import RawFileReader
+from .parallel import ParallelRawReader
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reading raw files with several processes. The frame index of a
+RawFileReader is split in chunks of one file and one part each, which are
+read and assembled by a pool of worker processes directly into an output
+array in shared memory, so the data is not sent between processes.
+
+::
+
+    from sls_detector.io import RawFileReader
+    from sls_detector.io.parallel import ParallelRawReader
+
+    reader = RawFileReader.from_detector(d)
+    with ParallelRawReader(reader, max_workers = 32) as p:
+        for frame_numbers, images in p.batches(batch_size = 100):
+            process(images)
+
+The shared array is a file in /dev/shm mapped by all processes, this works
+on all supported Python versions.
+"""
+import collections
+import functools
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .raw import _insert
+
+
+def _shared_dir():
+    """tmpfs directory for the shared arrays, default temp dir if missing"""
+    return '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+
+@functools.lru_cache(maxsize=128)
+def _open_file(fname, frame_dtype):
+    return np.memmap(fname, dtype=frame_dtype, mode='r')
+
+
+def _read_chunk(fname, frame_dtype, src, name, dtype, shape, slot, region, flip, dst,
+                part_shape, dynamic_range):
+    """Worker: read frames src of one file into slot of the shared array"""
+    data = _open_file(fname, frame_dtype)['data'][src]
+    #not cached, the name of a removed array can be reused
+    out = np.memmap(name, dtype=dtype, mode='r+', shape=shape)[slot]
+    _insert(out[(slice(None),) + region], dst, data, part_shape, flip, dynamic_range)
+    return len(dst)
+
+
+class ParallelRawReader:
+    """
+    Read the frames of a RawFileReader using a ProcessPoolExecutor
+
+    Parameters
+    -----------
+    reader: RawFileReader
+        Reader with the frame index of the acquisition
+    max_workers: int
+        Number of processes, by default the number of cores
+
+    """
+    def __init__(self, reader, max_workers=None):
+        self.reader = reader
+        self.max_workers = max_workers
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Shut down the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _shared(self, shape):
+        """
+        Create an array in shared memory, returns the file name and array.
+        Raises MemoryError if it does not fit, touching pages of a tmpfs
+        file beyond the free space kills the process with SIGBUS.
+        """
+        path = _shared_dir() or tempfile.gettempdir()
+        nbytes = int(np.prod(shape)) * np.dtype(self.reader.dtype).itemsize
+        st = os.statvfs(path)
+        free = st.f_bavail * st.f_frsize
+        if nbytes > free:
+            raise MemoryError('{} frames need {:.1f} MB but only {:.1f} MB is free in {}, '
+                              'read fewer frames at a time with batches()'.format(
+                                  shape[0] * shape[1], nbytes / 1e6, free / 1e6, path))
+        fd, name = tempfile.mkstemp(prefix='sls_detector_', suffix='.bin', dir=path)
+        os.close(fd)
+        try:
+            return name, np.memmap(name, dtype=self.reader.dtype, mode='w+', shape=shape)
+        except Exception:
+            os.remove(name)
+            raise
+
+    def _submit(self, name, shared, slot, pos):
+        """Start reading the frames at positions pos into shared[slot]"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        r = self.reader
+        futures = []
+        for part, region in enumerate(r.regions):
+            #frames missing in this part are zeroed here, the rest by the workers
+            missing = np.flatnonzero(r._file_id[part, pos] < 0)
+            if len(missing):
+                shared[slot][(slice(None),) + region][missing] = 0
+            flip = (slice(None),) + r._flips[part]
+            for i, src, dst in r._locations(part, pos):
+                futures.append(self._executor.submit(
+                    _read_chunk, r._file_names[i], r.frame_dtype, src, name, shared.dtype,
+                    shared.shape, slot, region, flip, dst, r._part_shape, r.dynamic_range))
+        return futures
+
+    def batches(self, batch_size=100, start=0, stop=None, prefetch=2):
+        """
+        Generator of (frame_numbers, images) for consecutive batches of
+        frames, in order. While a batch is being used the next prefetch
+        batches are read in the background.
+
+        .. note ::
+
+            The images are reused for a later batch when the generator
+            continues, copy them if they need to be kept.
+
+        Parameters
+        -----------
+        batch_size: int
+            Number of frames per batch
+        start, stop: int
+            Range of positions in reader.frame_numbers to read
+        prefetch: int
+            Number of batches read ahead
+
+        """
+        positions = np.arange(len(self.reader))[start:stop]
+        batches = [positions[i:i+batch_size] for i in range(0, len(positions), batch_size)]
+        if not batches:
+            return
+        n_slots = min(prefetch + 1, len(batches))
+        shape = (n_slots, batch_size) + self.reader.image_size
+        name, shared = self._shared(shape)
+        pending = collections.deque()
+        try:
+            for k in range(n_slots):
+                pending.append((k, self._submit(name, shared, k, batches[k])))
+            while pending:
+                k, futures = pending.popleft()
+                for f in futures:
+                    f.result()
+                pos = batches[k]
+                yield self.reader.frame_numbers[pos], np.asarray(shared[k % n_slots, :len(pos)])
+                if k + n_slots < len(batches):
+                    k += n_slots
+                    pending.append((k, self._submit(name, shared, k % n_slots, batches[k])))
+        finally:
+            #batches still being read when the generator is closed early
+            for k, futures in pending:
+                for f in futures:
+                    f.cancel()
+                for f in futures:
+                    if not f.cancelled():
+                        f.exception()
+            os.remove(name)
+
+    def read(self, start=0, stop=None, chunk_size=100):
+        """
+        Read a range of frames into one array using all workers
+
+        Parameters
+        -----------
+        start, stop: int
+            Range of positions in reader.frame_numbers to read
+        chunk_size: int
+            Number of frames of one file given to a worker at a time
+
+        Returns
+        --------
+        numpy.ndarray
+            [frame, rows, cols]
+
+        Raises
+        -------
+        MemoryError
+            If the frames do not fit in the free space of the shared
+            memory directory, use batches() for long ranges
+
+        """
+        positions = np.arange(len(self.reader))[start:stop]
+        n_chunks = max(-(-len(positions) // chunk_size), 1)
+        shape = (n_chunks, chunk_size) + self.reader.image_size
+        name, shared = self._shared(shape)
+        try:
+            futures = []
+            for k in range(n_chunks):
+                pos = positions[k * chunk_size:(k + 1) * chunk_size]
+                futures += self._submit(name, shared, k, pos)
+            for f in futures:
+                f.result()
+        finally:
+            #the mapping stays valid after the file is removed
+            os.remove(name)
+        return np.asarray(shared).reshape((-1,) + self.reader.image_size)[:len(positions)]
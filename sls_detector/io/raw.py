@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Raw files written by the slsReceiver. Each receiver, one per module for
+Jungfrau and one per port for Eiger, writes its own series of files. Every
+frame in a file is a fixed size header followed by the data of that part of
+the detector. With n_frames_per_file set the series is split in sub files.
+
+::
+
+    path/run_master_0.raw
+    path/run_d0_f0_0.raw
+    path/run_d0_f1_0.raw
+    path/run_d1_f0_0.raw
+    path/run_d1_f1_0.raw
+
+Files written without sub file index, run_d0_0.raw, are read as well. The
+files are accessed through np.memmap so only the frames that are read are
+loaded from disk.
+"""
+import os
+import re
+
+import numpy as np
+
+from ..utils import stream_regions
+
+#sls_receiver_header, the sls_detector_header followed by the packet mask
+header_dtype = np.dtype([('frameNumber', '<u8'),
+                         ('expLength', '<u4'),
+                         ('packetNumber', '<u4'),
+                         ('bunchId', '<u8'),
+                         ('timestamp', '<u8'),
+                         ('modId', '<u2'),
+                         ('row', '<u2'),
+                         ('column', '<u2'),
+                         ('reserved', '<u2'),
+                         ('debug', '<u4'),
+                         ('roundRNumber', '<u2'),
+                         ('detType', 'u1'),
+                         ('version', 'u1'),
+                         ('packetsMask', 'u1', (64,))])
+
+#numpy type of the assembled image, 4 bit data is unpacked to uint8
+_dtypes = {4: np.uint8, 8: np.uint8, 16: np.uint16, 32: np.uint32}
+
+
+def raw_fname(file_path, file_name, part, sub_file, file_index):
+    """
+    Path to one file of the series written by receiver part
+
+    ::
+
+        raw_fname('/data', 'run', 1, 0, 5)
+        >> '/data/run_d1_f0_5.raw'
+
+    """
+    return os.path.join(file_path, '{}_d{}_f{}_{}.raw'.format(file_name, part, sub_file,
+                                                              file_index))
+
+
+def find_raw_files(file_path, file_name, file_index=0):
+    """
+    Find the files of an acquisition
+
+    Parameters
+    -----------
+    file_path:
+        Directory, or list of directories if the receivers write to
+        different locations
+    file_name: str
+        Base file name, Detector.file_name
+    file_index: int
+        Acquisition index, Detector.file_index
+
+    Returns
+    --------
+    list
+        One sorted list of file names per receiver part
+
+    Raises
+    -------
+    FileNotFoundError
+        If no files are found or a part is missing
+
+    """
+    if isinstance(file_path, str):
+        file_path = [file_path]
+    pattern = re.compile(r'^{}_d(\d+)(?:_f(\d+))?_{}\.raw$'.format(re.escape(file_name),
+                                                                  int(file_index)))
+    files = {}
+    for path in file_path:
+        for f in os.listdir(path):
+            m = pattern.match(f)
+            if m is not None:
+                part, sub_file = int(m.group(1)), int(m.group(2) or 0)
+                files.setdefault(part, []).append((sub_file, os.path.join(path, f)))
+    if not files:
+        raise FileNotFoundError('No raw files for {}_*_{} in {}'.format(file_name, file_index,
+                                                                       ', '.join(file_path)))
+    if sorted(files) != list(range(len(files))):
+        raise FileNotFoundError('Missing parts, found files for {}'.format(sorted(files)))
+    return [[f for _, f in sorted(files[part])] for part in range(len(files))]
+
+
+class RawFileReader:
+    """
+    Random access to the frames of an acquisition written in the raw format,
+    assembled into images with the shape of Detector.image_size.
+
+    On creation the header of every frame is read once to build an index of
+    frame number to file and position for each part. Reading frames only
+    touches the requested frames. Frames missing in some part, for example
+    because of lost packets, are filled with 0 in that part.
+
+    Parameters
+    -----------
+    file_path:
+        Directory or list of directories with the files
+    file_name: str
+        Base file name
+    image_size:
+        (rows, cols) of the full detector, Detector.image_size
+    geometry:
+        (horizontal, vertical) number of modules, Detector.module_geometry
+    dynamic_range: int
+        Bits per pixel, Detector.dynamic_range
+    file_index: int
+        Acquisition index
+    flipped:
+        Optional list of (flip_x, flip_y) per module
+
+    Attributes
+    -----------
+    frame_numbers: numpy.ndarray
+        Sorted frame numbers found in any of the parts
+    files: list
+        File names per part
+
+    Examples
+    ---------
+
+    ::
+
+        with RawFileReader.from_detector(d) as f:
+            print(len(f), f.frame_numbers[0])
+            image = f[5]
+            images = f[1000:1100]
+            image = f.read_frames([17])[0]
+
+    """
+    def __init__(self, file_path, file_name, image_size, geometry=(1, 1), dynamic_range=16,
+                 file_index=0, flipped=None):
+        self.files = find_raw_files(file_path, file_name, file_index)
+        self.image_size = tuple(image_size)
+        self.dynamic_range = dynamic_range
+        self.dtype = _dtypes[dynamic_range]
+        n_parts = len(self.files)
+        self.regions = stream_regions(self.image_size, geometry, n_parts)
+        self._part_shape = (self.regions[0][0].stop - self.regions[0][0].start,
+                            self.regions[0][1].stop - self.regions[0][1].start)
+
+        per_module = n_parts // (geometry[0] * geometry[1])
+        self._flips = []
+        for i in range(n_parts):
+            fx, fy = (False, False) if flipped is None else flipped[i // per_module]
+            self._flips.append((slice(None, None, -1 if fx else 1),
+                                slice(None, None, -1 if fy else 1)))
+
+        n_pixels = self._part_shape[0] * self._part_shape[1]
+        if dynamic_range == 4:
+            data = ('data', np.uint8, (n_pixels // 2,))
+        else:
+            data = ('data', self.dtype, (n_pixels,))
+        self.frame_dtype = np.dtype([('header', header_dtype), data])
+        self._maps = {}
+        self._build_index()
+
+    @classmethod
+    def from_detector(cls, detector, file_index=None, **kwargs):
+        """
+        Reader for the files written with the current settings of detector.
+        file_index defaults to the last acquisition, file_index - 1.
+        """
+        if file_index is None:
+            file_index = max(detector.file_index - 1, 0)
+        flipped = list(zip(detector.flipped_data_x[:], detector.flipped_data_y[:]))
+        return cls(detector.file_path, detector.file_name, detector.image_size,
+                   detector.module_geometry, detector.dynamic_range, file_index,
+                   flipped=flipped, **kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return len(self.frame_numbers)
+
+    def __repr__(self):
+        return 'RawFileReader({} frames, {} parts, {})'.format(len(self), len(self.files),
+                                                               self.image_size)
+
+    def __getitem__(self, key):
+        """Frames by position in frame_numbers, [rows, cols] or [frame, rows, cols]"""
+        if isinstance(key, slice):
+            return self._read(np.arange(len(self))[key])
+        key = int(key)
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError('Frame {} out of range for {} frames'.format(key, len(self)))
+        return self._read(np.array([key]))[0]
+
+    def _map(self, file_id):
+        """memmap of a file as frames, opened on first use"""
+        m = self._maps.get(file_id)
+        if m is None:
+            m = np.memmap(self._file_names[file_id], dtype=self.frame_dtype, mode='r')
+            self._maps[file_id] = m
+        return m
+
+    def close(self):
+        """Release the memory maps"""
+        self._maps = {}
+
+    def _build_index(self):
+        """
+        Read the frame numbers of all files and build, for each part, the
+        file and position of every frame in frame_numbers
+        """
+        self._file_names = []
+        part_frames = []
+        for part, files in enumerate(self.files):
+            numbers = []
+            file_id = []
+            offset = []
+            for fname in files:
+                size = os.path.getsize(fname)
+                if size % self.frame_dtype.itemsize != 0:
+                    raise ValueError('{} is not a whole number of frames of {} bytes'.format(
+                        fname, self.frame_dtype.itemsize))
+                i = len(self._file_names)
+                self._file_names.append(fname)
+                n = size // self.frame_dtype.itemsize
+                if n == 0:
+                    continue
+                #strided read, only the pages with headers are loaded
+                numbers.append(np.array(self._map(i)['header']['frameNumber']))
+                file_id.append(np.full(n, i, dtype=np.intp))
+                offset.append(np.arange(n, dtype=np.intp))
+            if numbers:
+                part_frames.append((np.concatenate(numbers), np.concatenate(file_id),
+                                    np.concatenate(offset)))
+            else:
+                empty = np.zeros(0, dtype=np.intp)
+                part_frames.append((empty.astype(np.uint64), empty, empty))
+
+        self.frame_numbers = np.unique(np.concatenate([p[0] for p in part_frames]))
+        self._file_id = np.full((len(self.files), len(self)), -1, dtype=np.intp)
+        self._offset = np.zeros((len(self.files), len(self)), dtype=np.intp)
+        for part, (numbers, file_id, offset) in enumerate(part_frames):
+            pos = np.searchsorted(self.frame_numbers, numbers)
+            self._file_id[part, pos] = file_id
+            self._offset[part, pos] = offset
+        self.close()
+
+    def frame_index(self, frame_numbers):
+        """Position in frame_numbers of each of the frame numbers"""
+        frame_numbers = np.atleast_1d(np.asarray(frame_numbers, dtype=np.uint64))
+        pos = np.searchsorted(self.frame_numbers, frame_numbers)
+        pos = np.minimum(pos, len(self) - 1)
+        missing = self.frame_numbers[pos] != frame_numbers
+        if missing.any():
+            raise KeyError('Frames not found: {}'.format(frame_numbers[missing].tolist()))
+        return pos
+
+    def read_frames(self, frame_numbers, out=None):
+        """
+        Read frames by frame number
+
+        Parameters
+        -----------
+        frame_numbers:
+            Frame numbers to read
+        out: numpy.ndarray
+            Optional array of [frame, rows, cols] to read into
+
+        Returns
+        --------
+        numpy.ndarray
+            [frame, rows, cols]
+
+        """
+        return self._read(self.frame_index(frame_numbers), out)
+
+    def headers(self, part, frames=slice(None)):
+        """
+        Receiver headers of part for the frames at positions frames, frames
+        missing in the part have a frameNumber of 0
+        """
+        pos = np.arange(len(self))[frames]
+        out = np.zeros(len(pos), dtype=header_dtype)
+        for i, src, dst in self._locations(part, pos):
+            out[dst] = self._map(i)['header'][src]
+        return out
+
+    def _locations(self, part, pos):
+        """Yield file id, offsets in the file and positions in the output"""
+        file_id = self._file_id[part, pos]
+        for i in np.unique(file_id):
+            if i < 0:
+                continue
+            dst = np.flatnonzero(file_id == i)
+            yield i, self._offset[part, pos[dst]], dst
+
+    def _read(self, pos, out=None):
+        shape = (len(pos),) + self.image_size
+        if out is None:
+            out = np.zeros(shape, dtype=self.dtype)
+        elif out.shape != shape:
+            raise ValueError('out should have shape {}'.format(shape))
+        else:
+            out[:] = 0
+
+        for part, region in enumerate(self.regions):
+            view = out[(slice(None),) + region]
+            flip = (slice(None),) + self._flips[part]
+            for i, src, dst in self._locations(part, pos):
+                _insert(view, dst, self._map(i)['data'][src], self._part_shape, flip,
+                        self.dynamic_range)
+        return out
+
+
+def _insert(view, dst, data, part_shape, flip, dynamic_range):
+    """Write the flat part data of len(dst) frames into view[dst]"""
+    if dynamic_range == 4:
+        unpacked = np.empty(data.shape[:1] + (data.shape[1] * 2,), dtype=np.uint8)
+        np.bitwise_and(data, 0x0f, out=unpacked[:, 0::2])
+        np.right_shift(data, 4, out=unpacked[:, 1::2])
+        data = unpacked
+    view[dst] = data.reshape((len(dst),) + part_shape)[flip]
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Eiger trimbit/settings files (for example noise.sn083). The files are
+binary with int32 values: the 16 dacs, iodelay and tau followed by one
+trimbit per pixel of the half module.
+
+::
+
+    settingsdir/standard/5000eV/noise.sn083
+    settingsdir/standard/6000eV/noise.sn083
+
+Files are accessed through np.memmap so reading a single file does not
+copy any data.
+"""
+import os
+
+import numpy as np
+
+#order of the values in the file header, same as EigerDacs plus tau
+header_names = ['vsvp', 'vtr', 'vrf', 'vrs', 'vsvn', 'vtgstv', 'vcmp_ll',
+                'vcmp_lr', 'vcall', 'vcmp_rl', 'rxb_rb', 'rxb_lb', 'vcmp_rr',
+                'vcp', 'vcn', 'vis', 'iodelay', 'tau']
+n_header = len(header_names)
+module_shape = (256, 1024)
+
+
+def trimbit_fname(settings_path, settings, energy, detector_number, name='noise'):
+    """
+    Path to the trimbit file of a module at a given energy
+
+    ::
+
+        trimbit_fname('/settingsdir', 'standard', 5000, 83)
+        >> '/settingsdir/standard/5000eV/noise.sn083'
+
+    """
+    return os.path.join(settings_path, settings, '{:d}eV'.format(int(energy)),
+                        '{}.sn{:03d}'.format(name, detector_number))
+
+
+def read_trimbit_file(fname):
+    """
+    Read a trimbit file without copying the data
+
+    Returns
+    --------
+    dacs: numpy.ndarray
+        int32 array with the 18 header values, dacs followed by iodelay and tau
+    trimbits: numpy.ndarray
+        int32 array [256, 1024]
+
+    Raises
+    -------
+    ValueError
+        If the file size does not match a trimbit file
+
+    """
+    data = np.memmap(fname, dtype=np.int32, mode='r')
+    if data.size != n_header + module_shape[0] * module_shape[1]:
+        raise ValueError('{} is not a trimbit file, size: {} bytes'.format(fname, data.nbytes))
+    return data[:n_header], data[n_header:].reshape(module_shape)
+
+
+def write_trimbit_file(fname, trimbits, dacs):
+    """
+    Write a trimbit file
+
+    Parameters
+    -----------
+    fname:
+        :py:obj:`str` file name including path
+    trimbits:
+        array [256, 1024] with the trimbits
+    dacs:
+        array with the 18 header values, dacs followed by iodelay and tau
+
+    """
+    dacs = np.asarray(dacs)
+    trimbits = np.asarray(trimbits)
+    if dacs.size != n_header:
+        raise ValueError('Expected {} dacs got {}'.format(n_header, dacs.size))
+    if trimbits.shape != module_shape:
+        raise ValueError('Expected trimbits with shape {}'.format(module_shape))
+
+    data = np.memmap(fname, dtype=np.int32, mode='w+',
+                     shape=(n_header + trimbits.size,))
+    data[:n_header] = dacs
+    data[n_header:] = trimbits.ravel()
+    data.flush()
+    del data
+
+
+def load_trimbits(settings_path, detector_numbers, energies, settings='standard', name='noise'):
+    """
+    Load the trimbit files of several modules and energies into two arrays.
+
+    Returns
+    --------
+    dacs: numpy.ndarray
+        int32 array [n_energies, n_modules, 18]
+    trimbits: numpy.ndarray
+        int32 array [n_energies, n_modules, 256, 1024]
+
+    Examples
+    ---------
+
+    ::
+
+        dacs, tb = load_trimbits('/settingsdir', [83, 98], [5000, 6000, 7000])
+        tb.shape
+        >> (3, 2, 256, 1024)
+
+    """
+    dacs = np.empty((len(energies), len(detector_numbers), n_header), dtype=np.int32)
+    trimbits = np.empty((len(energies), len(detector_numbers)) + module_shape, dtype=np.int32)
+    for i, energy in enumerate(energies):
+        for j, det_number in enumerate(detector_numbers):
+            fname = trimbit_fname(settings_path, settings, energy, det_number, name)
+            dacs[i, j], trimbits[i, j] = read_trimbit_file(fname)
+    return dacs, trimbits
+
+
+def load_detector_trimbits(detector, name='noise'):
+    """
+    Load the trimbit files for all modules of an Eiger at the energies in
+    trimmed_energies, using the settings_path, settings and
+    detector_number of the detector. See load_trimbits.
+    """
+    return load_trimbits(detector.settings_path,
+                         detector.detector_number,
+                         detector.trimmed_energies,
+                         detector.settings,
+                         name)
+
+
+def interpolate_trimbits(energy, energies, dacs, trimbits):
+    """
+    Linear interpolation of dacs and trimbits between the two trimmed
+    energies surrounding energy. Works on the arrays from load_trimbits.
+
+    Returns
+    --------
+    dacs: numpy.ndarray
+        int32 array [n_modules, 18]
+    trimbits: numpy.ndarray
+        int32 array [n_modules, 256, 1024]
+
+    Raises
+    -------
+    ValueError
+        If energy is outside of the trimmed energies
+
+    """
+    energies = np.asarray(energies)
+    if len(energies) == 1 and energy == energies[0]:
+        return dacs[0].copy(), trimbits[0].copy()
+    if energy < energies.min() or energy > energies.max():
+        raise ValueError('Energy {} outside of trimmed range {}-{}'.format(energy,
+                                                                          energies.min(),
+                                                                          energies.max()))
+    order = np.argsort(energies)
+    energies = energies[order]
+    i = min(np.searchsorted(energies, energy, side='right'), len(energies) - 1)
+    i = max(i, 1)
+    lo, hi = order[i - 1], order[i]
+    f = (energy - energies[i - 1]) / (energies[i] - energies[i - 1])
+    out_dacs = np.rint(dacs[lo] + f * (dacs[hi] - dacs[lo])).astype(np.int32)
+    out_tb = np.rint(trimbits[lo] + f * (trimbits[hi] - trimbits[lo])).astype(np.int32)
+    return out_dacs, out_tb
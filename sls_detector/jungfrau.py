@@ -5,7 +5,7 @@ Jungfrau detector class and support functions.
 Inherits from Detector.
 """
 from .adcs import Adc, DetectorAdcs
-from .decorators import error_handling
+from .decorators import error_handling, lazy_property
 from .detector import Detector
 from .dacs import DetectorDacs
 from .utils import element_if_equal
@@ -39,15 +39,20 @@ class Jungfrau(Detector):
                  'forceswitchg2']
     """Available settings for Jungfrau"""
 
-    def __init__(self, multi_id=0):
+    def __init__(self, multi_id=0, api=None):
         #Init on base calss
-        super().__init__(multi_id)
-        self._dacs = JungfrauDacs(self)
+        super().__init__(multi_id, api)
 
+    @lazy_property
+    def _dacs(self):
+        return JungfrauDacs(self)
+
+    @lazy_property
+    def _temp(self):
         #Jungfrau specific temps, this can be reduced to a single value?
-        self._temp = DetectorAdcs()
-        self._temp.fpga = Adc('temp_fpga', self)
-        # self._register = Register(self)
+        temp = DetectorAdcs(self)
+        temp.fpga = Adc('temp_fpga', self)
+        return temp
 
 
     @property
@@ -7,8 +7,8 @@ from .utils import element_if_equal
 from .adcs import DetectorAdcs, Adc
 from .dacs import DetectorDacs
 from .detector_property import DetectorProperty
-from .decorators import error_handling
-from .registers import Register, Adc_register
+from .decorators import error_handling, lazy_property
+from .registers import Adc_register
 
 class JungfrauCTBDacs(DetectorDacs):
     _dacs = [('dac0',  0, 4000,    1400),
@@ -35,11 +35,16 @@ class JungfrauCTBDacs(DetectorDacs):
 
 
 class JungfrauCTB(Detector):
-    def __init__(self, id = 0):
-        super().__init__(id)
-        self._dacs = JungfrauCTBDacs(self)
-        self._register = Register(self)
-        self._adc_register = Adc_register(self)
+    def __init__(self, id = 0, api=None):
+        super().__init__(id, api)
+
+    @lazy_property
+    def _dacs(self):
+        return JungfrauCTBDacs(self)
+
+    @lazy_property
+    def _adc_register(self):
+        return Adc_register(self)
 
     @property
     def v_a(self):
@@ -155,6 +160,23 @@ class JungfrauCTB(Detector):
     def samples(self, value):
         self._api.setJCTBSamples(value)
 
+    def decoder(self, adc_mask=0xffffffff, **kwargs):
+        """
+        CTBDecoder for frames with the current number of samples, the
+        remaining keyword arguments are passed on to CTBDecoder
+
+        Examples
+        ---------
+
+        ::
+
+            decoder = d.decoder(adc_mask = 0xff, bits = [0, 1, 2])
+            data = decoder.decode(buffer)
+
+        """
+        from .ctb_decoder import CTBDecoder
+        return CTBDecoder(self.samples, adc_mask, **kwargs)
+
     @property
     @error_handling
     def readout_clock(self):
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Conversion of raw Jungfrau frames to energy. Each pixel is stored as a
+16 bit word with the gain in the two highest bits and the ADC value in the
+lower 14 bits. Gain bits 00 is G0, 01 is G1 and 11 is G2, the combination
+10 does not occur and is treated as G2.
+
+::
+
+    from sls_detector.jungfrau_processing import JungfrauCalibration
+
+    #gain in ADU/keV as [gain, row, col], from the calibration files
+    cal = JungfrauCalibration(gain)
+
+    #pedestal from dark frames, taken with dynamicgain, fixgain1 and fixgain2
+    cal.update_pedestal(dark_g0)
+    cal.update_pedestal(dark_g1)
+    cal.update_pedestal(dark_g2)
+
+    energy = cal.correct(frames)
+
+    #keep following the pedestal during the measurement
+    cal.update_pedestal(frames[is_dark])
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+#Number of pixels processed at a time, the float32 temporaries fit in L2
+_chunk_size = 1 << 16
+
+#If more pixels than this fraction of a chunk switched gain, look up the
+#values for all pixels instead of patching the switched ones
+_switched_max = 1 / 8
+
+#Index in the [gain, pixel] maps for each value of the gain bits
+_gain_index = np.array([0, 1, 2, 2], dtype=np.uint8)
+
+_adc_mask = 0x3fff
+
+
+def decode_gain(frames, out=None):
+    """
+    Gain of each pixel as 0, 1 or 2 for G0, G1 and G2
+
+    Parameters
+    -----------
+    frames: numpy.ndarray
+        Raw uint16 frames
+    out: numpy.ndarray
+        Optional uint8 array with the shape of frames
+
+    """
+    frames = np.asarray(frames, dtype=np.uint16)
+    bits = np.right_shift(frames, 14)
+    return np.take(_gain_index, bits, out=out)
+
+
+def decode_adc(frames, out=None):
+    """
+    ADC value of each pixel, the raw value without the gain bits
+
+    Parameters
+    -----------
+    frames: numpy.ndarray
+        Raw uint16 frames
+    out: numpy.ndarray
+        Optional array with the shape of frames, can be frames itself to
+        decode in place
+
+    """
+    frames = np.asarray(frames, dtype=np.uint16)
+    return np.bitwise_and(frames, _adc_mask, out=out)
+
+
+def _gain_table(per_gain, dtype=np.float32):
+    """
+    [gain, row, col] map to a [4, pixel] table indexed by the raw gain
+    bits, with the G2 value also at the unused position 2
+    """
+    per_gain = np.asarray(per_gain, dtype=dtype)
+    return np.stack([per_gain[g].reshape(-1) for g in _gain_index])
+
+
+class JungfrauCalibration:
+    """
+    Per pixel and per gain pedestal and gain maps for one Jungfrau module,
+    or any detector with the same data format. The pedestal can be set
+    directly or followed with update_pedestal from dark frames.
+
+    Parameters
+    -----------
+    gain: numpy.ndarray
+        Gain in ADU/keV as [gain, row, col] for G0, G1 and G2. Use a gain
+        of 1 to get the pedestal subtracted ADU.
+    pedestal: numpy.ndarray
+        Pedestal in ADU as [gain, row, col], by default 0 until it is
+        measured with update_pedestal
+    alpha: float
+        Weight of a new dark frame in the running pedestal. For the first
+        1/alpha dark frames of a pixel the plain mean is used instead.
+
+    """
+    def __init__(self, gain, pedestal=None, alpha=1/1024):
+        gain = np.asarray(gain, dtype=np.float64)
+        if gain.ndim != 3 or gain.shape[0] != 3:
+            raise ValueError('gain should be [gain, row, col] with 3 gains')
+        self.shape = gain.shape[1:]
+        self.n_pixels = gain[0].size
+        self.alpha = alpha
+        self._inverse_gain = _gain_table(1 / gain)
+
+        if pedestal is None:
+            self._pedestal = np.zeros((4, self.n_pixels))
+            self._n_dark = np.zeros((4, self.n_pixels), dtype=np.int64)
+        else:
+            pedestal = np.asarray(pedestal)
+            if pedestal.shape != gain.shape:
+                raise ValueError('pedestal should have the same shape as gain')
+            self._pedestal = _gain_table(pedestal, np.float64)
+            #a given pedestal is only updated with alpha
+            self._n_dark = np.full((4, self.n_pixels), np.iinfo(np.int64).max // 2)
+        self._offset = None
+
+    @property
+    def pedestal(self):
+        """Current pedestal as [gain, row, col]"""
+        return self._pedestal[[0, 1, 3]].reshape((3,) + self.shape)
+
+    @property
+    def n_dark(self):
+        """Number of dark frames in the pedestal of each pixel as [gain, row, col]"""
+        return self._n_dark[[0, 1, 3]].reshape((3,) + self.shape)
+
+    def _check(self, frames):
+        frames = np.asarray(frames)
+        if frames.dtype != np.uint16:
+            raise TypeError('Expected raw uint16 frames, got {}'.format(frames.dtype))
+        if frames.shape[-2:] != self.shape:
+            raise ValueError('Expected frames of size {} got {}'.format(self.shape,
+                                                                        frames.shape[-2:]))
+        return frames
+
+    def _chunks(self, frames, *arrays):
+        """Yield the pixel offset and matching flat chunks of frames and arrays"""
+        src = frames.reshape(-1, self.n_pixels)
+        dst = [a.reshape(-1, self.n_pixels) for a in arrays]
+        for f in range(len(src)):
+            for i in range(0, self.n_pixels, _chunk_size):
+                j = min(i + _chunk_size, self.n_pixels)
+                yield (i, src[f, i:j]) + tuple(d[f, i:j] for d in dst)
+
+    def correct(self, frames, out=None, n_threads=1):
+        """
+        Convert raw frames to energy, (adc - pedestal[gain]) / gain[gain]
+        for each pixel, processed in chunks that stay in cache. Pixels in
+        G0 are converted with contiguous operations and only the pixels that
+        switched gain are looked up in the G1 and G2 maps.
+
+        Parameters
+        -----------
+        frames: numpy.ndarray
+            Raw uint16 frames as [row, col] or [frame, row, col]
+        out: numpy.ndarray
+            Contiguous float32 array with the shape of frames to write the
+            energy to, reuse it between calls to avoid allocations. By
+            default a new array is returned.
+        n_threads: int
+            Number of threads to split the frames over, numpy releases the
+            GIL so this scales with the number of cores
+
+        Returns
+        --------
+        numpy.ndarray
+            Energy in keV as float32
+
+        Examples
+        ---------
+
+        ::
+
+            out = np.empty((1000, 512, 1024), dtype = np.float32)
+            cal.correct(frames, out = out, n_threads = 8)
+
+        """
+        frames = self._check(frames)
+        if out is None:
+            out = np.empty(frames.shape, dtype=np.float32)
+        elif out.shape != frames.shape or out.dtype != np.float32 or not out.flags.c_contiguous:
+            raise ValueError('out should be a contiguous float32 array with the shape of frames')
+        if self._offset is None:
+            #pedestal/gain, updated lazily after the pedestal changed
+            self._offset = (self._pedestal * self._inverse_gain).astype(np.float32)
+
+        src = frames.reshape(-1, self.n_pixels)
+        dst = out.reshape(-1, self.n_pixels)
+        n_threads = min(n_threads, len(src))
+        if n_threads <= 1:
+            self._correct(src, dst)
+        else:
+            edges = np.linspace(0, len(src), n_threads + 1).astype(int)
+            with ThreadPoolExecutor(max_workers=n_threads) as executor:
+                futures = [executor.submit(self._correct, src[a:b], dst[a:b])
+                           for a, b in zip(edges[:-1], edges[1:])]
+                for f in futures:
+                    f.result()
+        return out
+
+    def _correct(self, frames, out):
+        inverse_gain = self._inverse_gain
+        offset = self._offset
+        flat_inverse_gain = inverse_gain.reshape(-1)
+        flat_offset = offset.reshape(-1)
+        base = np.arange(_chunk_size, dtype=np.intp)
+        index = np.empty(_chunk_size, dtype=np.intp)
+        switched = np.empty(_chunk_size, dtype=bool)
+        buf = np.empty(_chunk_size, dtype=np.float32)
+
+        for i, raw, e in self._chunks(frames, out):
+            n = len(raw)
+            j = i + n
+            np.bitwise_and(raw, _adc_mask, out=e, casting='unsafe')
+            np.greater(raw, _adc_mask, out=switched[:n])
+            nz = np.flatnonzero(switched[:n])
+            if len(nz) > n * _switched_max:
+                #many pixels switched, look up all of them
+                idx = index[:n]
+                tmp = buf[:n]
+                np.right_shift(raw, 14, out=idx, casting='unsafe')
+                np.multiply(idx, self.n_pixels, out=idx)
+                np.add(idx, base[:n], out=idx)
+                np.add(idx, i, out=idx)
+                np.take(flat_inverse_gain, idx, out=tmp)
+                np.multiply(e, tmp, out=e)
+                np.take(flat_offset, idx, out=tmp)
+                np.subtract(e, tmp, out=e)
+                continue
+
+            np.multiply(e, inverse_gain[0, i:j], out=e)
+            np.subtract(e, offset[0, i:j], out=e)
+            if len(nz):
+                r = raw[nz]
+                idx = np.right_shift(r, 14).astype(np.intp)
+                idx *= self.n_pixels
+                idx += nz
+                idx += i
+                e[nz] = (r & _adc_mask) * flat_inverse_gain[idx] - flat_offset[idx]
+
+    def update_pedestal(self, frames):
+        """
+        Update the pedestal from dark frames. Each pixel updates the
+        pedestal of the gain it was read out in, as
+        pedestal += a * (adc - pedestal) with a = max(alpha, 1/n) where n is
+        the number of dark frames seen by the pixel in that gain.
+
+        Parameters
+        -----------
+        frames: numpy.ndarray
+            Raw uint16 dark frames as [row, col] or [frame, row, col]
+
+        """
+        frames = self._check(frames)
+        flat_pedestal = self._pedestal.reshape(-1)
+        flat_n_dark = self._n_dark.reshape(-1)
+        base = np.arange(_chunk_size, dtype=np.intp)
+        bits = np.empty(_chunk_size, dtype=np.uint16)
+        index = np.empty(_chunk_size, dtype=np.intp)
+        adc = np.empty(_chunk_size)
+        weight = np.empty(_chunk_size)
+
+        for i, raw in self._chunks(frames):
+            n = len(raw)
+            b = bits[:n]
+            idx = index[:n]
+            a = adc[:n]
+            w = weight[:n]
+            #gain bits 10 update the G2 pedestal at position 3
+            np.right_shift(raw, 14, out=b)
+            np.bitwise_or(b, np.right_shift(b, 1), out=b)
+            np.copyto(idx, b, casting='unsafe')
+            np.multiply(idx, self.n_pixels, out=idx)
+            np.add(idx, base[:n], out=idx)
+            np.add(idx, i, out=idx)
+
+            #every pixel occurs once per chunk so the updates do not collide
+            count = flat_n_dark[idx] + 1
+            flat_n_dark[idx] = count
+            np.divide(1, count, out=w)
+            np.maximum(w, self.alpha, out=w)
+            np.bitwise_and(raw, _adc_mask, out=a, casting='unsafe')
+            p = flat_pedestal[idx]
+            np.subtract(a, p, out=a)
+            np.multiply(a, w, out=a)
+            np.add(p, a, out=p)
+            flat_pedestal[idx] = p
+        self._pedestal[2] = self._pedestal[3]
+        self._n_dark[2] = self._n_dark[3]
+        self._offset = None
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Record and replay of DetectorApi calls. A session is recorded with
+Detector.start_trace(record='session.trace') and can later be replayed
+without hardware, either by running the same Python code against a
+ReplayApi or by sending the recorded calls to another api.
+
+::
+
+    #At the beamline
+    d.start_trace(record='scan.trace.gz')
+    run_scan(d)
+    d.stop_trace()
+
+    #Offline, rerun the Python code with the recorded return values
+    d = Eiger(api=ReplayApi('scan.trace.gz', timing='recorded'))
+    run_scan(d)
+
+    #or send the recorded calls to a simulated detector
+    replay('scan.trace.gz', SimulatedDetectorApi(), timing='recorded')
+
+The trace is a binary file with a small header followed by one record per
+call: function, start time, duration, arguments and return value. Files
+ending in .gz are compressed.
+"""
+import gzip
+import struct
+import time
+from collections import Counter, defaultdict, deque, namedtuple
+
+import numpy as np
+
+TraceCall = namedtuple('TraceCall', ['name', 'args', 'start', 'duration',
+                                     'result', 'error'])
+
+_magic = b'SLSAPI\x00\x01'
+_call = struct.Struct('<Hdd')
+
+
+class ReplayError(Exception):
+    """The replayed code made a call that is not in the trace"""
+    pass
+
+
+def _open(fname, mode):
+    if fname.endswith('.gz'):
+        return gzip.open(fname, mode)
+    return open(fname, mode)
+
+
+def _encode(value, out):
+    """Append the tagged binary representation of value to out"""
+    if value is None:
+        out += b'n'
+    elif isinstance(value, (bool, np.bool_)):
+        out += b't' if value else b'f'
+    elif isinstance(value, (int, np.integer)):
+        out += b'i' + struct.pack('<q', value)
+    elif isinstance(value, (float, np.floating)):
+        out += b'd' + struct.pack('<d', value)
+    elif isinstance(value, str):
+        b = value.encode()
+        out += b's' + struct.pack('<I', len(b)) + b
+    elif isinstance(value, (list, tuple)):
+        out += (b'l' if isinstance(value, list) else b'u') + struct.pack('<I', len(value))
+        for v in value:
+            _encode(v, out)
+    elif isinstance(value, np.ndarray):
+        dt = value.dtype.str.encode()
+        out += b'a' + struct.pack('<BB', len(dt), value.ndim) + dt
+        out += struct.pack('<{}Q'.format(value.ndim), *value.shape)
+        out += np.ascontiguousarray(value).tobytes()
+    else:
+        raise TypeError('Cannot store {} in a trace'.format(type(value).__name__))
+
+
+def _encode_or_repr(value, out):
+    """
+    Encode value, or its repr if it can not be stored, so that recording
+    never fails. Returns False if the repr was used.
+    """
+    tmp = bytearray()
+    try:
+        _encode(value, tmp)
+    except (TypeError, ValueError, OverflowError, struct.error):
+        _encode(repr(value), out)
+        return False
+    out += tmp
+    return True
+
+
+def _decode(buf, pos):
+    """Decode one value from buf at pos, returns (value, new pos)"""
+    tag = buf[pos:pos+1]
+    pos += 1
+    if tag == b'n':
+        return None, pos
+    if tag == b't':
+        return True, pos
+    if tag == b'f':
+        return False, pos
+    if tag == b'i':
+        return struct.unpack_from('<q', buf, pos)[0], pos + 8
+    if tag == b'd':
+        return struct.unpack_from('<d', buf, pos)[0], pos + 8
+    if tag == b's':
+        n = struct.unpack_from('<I', buf, pos)[0]
+        pos += 4
+        return bytes(buf[pos:pos+n]).decode(), pos + n
+    if tag in (b'l', b'u'):
+        n = struct.unpack_from('<I', buf, pos)[0]
+        pos += 4
+        items = []
+        for _ in range(n):
+            v, pos = _decode(buf, pos)
+            items.append(v)
+        return (items if tag == b'l' else tuple(items)), pos
+    if tag == b'a':
+        n_dt, ndim = struct.unpack_from('<BB', buf, pos)
+        pos += 2
+        dt = np.dtype(bytes(buf[pos:pos+n_dt]).decode())
+        pos += n_dt
+        shape = struct.unpack_from('<{}Q'.format(ndim), buf, pos)
+        pos += 8 * ndim
+        n = int(np.prod(shape)) * dt.itemsize
+        arr = np.frombuffer(buf[pos:pos+n], dtype=dt).reshape(shape).copy()
+        return arr, pos + n
+    raise ValueError('Corrupt trace, unknown tag {!r}'.format(tag))
+
+
+class TraceWriter:
+    """
+    Writes calls to a trace file. Function names are stored once and
+    referred to by index afterwards. start is given as time.perf_counter()
+    and stored relative to the creation of the writer.
+
+    Arguments and return values that can not be stored are written as
+    their repr, counted in n_repr.
+    """
+    def __init__(self, fname):
+        self._f = _open(fname, 'wb')
+        self._f.write(_magic)
+        self._names = {}
+        self._t0 = time.perf_counter()
+        self.n_repr = 0
+
+    def write(self, name, args, start, duration, result=None, error=None):
+        #encoded before the name is registered, nothing is kept on failure
+        body = bytearray(b'u' + struct.pack('<I', len(args)))
+        n = sum(not _encode_or_repr(a, body) for a in args)
+        if error is not None:
+            _encode_or_repr(str(error), body)
+        else:
+            n += not _encode_or_repr(result, body)
+
+        out = bytearray()
+        i = self._names.get(name, len(self._names))
+        if i == len(self._names):
+            b = name.encode()
+            out += b'N' + struct.pack('<HB', i, len(b)) + b
+        out += b'E' if error is not None else b'C'
+        out += _call.pack(i, start - self._t0, duration)
+        out += body
+        self._f.write(out)
+        self._names[name] = i
+        self.n_repr += n
+
+    def close(self):
+        self._f.close()
+
+
+def read_trace(fname):
+    """
+    Read a trace file into a list of TraceCall(name, args, start,
+    duration, result, error). error is the message if the call raised.
+    """
+    with _open(fname, 'rb') as f:
+        buf = memoryview(f.read())
+    if bytes(buf[:len(_magic)]) != _magic:
+        raise ValueError('{} is not a DetectorApi trace'.format(fname))
+
+    names = {}
+    calls = []
+    pos = len(_magic)
+    while pos < len(buf):
+        tag = buf[pos:pos+1]
+        pos += 1
+        if tag == b'N':
+            i, n = struct.unpack_from('<HB', buf, pos)
+            pos += 3
+            names[i] = bytes(buf[pos:pos+n]).decode()
+            pos += n
+        elif tag in (b'C', b'E'):
+            i, start, duration = _call.unpack_from(buf, pos)
+            pos += _call.size
+            args, pos = _decode(buf, pos)
+            value, pos = _decode(buf, pos)
+            if tag == b'E':
+                calls.append(TraceCall(names[i], args, start, duration, None, value))
+            else:
+                calls.append(TraceCall(names[i], args, start, duration, value, None))
+        else:
+            raise ValueError('Corrupt trace, unknown record {!r}'.format(tag))
+    return calls
+
+
+def _key(name, args):
+    """Hashable key for a call, numpy and Python numbers compare equal"""
+    out = bytearray()
+    _encode(tuple(args), out)
+    return name, bytes(out)
+
+
+class ReplayApi:
+    """
+    Stub DetectorApi that answers calls with the return values from a
+    trace. Pass it to Detector, Eiger etc. with the api keyword.
+
+    A call is matched on function and arguments and gets the recorded
+    results in order, once they are used up the last one is repeated.
+    Calls with arguments that are not in the trace get the last result of
+    the same function, so the Python code can change between recording
+    and replay. Functions that are not in the trace at all return None
+    and are counted in missing. Recorded exceptions are raised as
+    RuntimeError.
+
+    Parameters
+    -----------
+    trace:
+        file name or list of TraceCall
+    timing: str
+        'full' returns immediately, 'recorded' sleeps for the recorded
+        duration of each call
+    strict: bool
+        Require the calls to come in the recorded order with the same
+        arguments, raises ReplayError otherwise
+
+    """
+    def __init__(self, trace, timing='full', strict=False):
+        if timing not in ('full', 'recorded'):
+            raise ValueError("timing should be 'full' or 'recorded'")
+        if isinstance(trace, str):
+            trace = read_trace(trace)
+        self.timing = timing
+        self.strict = strict
+        self._trace = list(trace)
+        self._position = 0
+        self._by_key = defaultdict(deque)
+        self._last_by_name = {}
+        self._last_by_key = {}
+        self.missing = Counter()
+        for c in self._trace:
+            self._by_key[_key(c.name, c.args)].append(c)
+            self._last_by_name[c.name] = c
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        def call(*args):
+            return self._replay(name, args)
+        self.__dict__[name] = call
+        return call
+
+    def _next(self, name, args):
+        if self.strict:
+            if self._position >= len(self._trace):
+                raise ReplayError('Trace exhausted at {}{}'.format(name, args))
+            c = self._trace[self._position]
+            if _key(c.name, c.args) != _key(name, args):
+                raise ReplayError('Call {} was {}{} expected {}{}'.format(
+                    self._position, name, tuple(args), c.name, c.args))
+            self._position += 1
+            return c
+
+        if name not in self._last_by_name:
+            self.missing[name] += 1
+            return None
+        key = _key(name, args)
+        queue = self._by_key.get(key)
+        if queue:
+            c = queue.popleft()
+            self._last_by_key[key] = c
+            return c
+        return self._last_by_key.get(key, self._last_by_name[name])
+
+    def _replay(self, name, args):
+        c = self._next(name, args)
+        if c is None:
+            return None
+        if self.timing == 'recorded':
+            time.sleep(c.duration)
+        if c.error is not None:
+            raise RuntimeError(c.error)
+        return c.result
+
+
+def replay(trace, api, timing='full'):
+    """
+    Send the calls in trace to api, for example a SimulatedDetectorApi.
+    With timing='recorded' each call is issued at its recorded start time.
+    Errors raised by api are collected rather than stopping the replay.
+
+    Returns
+    --------
+    elapsed: float
+        Time in seconds for the replay
+    errors: list
+        (TraceCall, exception) for calls that raised
+
+    """
+    if timing not in ('full', 'recorded'):
+        raise ValueError("timing should be 'full' or 'recorded'")
+    if isinstance(trace, str):
+        trace = read_trace(trace)
+    errors = []
+    t0 = time.perf_counter()
+    for c in trace:
+        if timing == 'recorded':
+            delay = c.start - (time.perf_counter() - t0)
+            if delay > 0:
+                time.sleep(delay)
+        try:
+            getattr(api, c.name)(*c.args)
+        except Exception as e:
+            errors.append((c, e))
+    return time.perf_counter() - t0, errors
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Scans of a detector setting such as threshold, dacs or exposure time.
+A scan is described by a ScanPlan and run with run_scan, which sets the
+value for each point in a batch, acquires and optionally collects the
+streamed frames into a numpy array.
+
+::
+
+    from sls_detector.scan import ScanPlan, run_scan
+    from sls_detector.stream import StreamReceiver
+
+    plan = ScanPlan('vthreshold', range(0, 2000, 200), frames = 10,
+                    file_name = 'th_scan_{value}')
+
+    with StreamReceiver(d) as s:
+        result = run_scan(d, plan, receiver = s)
+
+    #summed image for each threshold as [point, row, col]
+    result.data.shape
+    >> (10, 512, 1024)
+
+    print(result.summary())
+
+While a point is acquired the frames of the previous point are still being
+processed in a background thread, so the configuration of the next point
+does not have to wait for the data handling.
+"""
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+StepTiming = namedtuple('StepTiming', ['index', 'value', 'configure', 'acquire', 'process'])
+
+
+class ScanPlan:
+    """
+    Description of a scan
+
+    Parameters
+    -----------
+    parameter: str or callable
+        Property to scan, for example 'vthreshold', 'exposure_time' or
+        'dacs.vrf'. A function is called as parameter(detector, value).
+    values:
+        Values to scan over, one point per value
+    frames: int
+        Number of frames per point
+    file_name: str
+        Optional file name per point, formatted with index and value
+        for example 'scan_{index:03d}'
+
+    """
+    def __init__(self, parameter, values, frames=1, file_name=None):
+        if frames < 1:
+            raise ValueError('frames should be at least 1')
+        self.parameter = parameter
+        self.values = list(values)
+        self.frames = frames
+        self.file_name = file_name
+
+    def __len__(self):
+        return len(self.values)
+
+    def __repr__(self):
+        name = getattr(self.parameter, '__name__', self.parameter)
+        return 'ScanPlan({}, {} points, {} frames)'.format(name, len(self), self.frames)
+
+    def setter(self, detector):
+        """Function that sets the scanned parameter on detector"""
+        if callable(self.parameter):
+            return lambda value: self.parameter(detector, value)
+        *path, name = self.parameter.split('.')
+        obj = detector
+        for p in path:
+            obj = getattr(obj, p)
+        if not hasattr(obj, name):
+            raise ValueError('Unknown parameter: {}'.format(self.parameter))
+        return lambda value: setattr(obj, name, value)
+
+
+class ScanResult:
+    """
+    Result of run_scan
+
+    Attributes
+    -----------
+    plan: ScanPlan
+        The plan that was run
+    data: numpy.ndarray
+        Collected frames, None if no receiver was given
+    timing: list
+        StepTiming(index, value, configure, acquire, process) in seconds for
+        each point. process is the time spent on the frames and callback in
+        the background thread.
+    elapsed: float
+        Total time of the scan in seconds
+
+    """
+    def __init__(self, plan, data):
+        self.plan = plan
+        self.data = data
+        self.timing = []
+        self.elapsed = 0.
+
+    def summary(self):
+        """Table with the time per point and the totals"""
+        lines = ['{:>6s} {:>12s} {:>14s} {:>12s} {:>12s}'.format(
+            'point', 'value', 'configure [s]', 'acquire [s]', 'process [s]')]
+        for s in self.timing:
+            lines.append('{:6d} {:>12s} {:14.4f} {:12.4f} {:12.4f}'.format(
+                s.index, str(s.value), s.configure, s.acquire, s.process))
+        lines.append('{:>6s} {:>12s} {:14.4f} {:12.4f} {:12.4f}'.format(
+            'total', '', sum(s.configure for s in self.timing),
+            sum(s.acquire for s in self.timing), sum(s.process for s in self.timing)))
+        lines.append('elapsed: {:.4f} s'.format(self.elapsed))
+        return '\n'.join(lines)
+
+
+def _collect(receiver, out, sum_frames):
+    """Read the frames of one point from the receiver into out"""
+    n = 0
+    while True:
+        if sum_frames:
+            frame = receiver.read_frame()
+        else:
+            frame = receiver.read_frame(out[n] if n < len(out) else None)
+        if frame is None:
+            return n
+        if sum_frames:
+            out += frame.data
+        n += 1
+
+
+def run_scan(detector, plan, receiver=None, collect='sum', out=None, callback=None):
+    """
+    Run a scan. For each point the parameter (and file name) is set inside
+    a Detector.batch() so the error mask is checked once per point, then
+    the point is acquired with acq(). Frames from the receiver and the
+    callback are handled in a background thread, overlapping with the
+    configuration and acquisition of the next point.
+
+    Parameters
+    -----------
+    detector:
+        Detector, Eiger etc.
+    plan: ScanPlan
+        What to scan
+    receiver: StreamReceiver
+        Connected stream to collect the frames from, optional
+    collect: str
+        'sum' for one summed image per point, [point, row, col], or
+        'frames' to keep all frames, [point, frame, row, col]
+    out: numpy.ndarray
+        Preallocated array with the shape above to collect into, by
+        default one is allocated (uint64 for 'sum')
+    callback:
+        Called as callback(index, value, data) in the background thread
+        after the frames of a point have been collected, data is the slice
+        of the collected array or None without receiver. The next point
+        may already be configured, use value rather than reading the
+        detector.
+
+    Returns
+    --------
+    ScanResult
+
+    """
+    if collect not in ('sum', 'frames'):
+        raise ValueError("collect should be 'sum' or 'frames'")
+    sum_frames = collect == 'sum'
+    if receiver is not None:
+        if sum_frames:
+            shape, dtype = (len(plan),) + receiver.image_size, np.uint64
+        else:
+            shape, dtype = (len(plan), plan.frames) + receiver.image_size, receiver.dtype
+        if out is None:
+            out = np.zeros(shape, dtype=dtype)
+        elif out.shape != shape:
+            raise ValueError('out should have shape {}'.format(shape))
+        elif sum_frames:
+            out[:] = 0
+
+    result = ScanResult(plan, out)
+    process_time = [0.] * len(plan)
+
+    def process(i, value):
+        t0 = time.perf_counter()
+        data = None
+        if receiver is not None:
+            data = out[i]
+            _collect(receiver, data, sum_frames)
+        if callback is not None:
+            callback(i, value, data)
+        process_time[i] = time.perf_counter() - t0
+
+    set_value = plan.setter(detector)
+    t_start = time.perf_counter()
+    futures = []
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        with detector.batch():
+            detector.n_frames = plan.frames
+        for i, value in enumerate(plan.values):
+            #stop early if processing of an earlier point failed
+            for f in futures:
+                if f.done() and f.exception() is not None:
+                    f.result()
+
+            t0 = time.perf_counter()
+            with detector.batch():
+                set_value(value)
+                if plan.file_name is not None:
+                    detector.file_name = plan.file_name.format(index=i, value=value)
+            t1 = time.perf_counter()
+            if receiver is not None or callback is not None:
+                #the worker reads the stream while acq() runs
+                futures.append(executor.submit(process, i, value))
+            detector.acq()
+            t2 = time.perf_counter()
+            result.timing.append((i, value, t1 - t0, t2 - t1))
+
+        for f in futures:
+            f.result()
+    result.elapsed = time.perf_counter() - t_start
+    result.timing = [StepTiming(*t, process=process_time[t[0]]) for t in result.timing]
+    return result
@@ -0,0 +1,884 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pure Python stand-in for the compiled DetectorApi. Models a multi detector
+with any number of Eiger, Jungfrau or JungfrauCTB modules so that the
+Python layer can be tested, benchmarked and profiled without hardware or
+shared memory.
+
+::
+
+    from sls_detector import Eiger
+    from sls_detector.sim import SimulatedDetectorApi
+
+    api = SimulatedDetectorApi(n_modules=64, latency=100e-6)
+    d = Eiger(api=api)
+    d.dacs
+    api.calls['getDacs']
+    >> 1
+
+The simulated API only keeps state, it does not model the behaviour of the
+detector beyond what is needed to keep the Python layer consistent (image
+size follows the number of modules, acq counts frames etc.).
+"""
+import functools
+import re
+import time
+from collections import Counter
+
+import numpy as np
+
+from .eiger import EigerDacs
+from .io.trimbits import read_trimbit_file
+from .jungfrau import JungfrauDacs
+from .jungfrau_ctb import JungfrauCTBDacs
+
+#Per type: (module shape [rows, cols], dacs, adcs, hostname prefix)
+_detector_types = {
+    'Eiger': ((256, 1024), EigerDacs._dacs,
+              ['temp_fpga', 'temp_fpgaext', 'temp_10ge', 'temp_dcdc',
+               'temp_sodl', 'temp_sodr', 'temp_fpgafl', 'temp_fpgafr'],
+              'beb'),
+    'Jungfrau': ((512, 1024), JungfrauDacs._dacs, ['temp_fpga'], 'bchip'),
+    'JungfrauCTB': ((1, 32), JungfrauCTBDacs._dacs, ['temp_fpga'], 'ctb'),
+}
+
+_network_parameters = ['detectormac', 'detectorip', 'rx_hostname', 'rx_udpip',
+                       'rx_udpport', 'rx_udpmac', 'rx_udpport2', 'delay_left',
+                       'delay_right', 'delay_frame', 'flow_control_10g',
+                       'client_zmqport', 'rx_zmqport']
+
+_readout_flags = ['storeinram', 'tot', 'continous', 'parallel', 'nonparallel',
+                  'safe', 'digital', 'analog_digital']
+_exclusive_flags = [('parallel', 'nonparallel', 'safe'),
+                    ('digital', 'analog_digital')]
+
+_timing_modes = ['auto', 'trigger', 'ro_trigger', 'gating', 'triggered_gating']
+
+_vthreshold = ['vcmp_ll', 'vcmp_lr', 'vcmp_rl', 'vcmp_rr']
+
+
+def _common(values):
+    """Value if all modules agree otherwise -1, like the multi detector"""
+    values = list(values)
+    if values and all(v == values[0] for v in values):
+        return values[0]
+    return -1
+
+
+class _Module:
+    """State of a single module"""
+    def __init__(self, index, hostname, detector_type):
+        shape, dacs, adcs, _ = _detector_types[detector_type]
+        self.hostname = hostname
+        digits = re.search(r'(\d+)$', hostname)
+        self.detector_number = int(digits.group(1)) if digits else index
+        self.module_shape = shape
+        self.dacs = {d[0]: d[3] for d in dacs}
+        self.dacs_mV = {}
+        #Temperatures in millidegree, slightly different per adc and module
+        self.adcs = {name: 40000 + 500*j + 100*index for j, name in enumerate(adcs)}
+        self.active = True
+        self.flipped_x = bool(index % 2) if detector_type == 'Eiger' else False
+        self.flipped_y = False
+        self.rx_tcpport = 1954 + index
+        self.network = {'detectormac': '00:aa:bb:cc:dd:{:02x}'.format(index % 256),
+                        'detectorip': '10.1.1.{}'.format(100 + index % 150),
+                        'rx_hostname': 'localhost',
+                        'rx_udpip': '10.1.1.1',
+                        'rx_udpmac': '00:11:22:33:44:55',
+                        'rx_udpport': str(50001 + 2*index),
+                        'rx_udpport2': str(50002 + 2*index),
+                        'delay_left': '0',
+                        'delay_right': '0',
+                        'delay_frame': '0',
+                        'flow_control_10g': '1',
+                        'client_zmqport': str(30001 + 2*index),
+                        'rx_zmqport': str(30001 + 2*index)}
+        self.tau = 0.
+        self.frames_caught = 0
+        self.trimbits = None
+
+    def get_trimbits(self):
+        if self.trimbits is None:
+            self.trimbits = np.zeros(self.module_shape, dtype=np.uint8)
+        return self.trimbits
+
+
+def _api_call(name, func):
+    """Count the call, add the latency and apply injected errors"""
+    @functools.wraps(func)
+    def call(self, *args):
+        self.calls[name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if name in self._injected:
+            self._apply_injected(name)
+        return func(self, *args)
+    return call
+
+
+class SimulatedDetectorApi:
+    """
+    Simulated multi detector implementing the same functions as
+    _sls_detector.DetectorApi. Pass it to Detector, Eiger, Jungfrau or
+    JungfrauCTB with the api keyword.
+
+    Parameters
+    -----------
+    multi_id: int
+        id returned by getMultiDetectorId
+    n_modules: int
+        Number of modules, for Eiger each half module counts as one
+    detector_type: str
+        'Eiger', 'Jungfrau' or 'JungfrauCTB'
+    latency: float
+        Time in seconds that each call takes, the sleep releases the GIL
+        just like the compiled API
+    time_scale: float
+        Scaling of the real acquisition time in acq, 0 returns immediately
+
+    Attributes
+    -----------
+    calls: collections.Counter
+        Number of calls per API function
+
+    Examples
+    ---------
+
+    ::
+
+        api = SimulatedDetectorApi(n_modules=8, detector_type='Jungfrau')
+        d = Jungfrau(api=api)
+
+        api.inject_error('getExposureTime', 'Could not read exptime')
+        d.exposure_time
+        >> DetectorError: Could not read exptime
+
+    """
+    #Functions not part of the DetectorApi, not timed or counted
+    _controls = ('inject_error', 'clear_injected_errors', 'reset_calls')
+
+    def __init__(self, multi_id=0, n_modules=2, detector_type='Eiger',
+                 latency=0, time_scale=0):
+        if detector_type not in _detector_types:
+            raise ValueError('Unknown detector type: {}'.format(detector_type))
+        self.latency = latency
+        self.time_scale = time_scale
+        self.calls = Counter()
+        self._injected = {}
+        self._multi_id = multi_id
+        self._type = detector_type
+        self._reset_state()
+        prefix = _detector_types[detector_type][3]
+        self._modules = [_Module(i, '{}{:03d}'.format(prefix, i), detector_type)
+                         for i in range(n_modules)]
+
+    def _reset_state(self):
+        self._modules = []
+        self._image_size = None
+        self._error_mask = 0
+        self._error_message = []
+        self._online = False
+        self._receiver_online = False
+        self._acquiring = False
+        self._receiver_running = False
+        self._stop = False
+        self._run_status = 'idle'
+        self._frame_index = 0
+        self._timers = {'exptime': 1000000, 'subexptime': 2621440, 'period': 0,
+                        'delay': 0, 'frames': 1, 'cycles': 1, 'measurements': 1,
+                        'gates': 0, 'samples': 1}
+        self._speed = {'clock': 1, 'dbit_pipeline': 0, 'dbit_phase': 0, 'dbit_clock': 0}
+        self._dynamic_range = 16
+        self._threshold_energy = 0
+        self._settings = 'standard' if self._type == 'Eiger' else 'dynamicgain'
+        self._settings_dir = ''
+        self._trim_energies = []
+        self._high_voltage = 0
+        self._timing_mode = 'auto'
+        self._flags = ['parallel']
+        self._file_path = '/tmp'
+        self._file_name = 'run'
+        self._file_index = 0
+        self._file_write = True
+        self._frames_per_file = 10000
+        self._registers = {}
+        self._locks = {'server': False, 'receiver': False}
+        self._bools = {'counter_bit': True, 'gap_pixels': False, 'ten_giga': False,
+                       'threaded': True, 'datastream': False, 'power_chip': False}
+        self._temperature = {'threshold': 65., 'control': False, 'event': False}
+
+    #Simulation controls
+
+    def inject_error(self, function, message='Simulated error', mask=1, count=1):
+        """
+        Set mask and message in the error mask the next count times function
+        is called. count=None keeps the error until clear_injected_errors
+        """
+        self._injected[function] = [message, mask, count]
+
+    def clear_injected_errors(self):
+        """Remove all injected errors"""
+        self._injected.clear()
+
+    def reset_calls(self):
+        """Reset the call counter"""
+        self.calls.clear()
+
+    def _apply_injected(self, name):
+        err = self._injected[name]
+        message, mask, count = err
+        self._error_mask |= mask
+        self._error_message.append(message)
+        if count is not None:
+            err[2] -= 1
+            if err[2] <= 0:
+                del self._injected[name]
+
+    def _module(self, i):
+        if 0 <= i < len(self._modules):
+            return self._modules[i]
+        raise RuntimeError('Could not get detector: {}'.format(i))
+
+    def _module_loop(self, n):
+        """Extra latency for functions that talk to each module in turn"""
+        if self.latency and n > 1:
+            time.sleep(self.latency * (n - 1))
+
+    def _modules_for(self, mod_id):
+        if mod_id == -1:
+            return self._modules
+        return [self._module(mod_id)]
+
+    #Multi detector
+
+    def getMultiDetectorId(self):
+        return self._multi_id
+
+    def freeSharedMemory(self):
+        self._reset_state()
+
+    def getNumberOfDetectors(self):
+        return len(self._modules)
+
+    def getDetectorGeometry(self):
+        return (1, len(self._modules))
+
+    def getImageSize(self):
+        if self._image_size is not None:
+            return self._image_size
+        if not self._modules:
+            return (0, 0)
+        rows, cols = self._modules[0].module_shape
+        return (rows * len(self._modules), cols)
+
+    def setImageSize(self, rows, cols):
+        self._image_size = (rows, cols)
+
+    def getModuleShape(self):
+        return self._module(0).module_shape
+
+    def getHostname(self):
+        return ''.join(m.hostname + '+' for m in self._modules)
+
+    def setHostname(self, hostname):
+        names = [h for h in hostname.split('+') if h]
+        self._modules = [_Module(i, h, self._type) for i, h in enumerate(names)]
+        self._image_size = None
+
+    def getDetectorType(self):
+        return [self._type] * len(self._modules)
+
+    def getDetectorNumber(self, i):
+        return self._module(i).detector_number
+
+    def checkOnline(self):
+        return ''
+
+    def getOnline(self):
+        return self._online
+
+    def setOnline(self, status):
+        self._online = bool(status)
+
+    def getReceiverOnline(self):
+        return self._receiver_online
+
+    def setReceiverOnline(self, status):
+        self._receiver_online = bool(status)
+
+    def getLastClientIP(self):
+        return '127.0.0.1'
+
+    def getReceiverLastClientIP(self):
+        return '127.0.0.1'
+
+    def getFirmwareVersion(self):
+        return 22
+
+    def getServerVersion(self):
+        return 0x180321
+
+    def getClientVersion(self):
+        return 0x180314
+
+    def getReceiverVersion(self):
+        return 0x180314
+
+    def readConfigurationFile(self, fname):
+        with open(fname) as f:
+            for line in f:
+                words = line.split('#')[0].split()
+                if len(words) == 2 and words[0] == 'hostname':
+                    self.setHostname(words[1])
+
+    def readParametersFile(self, fname):
+        with open(fname):
+            pass
+
+    #Errors
+
+    def clearErrorMask(self):
+        self._error_mask = 0
+        self._error_message = []
+
+    def getErrorMask(self):
+        return self._error_mask
+
+    def setErrorMask(self, i):
+        self._error_mask = i
+
+    def getErrorMessage(self):
+        return '\n'.join(self._error_message)
+
+    #Acquisition
+
+    def _frame_time(self):
+        t = max(self._timers['exptime'], self._timers['period'])
+        return t * 1e-9 * self.time_scale
+
+    def acq(self):
+        self._acquiring = True
+        self._run_status = 'running'
+        self._stop = False
+        self._frame_index = 0
+        for m in self._modules:
+            m.frames_caught = 0
+        frame_time = self._frame_time()
+        n_frames = self._timers['frames'] * self._timers['cycles']
+        for _ in range(self._timers['measurements'] * n_frames):
+            if self._stop:
+                break
+            if frame_time:
+                time.sleep(frame_time)
+            self._frame_index += 1
+            for m in self._modules:
+                if m.active:
+                    m.frames_caught += 1
+        if self._file_write:
+            self._file_index += 1
+        self._run_status = 'idle'
+        self._acquiring = False
+
+    def startAcquisition(self):
+        self._stop = False
+        self._run_status = 'running'
+
+    def stopAcquisition(self):
+        self._stop = True
+        self._run_status = 'idle'
+
+    def startReceiver(self):
+        self._receiver_running = True
+
+    def stopReceiver(self):
+        self._receiver_running = False
+
+    def getRunStatus(self):
+        return self._run_status
+
+    def getAcquiringFlag(self):
+        return self._acquiring
+
+    def setAcquiringFlag(self, flag):
+        self._acquiring = bool(flag)
+
+    def getFramesCaughtByReceiver(self, i=None):
+        if i is None:
+            return min((m.frames_caught for m in self._modules), default=0)
+        return self._module(i).frames_caught
+
+    def resetFramesCaught(self):
+        for m in self._modules:
+            m.frames_caught = 0
+
+    def getReceiverCurrentFrameIndex(self):
+        return self._frame_index
+
+    #Timers in ns and counters
+
+    def getExposureTime(self):
+        return self._timers['exptime']
+
+    def setExposureTime(self, t):
+        self._timers['exptime'] = int(t)
+
+    def getSubExposureTime(self):
+        return self._timers['subexptime']
+
+    def setSubExposureTime(self, t):
+        self._timers['subexptime'] = int(t)
+
+    def getPeriod(self):
+        return self._timers['period']
+
+    def setPeriod(self, t):
+        self._timers['period'] = int(t)
+
+    def getDelay(self):
+        return self._timers['delay']
+
+    def setDelay(self, t):
+        self._timers['delay'] = int(t)
+
+    def getNumberOfFrames(self):
+        return self._timers['frames']
+
+    def setNumberOfFrames(self, n):
+        self._timers['frames'] = int(n)
+
+    def getCycles(self):
+        return self._timers['cycles']
+
+    def setCycles(self, n):
+        self._timers['cycles'] = int(n)
+
+    def getNumberOfMeasurements(self):
+        return self._timers['measurements']
+
+    def setNumberOfMeasurements(self, n):
+        self._timers['measurements'] = int(n)
+
+    def getNumberOfGates(self):
+        return self._timers['gates']
+
+    def setNumberOfGates(self, n):
+        self._timers['gates'] = int(n)
+
+    def getJCTBSamples(self):
+        return self._timers['samples']
+
+    def setJCTBSamples(self, n):
+        self._timers['samples'] = int(n)
+
+    def getTimingMode(self):
+        return self._timing_mode
+
+    def setTimingMode(self, mode):
+        if mode in _timing_modes:
+            self._timing_mode = mode
+
+    def getReadoutClockSpeed(self):
+        return self._speed['clock']
+
+    def setReadoutClockSpeed(self, speed):
+        self._speed['clock'] = speed
+
+    def getDbitPipeline(self):
+        return self._speed['dbit_pipeline']
+
+    def setDbitPipeline(self, value):
+        self._speed['dbit_pipeline'] = value
+
+    def getDbitPhase(self):
+        return self._speed['dbit_phase']
+
+    def setDbitPhase(self, value):
+        self._speed['dbit_phase'] = value
+
+    def getDbitClock(self):
+        return self._speed['dbit_clock']
+
+    def setDbitClock(self, value):
+        self._speed['dbit_clock'] = value
+
+    def getReadoutFlags(self):
+        return list(self._flags)
+
+    def setReadoutFlag(self, flag_name):
+        if flag_name == 'none':
+            self._flags = []
+            return
+        if flag_name not in _readout_flags:
+            raise RuntimeError('Flag name not recognized')
+        for group in _exclusive_flags:
+            if flag_name in group:
+                self._flags = [f for f in self._flags if f not in group]
+        if flag_name not in self._flags:
+            self._flags.append(flag_name)
+
+    def getDynamicRange(self):
+        return self._dynamic_range
+
+    def setDynamicRange(self, dr):
+        if dr in (4, 8, 16, 32):
+            self._dynamic_range = dr
+
+    #Dacs and adcs
+
+    def _get_dac(self, name, m):
+        if name == 'vthreshold':
+            return _common(m.dacs.get(n, 0) for n in _vthreshold)
+        if name == 'vhighvoltage':
+            return self._high_voltage
+        return m.dacs.get(name, 0)
+
+    def _set_dac(self, name, m, value):
+        if name == 'vthreshold':
+            for n in _vthreshold:
+                m.dacs[n] = value
+        elif name == 'vhighvoltage':
+            self._high_voltage = value
+        else:
+            m.dacs[name] = value
+
+    def getDac(self, dac_name, mod_id):
+        return _common(self._get_dac(dac_name, m) for m in self._modules_for(mod_id))
+
+    def setDac(self, dac_name, mod_id, value):
+        for m in self._modules_for(mod_id):
+            self._set_dac(dac_name, m, value)
+
+    def getDacs(self, dac_names):
+        self._module_loop(len(self._modules))
+        data = np.empty((len(dac_names), len(self._modules)), dtype=np.int32)
+        for i, name in enumerate(dac_names):
+            for j, m in enumerate(self._modules):
+                data[i, j] = self._get_dac(name, m)
+        return data
+
+    def setDacs(self, dac_names, data):
+        data = np.asarray(data)
+        if data.shape != (len(dac_names), len(self._modules)):
+            raise ValueError('data should have shape [n_dacs, n_modules]')
+        self._module_loop(len(self._modules))
+        for i, name in enumerate(dac_names):
+            for j, m in enumerate(self._modules):
+                if data[i, j] >= 0:
+                    self._set_dac(name, m, int(data[i, j]))
+
+    def getDac_mV(self, dac_name, mod_id):
+        return _common(m.dacs_mV.get(dac_name, 0) for m in self._modules_for(mod_id))
+
+    def setDac_mV(self, dac_name, mod_id, value):
+        for m in self._modules_for(mod_id):
+            m.dacs_mV[dac_name] = value
+
+    def getDacFromIndex(self, index, mod_id):
+        name = 'dac{}'.format(index)
+        return _common(self._get_dac(name, m) for m in self._modules_for(mod_id))
+
+    def setDacFromIndex(self, index, mod_id, value):
+        for m in self._modules_for(mod_id):
+            self._set_dac('dac{}'.format(index), m, value)
+        return value
+
+    def getDacVthreshold(self):
+        return _common(self._get_dac('vthreshold', m) for m in self._modules)
+
+    def setDacVthreshold(self, value):
+        for m in self._modules:
+            self._set_dac('vthreshold', m, value)
+
+    def getAdc(self, adc_name, mod_id):
+        return _common(m.adcs.get(adc_name, 0) for m in self._modules_for(mod_id))
+
+    def getAdcs(self, adc_names):
+        self._module_loop(len(self._modules))
+        data = np.empty((len(adc_names), len(self._modules)))
+        for i, name in enumerate(adc_names):
+            for j, m in enumerate(self._modules):
+                data[i, j] = m.adcs.get(name, 0) / 1000
+        return data
+
+    #Settings, threshold and trimbits
+
+    def getSettings(self):
+        return self._settings
+
+    def setSettings(self, s):
+        self._settings = s
+
+    def getSettingsDir(self):
+        return self._settings_dir
+
+    def setSettingsDir(self, path):
+        self._settings_dir = path
+
+    def getThresholdEnergy(self):
+        return self._threshold_energy
+
+    def setThresholdEnergy(self, eV):
+        self._threshold_energy = eV
+
+    def getTrimEnergies(self):
+        return list(self._trim_energies)
+
+    def setTrimEnergies(self, energy):
+        self._trim_energies = list(energy)
+
+    def getAllTrimbits(self):
+        values = [m.get_trimbits() for m in self._modules]
+        if values and all((v == values[0][0, 0]).all() for v in values):
+            return int(values[0][0, 0])
+        return -1
+
+    def setAllTrimbits(self, tb):
+        for m in self._modules:
+            m.get_trimbits()[:] = tb
+
+    def getTrimbits(self, mod_ids):
+        mods = [self._module(i) for i in mod_ids]
+        self._module_loop(len(mods))
+        rows, cols = self._module(0).module_shape
+        out = np.empty((len(mods), rows, cols), dtype=np.uint8)
+        for k, m in enumerate(mods):
+            out[k] = m.get_trimbits()
+        return out
+
+    def setTrimbits(self, mod_ids, data):
+        mods = [self._module(i) for i in mod_ids]
+        rows, cols = self._module(0).module_shape
+        data = np.asarray(data)
+        if data.shape != (len(mods), rows, cols):
+            raise ValueError('Trimbits should have shape [n_mod, rows, cols]')
+        self._module_loop(len(mods))
+        for k, m in enumerate(mods):
+            m.get_trimbits()[:] = data[k]
+
+    def loadTrimbitFile(self, fname, idet):
+        if idet == -1:
+            mods = self._modules
+        else:
+            mods = [self._module(idet)]
+        for m in mods:
+            f = fname
+            if idet == -1:
+                f = '{}.sn{:03d}'.format(fname, m.detector_number)
+            dacs, tb = read_trimbit_file(f)
+            for name, value in zip(EigerDacs._dacnames, dacs):
+                m.dacs[name] = int(value)
+            m.get_trimbits()[:] = tb
+            m.tau = float(dacs[-1])
+
+    def getRateCorrection(self):
+        return [m.tau for m in self._modules]
+
+    def setRateCorrection(self, tau):
+        for m, t in zip(self._modules, tau):
+            m.tau = t
+
+    #Per module
+
+    def getActive(self, i):
+        return self._module(i).active
+
+    def setActive(self, i, value):
+        self._module(i).active = bool(value)
+
+    def getFlippedDataX(self, i):
+        return self._module(i).flipped_x
+
+    def setFlippedDataX(self, i, value):
+        self._module(i).flipped_x = bool(value)
+
+    def getFlippedDataY(self, i):
+        return self._module(i).flipped_y
+
+    def setFlippedDataY(self, i, value):
+        self._module(i).flipped_y = bool(value)
+
+    def getRxTcpport(self, i):
+        return self._module(i).rx_tcpport
+
+    def setRxTcpport(self, i, value):
+        self._module(i).rx_tcpport = value
+
+    def getDelayFrame(self, det_id):
+        return int(self._module(det_id).network['delay_frame'])
+
+    def setDelayFrame(self, det_id, delay):
+        self._module(det_id).network['delay_frame'] = str(delay)
+
+    def getDelayLeft(self, det_id):
+        return int(self._module(det_id).network['delay_left'])
+
+    def setDelayLeft(self, det_id, delay):
+        self._module(det_id).network['delay_left'] = str(delay)
+
+    def getDelayRight(self, det_id):
+        return int(self._module(det_id).network['delay_right'])
+
+    def setDelayRight(self, det_id, delay):
+        self._module(det_id).network['delay_right'] = str(delay)
+
+    #Network
+
+    def _check_network_parameter(self, par_name):
+        if par_name == 'rx_zmqip':
+            raise RuntimeError('rx_zmqip only in developer')
+        if par_name not in _network_parameters:
+            return 'rx_zmqport'
+        return par_name
+
+    def getNetworkParameter(self, par_name):
+        par_name = self._check_network_parameter(par_name)
+        self._module_loop(len(self._modules))
+        return [m.network[par_name] for m in self._modules]
+
+    def setNetworkParameter(self, par_name, par, det_id):
+        par_name = self._check_network_parameter(par_name)
+        for m in self._modules_for(det_id):
+            m.network[par_name] = str(par)
+
+    def configureNetworkParameters(self):
+        pass
+
+    #Registers
+
+    def readRegister(self, addr):
+        return self._registers.get(addr, 0)
+
+    def writeRegister(self, addr, value):
+        self._registers[addr] = value & 0xffffffff
+
+    def writeAdcRegister(self, addr, value):
+        self._registers[('adc', addr)] = value
+
+    def setBitInRegister(self, reg_addr, bit_number):
+        value = self._registers.get(reg_addr, 0) | (1 << bit_number)
+        self._registers[reg_addr] = value & 0xffffffff
+
+    def clearBitInRegister(self, reg_addr, bit_number):
+        value = self._registers.get(reg_addr, 0) & ~(1 << bit_number)
+        self._registers[reg_addr] = value & 0xffffffff
+
+    #Receiver and files
+
+    def getFilePath(self, i=None):
+        return self._file_path
+
+    def setFilePath(self, path, i=None):
+        self._file_path = path
+
+    def getFileName(self):
+        return self._file_name
+
+    def setFileName(self, fname):
+        self._file_name = fname
+
+    def getFileIndex(self):
+        return self._file_index
+
+    def setFileIndex(self, i):
+        self._file_index = i
+
+    def getFileWrite(self):
+        return self._file_write
+
+    def setFileWrite(self, value):
+        self._file_write = bool(value)
+
+    def getFileFormat(self):
+        return 0
+
+    def getReceiverFramesPerFile(self):
+        return self._frames_per_file
+
+    def setReceiverFramesPerFile(self, n_frames):
+        self._frames_per_file = n_frames
+
+    def getRxDataStreamStatus(self):
+        return self._bools['datastream']
+
+    def setRxDataStreamStatus(self, state):
+        self._bools['datastream'] = bool(state)
+
+    def getThreadedProcessing(self):
+        return self._bools['threaded']
+
+    def setThreadedProcessing(self, value):
+        self._bools['threaded'] = bool(value)
+
+    def getTenGigabitEthernet(self):
+        return self._bools['ten_giga']
+
+    def setTenGigabitEthernet(self, value):
+        self._bools['ten_giga'] = bool(value)
+
+    def getGapPixels(self):
+        return self._bools['gap_pixels']
+
+    def setGapPixels(self, value):
+        self._bools['gap_pixels'] = bool(value)
+
+    def getCounterBit(self):
+        return self._bools['counter_bit']
+
+    def setCounterBit(self, value):
+        self._bools['counter_bit'] = bool(value)
+
+    def getServerLock(self):
+        return self._locks['server']
+
+    def setServerLock(self, value):
+        self._locks['server'] = bool(value)
+
+    def getReceiverLock(self):
+        return self._locks['receiver']
+
+    def setReceiverLock(self, value):
+        self._locks['receiver'] = bool(value)
+
+    #Chip and pulsing
+
+    def isChipPowered(self):
+        return self._bools['power_chip']
+
+    def powerChip(self, value):
+        self._bools['power_chip'] = bool(value)
+
+    def pulseChip(self, n):
+        pass
+
+    def pulseAllPixels(self, n):
+        pass
+
+    def pulseDiagonal(self, n):
+        pass
+
+    #Jungfrau temperature control
+
+    def getThresholdTemperature(self):
+        return self._temperature['threshold']
+
+    def setThresholdTemperature(self, t):
+        self._temperature['threshold'] = float(t)
+
+    def getTemperatureControl(self):
+        return self._temperature['control']
+
+    def setTemperatureControl(self, v):
+        self._temperature['control'] = bool(v)
+
+    def getTemperatureEvent(self):
+        return self._temperature['event']
+
+    def resetTemperatureEvent(self):
+        self._temperature['event'] = False
+
+
+for _name, _func in list(vars(SimulatedDetectorApi).items()):
+    if callable(_func) and not _name.startswith('_') and _name not in SimulatedDetectorApi._controls:
+        setattr(SimulatedDetectorApi, _name, _api_call(_name, _func))
@@ -0,0 +1,6 @@
+"""
+Receive and assemble the data streamed by the slsReceivers over zmq.
+Enable the stream with Detector.rx_datastream = True
+"""
+from .receiver import StreamReceiver, Frame
+from .ringbuffer import FrameRingBuffer, RingBufferReader, BufferStats
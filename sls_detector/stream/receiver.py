@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Zmq consumer for the data stream of the slsReceiver. Each receiver
+publishes one (Jungfrau) or two (Eiger) streams per module, every message
+consisting of a json header followed by the raw data of that part of the
+detector. StreamReceiver subscribes to all of them and assembles the
+parts into one image.
+"""
+import json
+from collections import namedtuple
+
+import numpy as np
+import zmq
+
+from ..utils import stream_regions
+
+Frame = namedtuple('Frame', ['frame_number', 'data', 'headers'])
+
+#numpy type used for the assembled image, 4 bit data is unpacked to uint8
+_dtypes = {4: np.uint8, 8: np.uint8, 16: np.uint16, 32: np.uint32}
+
+
+#zmq streams per module, the second Eiger stream of a module is on port + 1
+_streams_per_module = {'Eiger': 2}
+
+
+def stream_ports(detector):
+    """
+    Zmq ports of all receiver streams of detector. The receivers report one
+    port per module, the ports of the remaining streams of a module follow it.
+    """
+    detector_type = detector.detector_type
+    if not isinstance(detector_type, str):
+        raise ValueError('Cannot stream from mixed detector types: {}'.format(detector_type))
+    ports = detector._api.getNetworkParameter('rx_zmqport')
+    if ports == '':
+        return []
+    per_module = _streams_per_module.get(detector_type, 1)
+    return [int(p) + k for p in ports for k in range(per_module)]
+
+
+def _frame_number(header):
+    """Frame number from a json header, key depends on receiver version"""
+    for key in ('frameNumber', 'acqIndex'):
+        if key in header:
+            return header[key]
+    return -1
+
+
+class StreamReceiver:
+    """
+    Subscribe to the zmq streams of all receivers and assemble the frames
+    into a preallocated array with the shape of Detector.image_size.
+
+    The detector configuration (ports, image size, dynamic range, geometry
+    and flipped data) is read once when the object is created so
+    reconfiguring the detector requires a new StreamReceiver.
+
+    Attributes
+    -----------
+    discarded: int
+        Number of parts dropped by read_frame because the other streams
+        had already moved on to a later frame
+
+    .. note ::
+
+        The image returned is reused for the next frame, copy it if it
+        needs to be kept.
+
+    Examples
+    ---------
+
+    ::
+
+        d.rx_datastream = True
+
+        with StreamReceiver(d) as s:
+            d.start()
+            for frame in s:
+                print(frame.frame_number, frame.data.sum())
+
+    """
+    def __init__(self, detector, ip=None, timeout=1000):
+        self.ports = stream_ports(detector)
+        self.image_size = tuple(detector.image_size)
+        self.dynamic_range = detector.dynamic_range
+        self.timeout = timeout
+        n_modules = detector.n_modules
+        if len(self.ports) == 0:
+            raise ValueError('No receiver zmq ports configured')
+        self._per_module = len(self.ports) // n_modules
+
+        if ip is None:
+            ip = detector.rx_hostname
+        if isinstance(ip, str):
+            ip = [ip] * n_modules
+        self.hosts = [ip[i // self._per_module] for i in range(len(self.ports))]
+
+        self.regions = stream_regions(self.image_size,
+                                      detector.module_geometry,
+                                      len(self.ports))
+
+        #Per stream view modifier to handle flipped modules
+        flip_x = detector.flipped_data_x[:]
+        flip_y = detector.flipped_data_y[:]
+        self._flips = []
+        for i in range(len(self.ports)):
+            m = i // self._per_module
+            self._flips.append((slice(None, None, -1 if flip_x[m] else 1),
+                                slice(None, None, -1 if flip_y[m] else 1)))
+
+        self.dtype = _dtypes[self.dynamic_range]
+        self.image = np.zeros(self.image_size, dtype=self.dtype)
+        self._part_shape = (self.regions[0][0].stop - self.regions[0][0].start,
+                            self.regions[0][1].stop - self.regions[0][1].start)
+
+        #scratch buffer for unpacking 4 bit data, allocated once
+        if self.dynamic_range == 4:
+            self._unpacked = np.empty(self._part_shape[0] * self._part_shape[1],
+                                      dtype=np.uint8)
+
+        self._context = None
+        self._sockets = []
+        self.discarded = 0
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __iter__(self):
+        while True:
+            frame = self.read_frame()
+            if frame is None:
+                return
+            yield frame
+
+    def connect(self):
+        """Connect one SUB socket to each of the receiver streams"""
+        if self._sockets:
+            return
+        self._context = zmq.Context()
+        for host, port in zip(self.hosts, self.ports):
+            socket = self._context.socket(zmq.SUB)
+            socket.setsockopt(zmq.SUBSCRIBE, b'')
+            socket.setsockopt(zmq.RCVTIMEO, self.timeout)
+            socket.connect('tcp://{}:{}'.format(host, port))
+            self._sockets.append(socket)
+
+    def close(self):
+        """Close all sockets"""
+        for socket in self._sockets:
+            socket.close(linger=0)
+        self._sockets = []
+        if self._context is not None:
+            self._context.term()
+            self._context = None
+
+    def _receive(self, i):
+        """Read the json header and data buffer for stream i"""
+        try:
+            msg = self._sockets[i].recv_multipart(copy=False)
+        except zmq.Again:
+            raise TimeoutError('No data from receiver stream {}:{}'.format(self.hosts[i],
+                                                                           self.ports[i]))
+        header = json.loads(msg[0].bytes.decode())
+        if header.get('data', 1) == 0 or len(msg) < 2:
+            return header, None
+        return header, msg[1].buffer
+
+    def _insert(self, i, buffer, out):
+        """Copy the data of stream i into its region of out"""
+        if self.dynamic_range == 4:
+            packed = np.frombuffer(buffer, dtype=np.uint8)
+            np.bitwise_and(packed, 0x0f, out=self._unpacked[0::2])
+            np.right_shift(packed, 4, out=self._unpacked[1::2])
+            part = self._unpacked
+        else:
+            part = np.frombuffer(buffer, dtype=self.dtype)
+        if part.size != self._part_shape[0] * self._part_shape[1]:
+            raise ValueError('Stream {} sent {} pixels, expected {}'.format(
+                i, part.size, self._part_shape[0] * self._part_shape[1]))
+        out[self.regions[i]] = part.reshape(self._part_shape)[self._flips[i]]
+
+    def read_frame(self, out=None):
+        """
+        Read one frame from every stream and assemble them. If the streams
+        deliver different frame numbers the parts of the older frames are
+        discarded, counted in discarded, and the streams that are behind
+        are read until all of them deliver the same frame.
+
+        Parameters
+        -----------
+        out:
+            :py:obj:`numpy.ndarray` Array with the shape of image_size to
+            write to, by default an internal preallocated array is used
+
+        Returns
+        --------
+        Frame
+            namedtuple(frame_number, data, headers) or :py:obj:`None` if the
+            receivers signaled the end of the acquisition
+
+        Raises
+        -------
+        TimeoutError
+            If one of the streams did not send anything within timeout ms
+
+        """
+        if out is None:
+            out = self.image
+        parts = [self._receive(i) for i in range(len(self._sockets))]
+        while True:
+            if any(buffer is None for _, buffer in parts):
+                return None
+            numbers = [_frame_number(header) for header, _ in parts]
+            latest = max(numbers)
+            if min(numbers) == latest:
+                break
+            #the rest of the older frames is lost, catch up with the latest
+            for i, fn in enumerate(numbers):
+                if fn < latest:
+                    self.discarded += 1
+                    parts[i] = self._receive(i)
+
+        for i, (_, buffer) in enumerate(parts):
+            self._insert(i, buffer, out)
+        return Frame(latest, out, [header for header, _ in parts])
+
+    def read_into(self, ring):
+        """
+        Read one message from every stream and write the parts directly into
+        the slots of a FrameRingBuffer. Parts are matched by frame number so
+        streams that are out of step end up in the right frame.
+
+        Returns
+        --------
+        bool
+            :py:obj:`False` if the receivers signaled the end of the
+            acquisition otherwise :py:obj:`True`
+        """
+        running = True
+        for i in range(len(self._sockets)):
+            header, buffer = self._receive(i)
+            if buffer is None:
+                running = False
+                continue
+            fn = _frame_number(header)
+            slot = ring.claim(fn, i)
+            if slot is not None:
+                self._insert(i, buffer, slot)
+                ring.commit(fn, i)
+        return running
+
+    def fill(self, ring):
+        """Write frames into ring until the end of the acquisition"""
+        while self.read_into(ring):
+            pass
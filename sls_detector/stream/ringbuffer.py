@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Preallocated ring buffer for frames assembled from the receiver streams.
+Frames are stored by frame number so parts from different streams can
+arrive in any order, and the buffer keeps track of which parts were
+missing or arrived too late.
+"""
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+from .receiver import _dtypes, stream_ports
+
+BufferStats = namedtuple('BufferStats', ['frames_complete', 'frames_incomplete',
+                                         'missing', 'late'])
+
+
+class FrameRingBuffer:
+    """
+    Keeps the last size frames in one preallocated array of shape
+    [size, rows, cols]. No memory is allocated per frame.
+
+    Each frame is written in n_parts parts (one per receiver stream). A
+    frame is complete when all its parts have been committed. When a slot
+    is reused before the frame in it was complete the missing parts are
+    counted, parts that arrive for a frame that is already overwritten
+    are counted as late. Both are kept per module, if they grow the
+    network or the receivers are not keeping up. If instead the readers
+    report overruns the consumer is too slow.
+
+    Examples
+    ---------
+
+    ::
+
+        ring = FrameRingBuffer.from_detector(d, 100)
+
+        with StreamReceiver(d) as s:
+            d.start()
+            s.fill(ring)
+
+        ring.latest()
+        >> (10, array(...))
+
+        ring.stats()
+        >> BufferStats(frames_complete=10, frames_incomplete=0,
+                       missing=array([0, 0]), late=array([0, 0]))
+
+    """
+    def __init__(self, size, image_size, dtype, n_parts, parts_per_module=1):
+        self.size = size
+        self.n_parts = n_parts
+        self.parts_per_module = parts_per_module
+        self.frames = np.zeros((size,) + tuple(image_size), dtype=dtype)
+        self.frame_numbers = np.full(size, -1, dtype=np.int64)
+        self._received = np.zeros((size, n_parts), dtype=bool)
+        self._complete = np.zeros(size, dtype=bool)
+        self._missing = np.zeros(n_parts, dtype=np.int64)
+        self._late = np.zeros(n_parts, dtype=np.int64)
+        self._frames_complete = 0
+        self._frames_incomplete = 0
+        self._first = None
+        self._latest = -1
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_detector(cls, detector, size):
+        """
+        Create a ring buffer of size frames matching the current image_size,
+        dynamic_range and number of modules (and streams) of detector
+        """
+        n_modules = detector.n_modules
+        n_parts = max(len(stream_ports(detector)), n_modules)
+        return cls(size, tuple(detector.image_size),
+                   _dtypes[detector.dynamic_range],
+                   n_parts, n_parts // n_modules)
+
+    def _retire(self, slot):
+        """Account for the frame currently in slot before reuse"""
+        if self.frame_numbers[slot] >= 0 and not self._complete[slot]:
+            self._missing += ~self._received[slot]
+            self._frames_incomplete += 1
+        self._received[slot] = False
+        self._complete[slot] = False
+
+    def claim(self, frame_number, part):
+        """
+        Get the array to write part of frame_number to. Returns
+        :py:obj:`None` if the frame was already overwritten by a newer one.
+        """
+        slot = frame_number % self.size
+        with self._lock:
+            current = self.frame_numbers[slot]
+            if current > frame_number:
+                self._late[part] += 1
+                return None
+            if current < frame_number:
+                self._retire(slot)
+                self.frame_numbers[slot] = frame_number
+                if self._first is None:
+                    self._first = frame_number
+        return self.frames[slot]
+
+    def commit(self, frame_number, part):
+        """Mark part of frame_number as written"""
+        slot = frame_number % self.size
+        with self._lock:
+            if self.frame_numbers[slot] != frame_number:
+                self._late[part] += 1
+                return
+            self._received[slot, part] = True
+            if not self._complete[slot] and self._received[slot].all():
+                self._complete[slot] = True
+                self._frames_complete += 1
+                self._latest = max(self._latest, frame_number)
+
+    def get(self, frame_number):
+        """
+        Return the frame if it is still in the buffer and complete
+        otherwise :py:obj:`None`. The returned array is a view that will be
+        overwritten when the slot is reused.
+        """
+        slot = frame_number % self.size
+        with self._lock:
+            if self.frame_numbers[slot] == frame_number and self._complete[slot]:
+                return self.frames[slot]
+        return None
+
+    def latest(self):
+        """(frame_number, frame) of the latest complete frame or :py:obj:`None`"""
+        with self._lock:
+            fn = self._latest
+        if fn < 0:
+            return None
+        frame = self.get(fn)
+        if frame is None:
+            return None
+        return fn, frame
+
+    def reader(self):
+        """Create a new RingBufferReader that starts at the oldest frame"""
+        return RingBufferReader(self)
+
+    def stats(self):
+        """
+        BufferStats(frames_complete, frames_incomplete, missing, late)
+        with missing and late parts summed per module
+        """
+        with self._lock:
+            shape = (-1, self.parts_per_module)
+            return BufferStats(self._frames_complete,
+                               self._frames_incomplete,
+                               self._missing.reshape(shape).sum(axis=1),
+                               self._late.reshape(shape).sum(axis=1))
+
+
+class RingBufferReader:
+    """
+    Cursor reading the frames of a FrameRingBuffer in order. Frames that
+    were overwritten before they could be read are counted in overruns,
+    frames that were never completed in skipped.
+    """
+    def __init__(self, ring):
+        self._ring = ring
+        self._next = None
+        self.overruns = 0
+        self.skipped = 0
+
+    def read(self):
+        """
+        Return (frame_number, frame) for the next complete frame or
+        :py:obj:`None` if there is no new frame available.
+        """
+        ring = self._ring
+        while True:
+            with ring._lock:
+                latest = ring._latest
+                first = ring._first
+            if latest < 0:
+                return None
+            if self._next is None:
+                self._next = max(first, latest - ring.size + 1)
+            oldest = latest - ring.size + 1
+            if self._next < oldest:
+                self.overruns += oldest - self._next
+                self._next = oldest
+            if self._next > latest:
+                return None
+            fn = self._next
+            self._next += 1
+            frame = ring.get(fn)
+            if frame is not None:
+                return fn, frame
+            if ring.frame_numbers[fn % ring.size] > fn:
+                self.overruns += 1
+            else:
+                self.skipped += 1
+
+    def __iter__(self):
+        while True:
+            r = self.read()
+            if r is None:
+                return
+            yield r
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Background monitoring of the temperatures of a detector. A TelemetrySampler
+reads all adcs of all modules at a fixed interval into a ring buffer and
+calls user functions when a limit is crossed.
+
+::
+
+    from sls_detector.telemetry import TelemetrySampler
+
+    def too_hot(event):
+        print('{} on module {} is {:.1f}C'.format(event.name, event.module, event.value))
+
+    s = TelemetrySampler(d, interval = 1)
+    s.add_limit('fpga', too_hot, high = 70)
+    s.start()
+
+    #last hour as 1 minute bins
+    t, low, high, mean = s.downsample(60, since = time.time()-3600)
+"""
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from .errors import DetectorError
+
+LimitEvent = namedtuple('LimitEvent', ['time', 'name', 'module', 'value', 'limit'])
+
+
+class TelemetrySampler:
+    """
+    Samples the adcs of detector.temp for all modules every interval
+    seconds. The values are stored in °C in a ring buffer with the shape
+    [sample, adc, module] together with the time of each sample.
+
+    For Jungfrau temperature_event and temperature_threshold are recorded
+    as well and callbacks added with on_temperature_event are called when
+    the detector reports that the threshold was crossed.
+
+    The sampler uses the same connection as the detector. Reads of the
+    sampler are serialized with its own lock, but they share the error mask
+    with calls made from other threads at the same time, so an error of such
+    a call can be reported by either side. Errors while sampling are counted
+    in errors and the sample is dropped, the last one is kept in last_error.
+
+    Parameters
+    -----------
+    detector:
+        Eiger, Jungfrau etc.
+    interval: float
+        Time between samples in seconds
+    size: int
+        Number of samples kept, one hour at 1 s by default. The buffer takes
+        size * adcs * modules * 8 bytes.
+    adcs: list
+        Names in detector.temp to sample, for example ['fpga', 'dcdc'],
+        all by default
+
+    Attributes
+    -----------
+    names: list
+        Names of the sampled adcs, the order of the adc axis
+
+    """
+    def __init__(self, detector, interval=1., size=3600, adcs=None):
+        temp = {k: v for k, v in vars(detector.temp).items() if not k.startswith('_')}
+        self.names = list(temp) if adcs is None else list(adcs)
+        self._adc_names = [temp[name].name for name in self.names]
+        self._detector = detector
+        self.interval = interval
+        self.size = size
+
+        n_modules = detector._api.getNumberOfDetectors()
+        self._time = np.zeros(size)
+        self._values = np.zeros((size, len(self.names), n_modules))
+        #check the class, the property itself would query the detector
+        self._jungfrau = hasattr(type(detector), 'temperature_event')
+        if self._jungfrau:
+            self._event = np.zeros(size, dtype=np.bool_)
+            self._threshold = np.zeros(size)
+        self._count = 0
+
+        self._limits = []
+        self._event_callbacks = []
+        self._last_event = False
+        self.errors = 0
+        self.last_error = None
+
+        self._lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return min(self._count, self.size)
+
+    @property
+    def running(self):
+        """:py:obj:`True` if the background thread is sampling"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start sampling in a background thread"""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='TelemetrySampler',
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread and wait for it to finish"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        #schedule on a fixed grid so that slow reads do not add up
+        next_time = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                self.errors += 1
+                self.last_error = e
+            next_time += self.interval
+            delay = next_time - time.monotonic()
+            if delay < 0:
+                #fell behind, skip the missed samples
+                next_time -= delay
+                delay = 0
+            self._stop.wait(delay)
+
+    def _read(self):
+        """Read all adcs in one call and check the error mask once"""
+        api = self._detector._api
+        with self._read_lock:
+            api.clearErrorMask()
+            values = api.getAdcs(self._adc_names)
+            if api.getErrorMask() != 0:
+                msg = api.getErrorMessage()
+                api.clearErrorMask()
+                raise DetectorError(msg)
+        return values
+
+    def sample(self):
+        """
+        Take one sample now, called by the background thread but can also
+        be used to sample manually. Returns the values as [adc, module].
+        """
+        values = self._read()
+        if self._jungfrau:
+            event = bool(self._detector.temperature_event)
+            threshold = self._detector.temperature_threshold
+        t = time.time()
+
+        with self._lock:
+            i = self._count % self.size
+            self._time[i] = t
+            self._values[i] = values
+            if self._jungfrau:
+                self._event[i] = event
+                self._threshold[i] = threshold
+            self._count += 1
+
+        self._check_limits(t, values)
+        if self._jungfrau:
+            if event and not self._last_event:
+                for callback in self._event_callbacks:
+                    callback(t, threshold)
+            self._last_event = event
+        return values
+
+    def add_limit(self, name, callback, high=None, low=None):
+        """
+        Call callback(LimitEvent(time, name, module, value, limit)) when the
+        adc name goes above high or below low on any module. The callback
+        is called once per crossing and again only after the value has
+        returned within the limit.
+        """
+        if name not in self.names:
+            raise ValueError('{} is not sampled, use one of {}'.format(name, self.names))
+        if high is None and low is None:
+            raise ValueError('Give high, low or both')
+        tripped = np.zeros(self._values.shape[2], dtype=np.bool_)
+        self._limits.append((self.names.index(name), high, low, callback, tripped))
+
+    def on_temperature_event(self, callback):
+        """
+        Jungfrau only, call callback(time, temperature_threshold) when
+        temperature_event becomes :py:obj:`True`
+        """
+        if not self._jungfrau:
+            raise TypeError('{} has no temperature_event'.format(type(self._detector).__name__))
+        self._event_callbacks.append(callback)
+
+    def _check_limits(self, t, values):
+        for j, high, low, callback, tripped in self._limits:
+            v = values[j]
+            outside = np.zeros(v.shape, dtype=np.bool_)
+            if high is not None:
+                outside |= v > high
+            if low is not None:
+                outside |= v < low
+            for i in np.flatnonzero(outside & ~tripped):
+                limit = high if high is not None and v[i] > high else low
+                callback(LimitEvent(t, self.names[j], int(i), float(v[i]), limit))
+            tripped[:] = outside
+
+    def _ordered(self, a, since):
+        """Samples of a buffer in time order, optionally only after since"""
+        n = len(self)
+        start = self._count % self.size if self._count > self.size else 0
+        index = (np.arange(n) + start) % self.size
+        if since is not None:
+            index = index[self._time[index] >= since]
+        return a[index]
+
+    def data(self, since=None):
+        """
+        Copy of the samples in time order
+
+        Parameters
+        -----------
+        since: float
+            Only return samples taken after this time.time()
+
+        Returns
+        --------
+        t: numpy.ndarray
+            time.time() of each sample
+        values: numpy.ndarray
+            Temperatures in °C as [sample, adc, module]
+
+        """
+        with self._lock:
+            return self._ordered(self._time, since), self._ordered(self._values, since)
+
+    def temperature_events(self, since=None):
+        """Jungfrau only, time, temperature_event and temperature_threshold per sample"""
+        if not self._jungfrau:
+            raise TypeError('{} has no temperature_event'.format(type(self._detector).__name__))
+        with self._lock:
+            return (self._ordered(self._time, since), self._ordered(self._event, since),
+                    self._ordered(self._threshold, since))
+
+    def downsample(self, width, since=None):
+        """
+        Reduce the samples to bins of width seconds, useful to plot long
+        histories.
+
+        Returns
+        --------
+        t: numpy.ndarray
+            Start time of each bin, empty bins are left out
+        low, high, mean: numpy.ndarray
+            Minimum, maximum and mean of each bin as [bin, adc, module]
+
+        """
+        t, values = self.data(since)
+        if len(t) == 0:
+            empty = values[:0]
+            return t, empty, empty, empty
+        bins = np.floor((t - t[0]) / width).astype(np.int64)
+        bins, first = np.unique(bins, return_index=True)
+        counts = np.diff(np.append(first, len(t)))
+        low = np.minimum.reduceat(values, first, axis=0)
+        high = np.maximum.reduceat(values, first, axis=0)
+        mean = np.add.reduceat(values, first, axis=0) / counts[:, None, None]
+        return t[0] + bins * width, low, high, mean
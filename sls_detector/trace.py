@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tracing of the calls made to the DetectorApi. Every call is timed and
+attributed to the outermost sls_detector function that issued it, for
+example Eiger.exposure_time or EigerDacs.__repr__, to find out which
+properties dominate a control loop.
+
+::
+
+    t = d.start_trace()
+    d.dacs
+    d.exposure_time = 1
+
+    print(t.summary())
+    t.to_chrome_trace('dacs.json')
+    d.stop_trace()
+
+Open the json file in chrome://tracing or https://ui.perfetto.dev
+"""
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import defaultdict, deque, namedtuple
+
+ApiCall = namedtuple('ApiCall', ['name', 'module', 'args', 'start', 'duration',
+                                 'caller', 'thread'])
+
+#Position of the module index in the arguments, where there is one
+_module_arg = {'getDac': 1, 'setDac': 1, 'getDac_mV': 1, 'setDac_mV': 1,
+               'getDacFromIndex': 1, 'setDacFromIndex': 1, 'getAdc': 1,
+               'getActive': 0, 'setActive': 0, 'getDetectorNumber': 0,
+               'getFlippedDataX': 0, 'setFlippedDataX': 0,
+               'getFlippedDataY': 0, 'setFlippedDataY': 0,
+               'getRxTcpport': 0, 'setRxTcpport': 0,
+               'getDelayFrame': 0, 'setDelayFrame': 0,
+               'getDelayLeft': 0, 'setDelayLeft': 0,
+               'getDelayRight': 0, 'setDelayRight': 0,
+               'getFramesCaughtByReceiver': 0, 'getFilePath': 0,
+               'setFilePath': 1, 'setNetworkParameter': 2,
+               'loadTrimbitFile': 1}
+
+_package_dir = os.path.dirname(os.path.abspath(__file__))
+_trace_file = os.path.join(_package_dir, 'trace.py')
+_decorators_file = os.path.join(_package_dir, 'decorators.py')
+
+
+def _label(obj, func_name):
+    name = getattr(obj, 'name', None)
+    if not isinstance(name, str):
+        name = getattr(obj, '__dict__', {}).get('__name__')
+    if isinstance(name, str):
+        return '{}({}).{}'.format(type(obj).__name__, name, func_name)
+    return '{}.{}'.format(type(obj).__name__, func_name)
+
+
+def _caller(frame):
+    """Label of the outermost frame inside sls_detector"""
+    found = None
+    while frame is not None:
+        fname = frame.f_code.co_filename
+        if fname.startswith(_package_dir):
+            if fname != _trace_file:
+                found = frame
+        elif found is not None:
+            break
+        frame = frame.f_back
+    if found is None:
+        return None
+
+    code = found.f_code
+    if code.co_filename == _decorators_file:
+        #error checks made by the decorators belong to the decorated function
+        f_locals = found.f_locals
+        return _label(f_locals.get('self'), f_locals['func'].__name__)
+    if code.co_argcount and code.co_varnames[0] == 'self':
+        return _label(found.f_locals.get('self'), code.co_name)
+    return code.co_name
+
+
+class LatencyHistogram:
+    """
+    Log spaced histogram of call durations with 8 bins per factor of two,
+    percentiles are accurate to about 9%.
+    """
+    def __init__(self):
+        self.count = 0
+        self.total = 0.
+        self.max = 0.
+        self._bins = {}
+
+    def add(self, duration):
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+        #bin on ns to keep the index positive
+        i = int(math.log2(duration * 1e9 + 1) * 8)
+        bins = self._bins
+        bins[i] = bins.get(i, 0) + 1
+
+    def percentile(self, p):
+        """Upper edge in seconds of the bin that holds percentile p"""
+        if self.count == 0:
+            return 0.
+        limit = p / 100 * self.count
+        n = 0
+        for i in sorted(self._bins):
+            n += self._bins[i]
+            if n >= limit:
+                break
+        edge = 2 ** ((i + 1) / 8) * 1e-9
+        return min(edge, self.max)
+
+
+class ApiTracer:
+    """
+    Wraps a DetectorApi and records each call. Normally created with
+    Detector.start_trace()
+
+    Parameters
+    -----------
+    api:
+        DetectorApi or SimulatedDetectorApi to trace
+    maxlen: int
+        Number of calls kept for to_chrome_trace and calls, the histograms
+        count all calls
+    attribute: bool
+        Find the sls_detector function that made each call, costs a few
+        microseconds per call
+    record: str
+        File name to also write every call with its arguments and return
+        value to, see :py:mod:`sls_detector.replay`. clear() does not
+        affect the file.
+
+    Attributes
+    -----------
+    histograms: dict
+        LatencyHistogram per api function
+    callers: dict
+        LatencyHistogram per high level function
+    record_errors: int
+        Number of calls that could not be recorded, the last error is kept
+        in last_record_error. The calls themselves are not affected.
+
+    """
+    def __init__(self, api, maxlen=100000, attribute=True, record=None):
+        self.api = api
+        self.attribute = attribute
+        self._writer = None
+        if record is not None:
+            from .replay import TraceWriter
+            self._writer = TraceWriter(record)
+        self.histograms = defaultdict(LatencyHistogram)
+        self.callers = defaultdict(LatencyHistogram)
+        self._calls = deque(maxlen=maxlen)
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self.record_errors = 0
+        self.last_record_error = None
+
+    def __getattr__(self, name):
+        if not callable(getattr(self.api, name)):
+            return getattr(self.api, name)
+
+        def call(*args):
+            #look up on each call since self.api can be replaced
+            func = getattr(self.api, name)
+            result = error = None
+            t0 = time.perf_counter()
+            try:
+                result = func(*args)
+                return result
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                duration = time.perf_counter() - t0
+                #recording must not change what the call returns or raises
+                try:
+                    self._record(name, args, t0, duration, result, error)
+                except Exception as e:
+                    self.record_errors += 1
+                    self.last_record_error = e
+
+        #store on the instance so __getattr__ is only used once per name
+        self.__dict__[name] = call
+        return call
+
+    def _record(self, name, args, start, duration, result, error):
+        caller = _caller(sys._getframe(2)) if self.attribute else None
+        self._calls.append((name, args, start, duration, caller, threading.get_ident()))
+        with self._lock:
+            self.histograms[name].add(duration)
+            if caller is not None:
+                self.callers[caller].add(duration)
+            if self._writer is not None:
+                self._writer.write(name, args, start, duration, result, error)
+
+    @property
+    def calls(self):
+        """List of the recorded ApiCall, the oldest first"""
+        out = []
+        for name, args, start, duration, caller, thread in list(self._calls):
+            i = _module_arg.get(name)
+            module = args[i] if i is not None and i < len(args) else None
+            out.append(ApiCall(name, module, args, start - self._t0, duration,
+                               caller, thread))
+        return out
+
+    def close(self):
+        """Close the record file, if any"""
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    def clear(self):
+        """Remove all recorded calls and statistics"""
+        with self._lock:
+            self._calls.clear()
+            self.histograms.clear()
+            self.callers.clear()
+        self._t0 = time.perf_counter()
+
+    def summary(self, by='function'):
+        """
+        Table with count, total time and percentiles sorted by total time
+
+        Parameters
+        -----------
+        by: str
+            'function' for the DetectorApi functions or 'caller' for the
+            sls_detector functions that issued the calls
+
+        ::
+
+            print(t.summary())
+            function                     calls  total [ms]  p50 [us]  p99 [us]  max [us]
+            getDacs                          4       12.41   3027.89   3300.00   3300.00
+            getExposureTime                 10        1.10    101.22    125.00    125.00
+
+        """
+        if by == 'function':
+            hists = self.histograms
+        elif by == 'caller':
+            hists = self.callers
+        else:
+            raise ValueError("by should be 'function' or 'caller'")
+
+        with self._lock:
+            rows = sorted(hists.items(), key=lambda item: item[1].total, reverse=True)
+            lines = ['{:40s} {:>8s} {:>11s} {:>9s} {:>9s} {:>9s}'.format(
+                by, 'calls', 'total [ms]', 'p50 [us]', 'p99 [us]', 'max [us]')]
+            for name, h in rows:
+                lines.append('{:40s} {:8d} {:11.2f} {:9.2f} {:9.2f} {:9.2f}'.format(
+                    str(name), h.count, h.total * 1e3, h.percentile(50) * 1e6,
+                    h.percentile(99) * 1e6, h.max * 1e6))
+        return '\n'.join(lines)
+
+    def to_chrome_trace(self, fname):
+        """Write the recorded calls in the Chrome trace event json format"""
+        pid = os.getpid()
+        events = []
+        for c in self.calls:
+            events.append({'name': c.name,
+                           'cat': c.caller or 'DetectorApi',
+                           'ph': 'X',
+                           'ts': c.start * 1e6,
+                           'dur': c.duration * 1e6,
+                           'pid': pid,
+                           'tid': c.thread,
+                           'args': {'args': [repr(a) for a in c.args],
+                                    'module': c.module,
+                                    'caller': c.caller}})
+        with open(fname, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
@@ -29,4 +29,47 @@ def eiger_register_to_time(register):
     """
     clocks = register >> 3
     exponent = register & 0b111
-    return clocks*10**exponent / 100e6
\ No newline at end of file
+    return clocks*10**exponent / 100e6
+
+def stream_regions(image_size, geometry, n_streams):
+    """
+    Return the (rows, cols) slices of the full image that each stream, or
+    file series written by the receiver, covers. Modules are placed column
+    by column in a grid given by geometry and the streams of a module split
+    it horizontally. With n_streams equal to the number of modules this
+    gives the region of each module.
+
+    Parameters
+    -----------
+    image_size:
+        (rows, cols) of the full detector
+    geometry:
+        (horizontal, vertical) number of modules
+    n_streams:
+        :py:obj:`int` total number of zmq streams
+
+    Raises
+    -------
+    ValueError
+        If the image can not be divided evenly between the streams
+
+    """
+    rows, cols = image_size
+    horizontal, vertical = geometry
+    n_modules = horizontal * vertical
+    if n_modules == 0 or n_streams % n_modules != 0:
+        raise ValueError('Cannot split {} streams over {} modules'.format(n_streams, n_modules))
+    per_module = n_streams // n_modules
+    if rows % vertical != 0 or cols % (horizontal * per_module) != 0:
+        raise ValueError('Image size {} does not match geometry {}'.format(image_size, geometry))
+
+    part_rows = rows // vertical
+    part_cols = cols // (horizontal * per_module)
+    regions = []
+    for i in range(n_streams):
+        module, part = divmod(i, per_module)
+        r = module % vertical
+        c = (module // vertical) * per_module + part
+        regions.append((slice(r * part_rows, (r + 1) * part_rows),
+                        slice(c * part_cols, (c + 1) * part_cols)))
+    return regions
@@ -303,6 +303,68 @@ public:
     }
 
 
+    //shape of a single module as [nrows, ncols], used for trimbits
+    std::pair<int, int> getModuleShape(){
+        auto d = getSlsDetector(0);
+        return {d->getTotalNumberOfChannels(slsDetectorDefs::dimension::Y),
+                d->getTotalNumberOfChannels(slsDetectorDefs::dimension::X)};
+    }
+
+    //Number of pixels of one module, nrows * ncols from getModuleShape
+    int moduleSize(){
+        auto shape = getModuleShape();
+        return shape.first * shape.second;
+    }
+
+    //Throws if module m of d could not be read or if its number of channels
+    //does not match the module size n used for the buffers
+    template <typename Module>
+    void checkModule(slsDetector* d, Module* m, int mod_id, int n){
+        if (!m)
+            throw std::runtime_error("Could not read module: " + std::to_string(mod_id));
+        if (m->nchan != n){
+            auto nchan = m->nchan;
+            d->deleteModule(m);
+            throw std::runtime_error("Module " + std::to_string(mod_id) + " has " +
+                                     std::to_string(nchan) + " channels, expected " +
+                                     std::to_string(n));
+        }
+    }
+
+    //Eiger: read the trimbits of the modules in mod_ids into data
+    //data needs to hold mod_ids.size() * nrows * ncols values
+    void getTrimbits(const std::vector<int>& mod_ids, uint8_t* data){
+        auto n = moduleSize();
+        for (size_t k=0; k<mod_ids.size(); ++k){
+            auto d = getSlsDetector(mod_ids[k]);
+            auto m = d->getModule(0);
+            checkModule(d, m, mod_ids[k], n);
+            for (int i=0; i<n; ++i)
+                data[k*n+i] = static_cast<uint8_t>(m->chanregs[i]);
+            d->deleteModule(m);
+        }
+    }
+
+    //Eiger: write trimbits from data to the modules in mod_ids, dacs,
+    //iodelay and tau are kept at their current values
+    void setTrimbits(const std::vector<int>& mod_ids, const uint8_t* data){
+        auto n = moduleSize();
+        for (size_t k=0; k<mod_ids.size(); ++k){
+            auto d = getSlsDetector(mod_ids[k]);
+            auto m = d->getModule(0);
+            checkModule(d, m, mod_ids[k], n);
+            for (int i=0; i<n; ++i)
+                m->chanregs[i] = data[k*n+i];
+
+            double tau = 0;
+            d->getRateCorrection(tau);
+            dacs_t iodelay = -1;
+            iodelay = det.setDAC(iodelay, slsDetectorDefs::dacIndex::IO_DELAY, 0, mod_ids[k]);
+            d->setModule(*m, iodelay, static_cast<int>(tau), det.getThresholdEnergy());
+            d->deleteModule(m);
+        }
+    }
+
     void loadTrimbitFile(std::string fname, const int idet){
         det.loadSettingsFile(fname, idet);
     }
@@ -382,6 +444,35 @@ public:
         det.setDAC(val, dac, 0, mod_id);
     }
 
+    //Read several dacs from all modules in one call. data should point to
+    //a buffer of size [n_dacs, n_modules] that is filled row by row
+    void getDacs(const std::vector<std::string>& dac_names, dacs_t* data){
+        const int n_mod = det.getNumberOfDetectors();
+        for (size_t i=0; i<dac_names.size(); ++i){
+            auto dac = dacNameToEnum(dac_names[i]);
+            for (int j=0; j<n_mod; ++j){
+                dacs_t val = -1;
+                data[i*n_mod+j] = det.setDAC(val, dac, 0, j);
+            }
+        }
+    }
+
+    //Set several dacs for all modules in one call. data should point to a
+    //buffer of size [n_dacs, n_modules], negative values are skipped which
+    //leaves that dac unchanged on the module
+    void setDacs(const std::vector<std::string>& dac_names, const dacs_t* data){
+        const int n_mod = det.getNumberOfDetectors();
+        for (size_t i=0; i<dac_names.size(); ++i){
+            auto dac = dacNameToEnum(dac_names[i]);
+            for (int j=0; j<n_mod; ++j){
+                dacs_t val = data[i*n_mod+j];
+                if (val < 0)
+                    continue;
+                det.setDAC(val, dac, 0, j);
+            }
+        }
+    }
+
     dacs_t getDac_mV(std::string dac_name, const int mod_id){
         dacs_t val = -1;
         auto dac = dacNameToEnum(dac_name);
@@ -416,6 +507,19 @@ public:
 
     }
 
+    //Read several adcs from all modules in one call. data should point to
+    //a buffer of size [n_adcs, n_modules] that is filled row by row with
+    //the temperature in degree C
+    void getAdcs(const std::vector<std::string>& adc_names, double* data){
+        const int n_mod = det.getNumberOfDetectors();
+        for (size_t i=0; i<adc_names.size(); ++i){
+            auto adc = dacNameToEnum(adc_names[i]);
+            for (int j=0; j<n_mod; ++j){
+                data[i*n_mod+j] = det.getADC(adc, j) / 1000.;
+            }
+        }
+    }
+
     std::vector<std::string> getReadoutFlags();
 
     //note singular
@@ -1,5 +1,6 @@
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
+#include <pybind11/numpy.h>
 
 #include "Detector.h"
 
@@ -47,204 +48,263 @@ PYBIND11_MODULE(_sls_detector, m) {
 
 
     )pbdoc");
+    //Almost all calls end up talking to the detector or receiver over TCP.
+    //Release the GIL while waiting so that other Python threads can run.
     DetectorApi
-            .def(py::init<int>())
-            .def("freeSharedMemory", &Detector::freeSharedMemory)
-            .def("getMultiDetectorId", &Detector::getMultiDetectorId)
-            .def("acq", &Detector::acquire)
-            .def("getAcquiringFlag", &Detector::getAcquiringFlag)
-            .def("setAcquiringFlag", &Detector::setAcquiringFlag)
-
-            .def("setAllTrimbits", &Detector::setAllTrimbits)
-            .def("getAllTrimbits", &Detector::getAllTrimbits)
-            .def("setCounterBit", &Detector::setCounterBit)
-            .def("getCounterBit", &Detector::getCounterBit)
-
-            .def("getAdc", &Detector::getAdc)
-            .def("getDac", &Detector::getDac)
-            .def("getDac_mV", &Detector::getDac_mV)
-            .def("setDac", &Detector::setDac)
-            .def("setDac_mV", &Detector::setDac_mV)
-            .def("getDacFromIndex", &Detector::getDacFromIndex)
-            .def("setDacFromIndex", &Detector::setDacFromIndex)
-
-            .def("getDbitPipeline", &Detector::getDbitPipeline)
-            .def("setDbitPipeline", &Detector::setDbitPipeline)
-            .def("getDbitPhase", &Detector::getDbitPhase)
-            .def("setDbitPhase", &Detector::setDbitPhase)
-            .def("getDbitClock", &Detector::getDbitClock)
-            .def("setDbitClock", &Detector::setDbitClock)
-
-            .def("setThresholdEnergy", &Detector::setThresholdEnergy)
-            .def("getThresholdEnergy", &Detector::getThresholdEnergy)
-
-            .def("getSettings", &Detector::getSettings)
-            .def("setSettings", &Detector::setSettings)
-            .def("getSettingsDir", &Detector::getSettingsDir)
-            .def("setSettingsDir", &Detector::setSettingsDir)
-
-            .def("loadTrimbitFile", &Detector::loadTrimbitFile)
-            .def("setTrimEnergies", &Detector::setTrimEnergies)
-            .def("getTrimEnergies", &Detector::getTrimEnergies)
-
-            .def("pulseChip", &Detector::pulseChip)
-            .def("pulseAllPixels", &Detector::pulseAllPixels)
-            .def("pulseDiagonal", &Detector::pulseDiagonal)
-            .def("getRunStatus", &Detector::getRunStatus)
-            .def("readConfigurationFile", &Detector::readConfigurationFile)
-            .def("readParametersFile", &Detector::readParametersFile)
-            .def("checkOnline", &Detector::checkOnline)
-            .def("setReadoutClockSpeed", &Detector::setReadoutClockSpeed)
-            .def("getReadoutClockSpeed", &Detector::getReadoutClockSpeed)
-            .def("getHostname", &Detector::getHostname)
-            .def("setHostname", &Detector::setHostname)
-
-            .def("getOnline", &Detector::getOnline)
-            .def("setOnline", &Detector::setOnline)
-            .def("getReceiverOnline", &Detector::getReceiverOnline)
-            .def("setReceiverOnline", &Detector::setReceiverOnline)
-
-            .def("getRxTcpport", &Detector::getRxTcpport)
-            .def("setRxTcpport", &Detector::setRxTcpport)
-
-            .def("isChipPowered", &Detector::isChipPowered)
-            .def("powerChip", &Detector::powerChip)
-
-            .def("readRegister", &Detector::readRegister)
-            .def("writeRegister", &Detector::writeRegister)
-            .def("writeAdcRegister", &Detector::writeAdcRegister)
-            .def("setBitInRegister", &Detector::setBitInRegister)
-            .def("clearBitInRegister", &Detector::clearBitInRegister)
-
-
-            .def("setDynamicRange", &Detector::setDynamicRange)
-            .def("getDynamicRange", &Detector::getDynamicRange)
-            .def("getFirmwareVersion", &Detector::getFirmwareVersion)
-            .def("getServerVersion", &Detector::getServerVersion)
-            .def("getClientVersion", &Detector::getClientVersion)
-            .def("getReceiverVersion", &Detector::getReceiverVersion)
-            .def("getDetectorNumber", &Detector::getDetectorNumber)
-            .def("getRateCorrection", &Detector::getRateCorrection)
-            .def("setRateCorrection", &Detector::setRateCorrection)
-
-            .def("startAcquisition", &Detector::startAcquisition)
-            .def("stopAcquisition", &Detector::stopAcquisition)
-            .def("startReceiver", &Detector::startReceiver)
-            .def("stopReceiver", &Detector::stopReceiver)
-
-            .def("getFilePath", (std::string (Detector::*)()) &Detector::getFilePath, "Using multiSlsDetector")
-            .def("getFilePath", (std::string (Detector::*)(const int)) &Detector::getFilePath, "File path for individual detector")
-            .def("setFilePath", (void (Detector::*)(std::string)) &Detector::setFilePath)
-            .def("setFilePath", (void (Detector::*)(std::string, const int)) &Detector::setFilePath)
-
-            .def("setFileName", &Detector::setFileName)
-            .def("getFileName", &Detector::getFileName)
-            .def("setFileIndex", &Detector::setFileIndex)
-            .def("getFileIndex", &Detector::getFileIndex)
-
-            .def("setExposureTime", &Detector::setExposureTime)
-            .def("getExposureTime", &Detector::getExposureTime)
-            .def("setSubExposureTime", &Detector::setSubExposureTime)
-            .def("getSubExposureTime", &Detector::getSubExposureTime)
-            .def("setPeriod", &Detector::setPeriod)
-            .def("getPeriod", &Detector::getPeriod)
+            .def(py::init<int>(), py::call_guard<py::gil_scoped_release>())
+            .def("freeSharedMemory", &Detector::freeSharedMemory, py::call_guard<py::gil_scoped_release>())
+            .def("getMultiDetectorId", &Detector::getMultiDetectorId, py::call_guard<py::gil_scoped_release>())
+            .def("acq", &Detector::acquire, py::call_guard<py::gil_scoped_release>())
+            .def("getAcquiringFlag", &Detector::getAcquiringFlag, py::call_guard<py::gil_scoped_release>())
+            .def("setAcquiringFlag", &Detector::setAcquiringFlag, py::call_guard<py::gil_scoped_release>())
+
+            .def("setAllTrimbits", &Detector::setAllTrimbits, py::call_guard<py::gil_scoped_release>())
+            .def("getAllTrimbits", &Detector::getAllTrimbits, py::call_guard<py::gil_scoped_release>())
+            .def("setCounterBit", &Detector::setCounterBit, py::call_guard<py::gil_scoped_release>())
+            .def("getCounterBit", &Detector::getCounterBit, py::call_guard<py::gil_scoped_release>())
+
+            .def("getAdc", &Detector::getAdc, py::call_guard<py::gil_scoped_release>())
+            .def("getAdcs", [](Detector &d, std::vector<std::string> adc_names){
+                std::vector<ssize_t> shape{static_cast<ssize_t>(adc_names.size()),
+                                           static_cast<ssize_t>(d.getNumberOfDetectors())};
+                py::array_t<double> data(shape);
+                auto ptr = data.mutable_data();
+                {
+                    py::gil_scoped_release release;
+                    d.getAdcs(adc_names, ptr);
+                }
+                return data;
+            }, "Read adcs for all modules into an array of shape [n_adcs, n_modules] in degree C")
+            .def("getDac", &Detector::getDac, py::call_guard<py::gil_scoped_release>())
+            .def("getDacs", [](Detector &d, std::vector<std::string> dac_names){
+                std::vector<ssize_t> shape{static_cast<ssize_t>(dac_names.size()),
+                                           static_cast<ssize_t>(d.getNumberOfDetectors())};
+                py::array_t<dacs_t> data(shape);
+                auto ptr = data.mutable_data();
+                {
+                    py::gil_scoped_release release;
+                    d.getDacs(dac_names, ptr);
+                }
+                return data;
+            }, "Read dacs for all modules into an array of shape [n_dacs, n_modules]")
+            .def("setDacs", [](Detector &d, std::vector<std::string> dac_names,
+                               py::array_t<dacs_t, py::array::c_style | py::array::forcecast> data){
+                if (data.ndim() != 2 ||
+                    data.shape(0) != static_cast<ssize_t>(dac_names.size()) ||
+                    data.shape(1) != static_cast<ssize_t>(d.getNumberOfDetectors()))
+                    throw std::runtime_error("setDacs expects an array of shape [n_dacs, n_modules]");
+                auto ptr = data.data();
+                py::gil_scoped_release release;
+                d.setDacs(dac_names, ptr);
+            }, "Set dacs for all modules from an array of shape [n_dacs, n_modules], negative values are skipped")
+            .def("getDac_mV", &Detector::getDac_mV, py::call_guard<py::gil_scoped_release>())
+            .def("setDac", &Detector::setDac, py::call_guard<py::gil_scoped_release>())
+            .def("setDac_mV", &Detector::setDac_mV, py::call_guard<py::gil_scoped_release>())
+            .def("getDacFromIndex", &Detector::getDacFromIndex, py::call_guard<py::gil_scoped_release>())
+            .def("setDacFromIndex", &Detector::setDacFromIndex, py::call_guard<py::gil_scoped_release>())
+
+            .def("getDbitPipeline", &Detector::getDbitPipeline, py::call_guard<py::gil_scoped_release>())
+            .def("setDbitPipeline", &Detector::setDbitPipeline, py::call_guard<py::gil_scoped_release>())
+            .def("getDbitPhase", &Detector::getDbitPhase, py::call_guard<py::gil_scoped_release>())
+            .def("setDbitPhase", &Detector::setDbitPhase, py::call_guard<py::gil_scoped_release>())
+            .def("getDbitClock", &Detector::getDbitClock, py::call_guard<py::gil_scoped_release>())
+            .def("setDbitClock", &Detector::setDbitClock, py::call_guard<py::gil_scoped_release>())
+
+            .def("setThresholdEnergy", &Detector::setThresholdEnergy, py::call_guard<py::gil_scoped_release>())
+            .def("getThresholdEnergy", &Detector::getThresholdEnergy, py::call_guard<py::gil_scoped_release>())
+
+            .def("getSettings", &Detector::getSettings, py::call_guard<py::gil_scoped_release>())
+            .def("setSettings", &Detector::setSettings, py::call_guard<py::gil_scoped_release>())
+            .def("getSettingsDir", &Detector::getSettingsDir, py::call_guard<py::gil_scoped_release>())
+            .def("setSettingsDir", &Detector::setSettingsDir, py::call_guard<py::gil_scoped_release>())
+
+            .def("loadTrimbitFile", &Detector::loadTrimbitFile, py::call_guard<py::gil_scoped_release>())
+            .def("getModuleShape", &Detector::getModuleShape, py::call_guard<py::gil_scoped_release>())
+            .def("getTrimbits", [](Detector &d, std::vector<int> mod_ids){
+                auto module_shape = d.getModuleShape();
+                std::vector<ssize_t> shape{static_cast<ssize_t>(mod_ids.size()),
+                                           module_shape.first, module_shape.second};
+                py::array_t<uint8_t> data(shape);
+                auto ptr = data.mutable_data();
+                {
+                    py::gil_scoped_release release;
+                    d.getTrimbits(mod_ids, ptr);
+                }
+                return data;
+            }, "Read trimbits into an array of shape [n_modules, nrows, ncols]")
+            .def("setTrimbits", [](Detector &d, std::vector<int> mod_ids,
+                                   py::array_t<uint8_t, py::array::c_style | py::array::forcecast> data){
+                auto module_shape = d.getModuleShape();
+                if (data.ndim() != 3 ||
+                    data.shape(0) != static_cast<ssize_t>(mod_ids.size()) ||
+                    data.shape(1) != module_shape.first ||
+                    data.shape(2) != module_shape.second)
+                    throw std::runtime_error("setTrimbits expects an array of shape [n_modules, nrows, ncols]");
+                auto ptr = data.data();
+                py::gil_scoped_release release;
+                d.setTrimbits(mod_ids, ptr);
+            }, "Write trimbits from an array of shape [n_modules, nrows, ncols]")
+            .def("setTrimEnergies", &Detector::setTrimEnergies, py::call_guard<py::gil_scoped_release>())
+            .def("getTrimEnergies", &Detector::getTrimEnergies, py::call_guard<py::gil_scoped_release>())
+
+            .def("pulseChip", &Detector::pulseChip, py::call_guard<py::gil_scoped_release>())
+            .def("pulseAllPixels", &Detector::pulseAllPixels, py::call_guard<py::gil_scoped_release>())
+            .def("pulseDiagonal", &Detector::pulseDiagonal, py::call_guard<py::gil_scoped_release>())
+            .def("getRunStatus", &Detector::getRunStatus, py::call_guard<py::gil_scoped_release>())
+            .def("readConfigurationFile", &Detector::readConfigurationFile, py::call_guard<py::gil_scoped_release>())
+            .def("readParametersFile", &Detector::readParametersFile, py::call_guard<py::gil_scoped_release>())
+            .def("checkOnline", &Detector::checkOnline, py::call_guard<py::gil_scoped_release>())
+            .def("setReadoutClockSpeed", &Detector::setReadoutClockSpeed, py::call_guard<py::gil_scoped_release>())
+            .def("getReadoutClockSpeed", &Detector::getReadoutClockSpeed, py::call_guard<py::gil_scoped_release>())
+            .def("getHostname", &Detector::getHostname, py::call_guard<py::gil_scoped_release>())
+            .def("setHostname", &Detector::setHostname, py::call_guard<py::gil_scoped_release>())
+
+            .def("getOnline", &Detector::getOnline, py::call_guard<py::gil_scoped_release>())
+            .def("setOnline", &Detector::setOnline, py::call_guard<py::gil_scoped_release>())
+            .def("getReceiverOnline", &Detector::getReceiverOnline, py::call_guard<py::gil_scoped_release>())
+            .def("setReceiverOnline", &Detector::setReceiverOnline, py::call_guard<py::gil_scoped_release>())
+
+            .def("getRxTcpport", &Detector::getRxTcpport, py::call_guard<py::gil_scoped_release>())
+            .def("setRxTcpport", &Detector::setRxTcpport, py::call_guard<py::gil_scoped_release>())
+
+            .def("isChipPowered", &Detector::isChipPowered, py::call_guard<py::gil_scoped_release>())
+            .def("powerChip", &Detector::powerChip, py::call_guard<py::gil_scoped_release>())
+
+            .def("readRegister", &Detector::readRegister, py::call_guard<py::gil_scoped_release>())
+            .def("writeRegister", &Detector::writeRegister, py::call_guard<py::gil_scoped_release>())
+            .def("writeAdcRegister", &Detector::writeAdcRegister, py::call_guard<py::gil_scoped_release>())
+            .def("setBitInRegister", &Detector::setBitInRegister, py::call_guard<py::gil_scoped_release>())
+            .def("clearBitInRegister", &Detector::clearBitInRegister, py::call_guard<py::gil_scoped_release>())
+
+
+            .def("setDynamicRange", &Detector::setDynamicRange, py::call_guard<py::gil_scoped_release>())
+            .def("getDynamicRange", &Detector::getDynamicRange, py::call_guard<py::gil_scoped_release>())
+            .def("getFirmwareVersion", &Detector::getFirmwareVersion, py::call_guard<py::gil_scoped_release>())
+            .def("getServerVersion", &Detector::getServerVersion, py::call_guard<py::gil_scoped_release>())
+            .def("getClientVersion", &Detector::getClientVersion, py::call_guard<py::gil_scoped_release>())
+            .def("getReceiverVersion", &Detector::getReceiverVersion, py::call_guard<py::gil_scoped_release>())
+            .def("getDetectorNumber", &Detector::getDetectorNumber, py::call_guard<py::gil_scoped_release>())
+            .def("getRateCorrection", &Detector::getRateCorrection, py::call_guard<py::gil_scoped_release>())
+            .def("setRateCorrection", &Detector::setRateCorrection, py::call_guard<py::gil_scoped_release>())
+
+            .def("startAcquisition", &Detector::startAcquisition, py::call_guard<py::gil_scoped_release>())
+            .def("stopAcquisition", &Detector::stopAcquisition, py::call_guard<py::gil_scoped_release>())
+            .def("startReceiver", &Detector::startReceiver, py::call_guard<py::gil_scoped_release>())
+            .def("stopReceiver", &Detector::stopReceiver, py::call_guard<py::gil_scoped_release>())
+
+            .def("getFilePath", (std::string (Detector::*)()) &Detector::getFilePath, "Using multiSlsDetector", py::call_guard<py::gil_scoped_release>())
+            .def("getFilePath", (std::string (Detector::*)(const int)) &Detector::getFilePath, "File path for individual detector", py::call_guard<py::gil_scoped_release>())
+            .def("setFilePath", (void (Detector::*)(std::string)) &Detector::setFilePath, py::call_guard<py::gil_scoped_release>())
+            .def("setFilePath", (void (Detector::*)(std::string, const int)) &Detector::setFilePath, py::call_guard<py::gil_scoped_release>())
+
+            .def("setFileName", &Detector::setFileName, py::call_guard<py::gil_scoped_release>())
+            .def("getFileName", &Detector::getFileName, py::call_guard<py::gil_scoped_release>())
+            .def("setFileIndex", &Detector::setFileIndex, py::call_guard<py::gil_scoped_release>())
+            .def("getFileIndex", &Detector::getFileIndex, py::call_guard<py::gil_scoped_release>())
+
+            .def("setExposureTime", &Detector::setExposureTime, py::call_guard<py::gil_scoped_release>())
+            .def("getExposureTime", &Detector::getExposureTime, py::call_guard<py::gil_scoped_release>())
+            .def("setSubExposureTime", &Detector::setSubExposureTime, py::call_guard<py::gil_scoped_release>())
+            .def("getSubExposureTime", &Detector::getSubExposureTime, py::call_guard<py::gil_scoped_release>())
+            .def("setPeriod", &Detector::setPeriod, py::call_guard<py::gil_scoped_release>())
+            .def("getPeriod", &Detector::getPeriod, py::call_guard<py::gil_scoped_release>())
             // .def("setSubPeriod", &Detector::setSubPeriod)
             // .def("getSubPeriod", &Detector::getSubPeriod)
 
-            .def("getCycles", &Detector::getCycles)
-            .def("setCycles", &Detector::setCycles)
-            .def("setNumberOfMeasurements", &Detector::setNumberOfMeasurements)
-            .def("getNumberOfMeasurements", &Detector::getNumberOfMeasurements)
-            .def("getNumberOfGates", &Detector::getNumberOfGates)
-            .def("setNumberOfGates", &Detector::setNumberOfGates)
-            .def("getDelay", &Detector::getDelay)
-            .def("setDelay", &Detector::setDelay)
-            .def("getJCTBSamples", &Detector::getJCTBSamples)
-            .def("setJCTBSamples", &Detector::setJCTBSamples)
-
-            .def("getTimingMode", &Detector::getTimingMode)
-            .def("setTimingMode", &Detector::setTimingMode)
-
-            .def("getDetectorType", &Detector::getDetectorType)
-
-            .def("setThresholdTemperature", &Detector::setThresholdTemperature)
-            .def("getThresholdTemperature", &Detector::getThresholdTemperature)
-            .def("setTemperatureControl", &Detector::setTemperatureControl)
-            .def("getTemperatureControl", &Detector::getTemperatureControl)
-            .def("getTemperatureEvent", &Detector::getTemperatureEvent)
-            .def("resetTemperatureEvent", &Detector::resetTemperatureEvent)
-
-            .def("getRxDataStreamStatus", &Detector::getRxDataStreamStatus)
-            .def("setRxDataStreamStatus", &Detector::setRxDataStreamStatus)
+            .def("getCycles", &Detector::getCycles, py::call_guard<py::gil_scoped_release>())
+            .def("setCycles", &Detector::setCycles, py::call_guard<py::gil_scoped_release>())
+            .def("setNumberOfMeasurements", &Detector::setNumberOfMeasurements, py::call_guard<py::gil_scoped_release>())
+            .def("getNumberOfMeasurements", &Detector::getNumberOfMeasurements, py::call_guard<py::gil_scoped_release>())
+            .def("getNumberOfGates", &Detector::getNumberOfGates, py::call_guard<py::gil_scoped_release>())
+            .def("setNumberOfGates", &Detector::setNumberOfGates, py::call_guard<py::gil_scoped_release>())
+            .def("getDelay", &Detector::getDelay, py::call_guard<py::gil_scoped_release>())
+            .def("setDelay", &Detector::setDelay, py::call_guard<py::gil_scoped_release>())
+            .def("getJCTBSamples", &Detector::getJCTBSamples, py::call_guard<py::gil_scoped_release>())
+            .def("setJCTBSamples", &Detector::setJCTBSamples, py::call_guard<py::gil_scoped_release>())
+
+            .def("getTimingMode", &Detector::getTimingMode, py::call_guard<py::gil_scoped_release>())
+            .def("setTimingMode", &Detector::setTimingMode, py::call_guard<py::gil_scoped_release>())
+
+            .def("getDetectorType", &Detector::getDetectorType, py::call_guard<py::gil_scoped_release>())
+
+            .def("setThresholdTemperature", &Detector::setThresholdTemperature, py::call_guard<py::gil_scoped_release>())
+            .def("getThresholdTemperature", &Detector::getThresholdTemperature, py::call_guard<py::gil_scoped_release>())
+            .def("setTemperatureControl", &Detector::setTemperatureControl, py::call_guard<py::gil_scoped_release>())
+            .def("getTemperatureControl", &Detector::getTemperatureControl, py::call_guard<py::gil_scoped_release>())
+            .def("getTemperatureEvent", &Detector::getTemperatureEvent, py::call_guard<py::gil_scoped_release>())
+            .def("resetTemperatureEvent", &Detector::resetTemperatureEvent, py::call_guard<py::gil_scoped_release>())
+
+            .def("getRxDataStreamStatus", &Detector::getRxDataStreamStatus, py::call_guard<py::gil_scoped_release>())
+            .def("setRxDataStreamStatus", &Detector::setRxDataStreamStatus, py::call_guard<py::gil_scoped_release>())
             
-            .def("getNetworkParameter", &Detector::getNetworkParameter)
-            .def("setNetworkParameter", &Detector::setNetworkParameter)
-            .def("configureNetworkParameters", &Detector::configureNetworkParameters)
-            .def("getDelayFrame", &Detector::getDelayFrame)
-            .def("setDelayFrame", &Detector::setDelayFrame)
-            .def("getDelayLeft", &Detector::getDelayLeft)
-            .def("setDelayLeft", &Detector::setDelayLeft)
-            .def("getDelayRight", &Detector::getDelayRight)
-            .def("setDelayRight", &Detector::setDelayRight)
-            .def("getLastClientIP", &Detector::getLastClientIP)
-            .def("getReceiverLastClientIP", &Detector::getReceiverLastClientIP)
+            .def("getNetworkParameter", &Detector::getNetworkParameter, py::call_guard<py::gil_scoped_release>())
+            .def("setNetworkParameter", &Detector::setNetworkParameter, py::call_guard<py::gil_scoped_release>())
+            .def("configureNetworkParameters", &Detector::configureNetworkParameters, py::call_guard<py::gil_scoped_release>())
+            .def("getDelayFrame", &Detector::getDelayFrame, py::call_guard<py::gil_scoped_release>())
+            .def("setDelayFrame", &Detector::setDelayFrame, py::call_guard<py::gil_scoped_release>())
+            .def("getDelayLeft", &Detector::getDelayLeft, py::call_guard<py::gil_scoped_release>())
+            .def("setDelayLeft", &Detector::setDelayLeft, py::call_guard<py::gil_scoped_release>())
+            .def("getDelayRight", &Detector::getDelayRight, py::call_guard<py::gil_scoped_release>())
+            .def("setDelayRight", &Detector::setDelayRight, py::call_guard<py::gil_scoped_release>())
+            .def("getLastClientIP", &Detector::getLastClientIP, py::call_guard<py::gil_scoped_release>())
+            .def("getReceiverLastClientIP", &Detector::getReceiverLastClientIP, py::call_guard<py::gil_scoped_release>())
             
-            .def("setReceiverFramesPerFile", &Detector::setReceiverFramesPerFile)
-            .def("getReceiverFramesPerFile", &Detector::getReceiverFramesPerFile)
+            .def("setReceiverFramesPerFile", &Detector::setReceiverFramesPerFile, py::call_guard<py::gil_scoped_release>())
+            .def("getReceiverFramesPerFile", &Detector::getReceiverFramesPerFile, py::call_guard<py::gil_scoped_release>())
 
 
-            .def("setFileWrite", &Detector::setFileWrite)
-            .def("getFileWrite", &Detector::getFileWrite)
-            .def("getDacVthreshold", &Detector::getDacVthreshold)
-            .def("setDacVthreshold", &Detector::setDacVthreshold)
-            .def("setNumberOfFrames", &Detector::setNumberOfFrames)
-            .def("getNumberOfFrames", &Detector::getNumberOfFrames)
+            .def("setFileWrite", &Detector::setFileWrite, py::call_guard<py::gil_scoped_release>())
+            .def("getFileWrite", &Detector::getFileWrite, py::call_guard<py::gil_scoped_release>())
+            .def("getDacVthreshold", &Detector::getDacVthreshold, py::call_guard<py::gil_scoped_release>())
+            .def("setDacVthreshold", &Detector::setDacVthreshold, py::call_guard<py::gil_scoped_release>())
+            .def("setNumberOfFrames", &Detector::setNumberOfFrames, py::call_guard<py::gil_scoped_release>())
+            .def("getNumberOfFrames", &Detector::getNumberOfFrames, py::call_guard<py::gil_scoped_release>())
 
             //Overloaded calls
-            .def("getFramesCaughtByReceiver", (int (Detector::*)()) &Detector::getFramesCaughtByReceiver)
-            .def("getFramesCaughtByReceiver", (int (Detector::*)(const int)) &Detector::getFramesCaughtByReceiver)
+            .def("getFramesCaughtByReceiver", (int (Detector::*)()) &Detector::getFramesCaughtByReceiver, py::call_guard<py::gil_scoped_release>())
+            .def("getFramesCaughtByReceiver", (int (Detector::*)(const int)) &Detector::getFramesCaughtByReceiver, py::call_guard<py::gil_scoped_release>())
 
 
-            .def("resetFramesCaught", &Detector::resetFramesCaught)
-            .def("getReceiverCurrentFrameIndex", &Detector::getReceiverCurrentFrameIndex)
-            .def("getGapPixels", &Detector::getGapPixels)
-            .def("setGapPixels", &Detector::setGapPixels)
+            .def("resetFramesCaught", &Detector::resetFramesCaught, py::call_guard<py::gil_scoped_release>())
+            .def("getReceiverCurrentFrameIndex", &Detector::getReceiverCurrentFrameIndex, py::call_guard<py::gil_scoped_release>())
+            .def("getGapPixels", &Detector::getGapPixels, py::call_guard<py::gil_scoped_release>())
+            .def("setGapPixels", &Detector::setGapPixels, py::call_guard<py::gil_scoped_release>())
 
-            .def("clearErrorMask", &Detector::clearErrorMask)
-            .def("getErrorMask", &Detector::getErrorMask)
-            .def("setErrorMask", &Detector::setErrorMask)
-            .def("getErrorMessage", &Detector::getErrorMessage)
+            .def("clearErrorMask", &Detector::clearErrorMask, py::call_guard<py::gil_scoped_release>())
+            .def("getErrorMask", &Detector::getErrorMask, py::call_guard<py::gil_scoped_release>())
+            .def("setErrorMask", &Detector::setErrorMask, py::call_guard<py::gil_scoped_release>())
+            .def("getErrorMessage", &Detector::getErrorMessage, py::call_guard<py::gil_scoped_release>())
 
 
-            .def("getFlippedDataX", &Detector::getFlippedDataX)
-            .def("getFlippedDataY", &Detector::getFlippedDataY)
-            .def("setFlippedDataX", &Detector::setFlippedDataX)
-            .def("setFlippedDataY", &Detector::setFlippedDataY)
+            .def("getFlippedDataX", &Detector::getFlippedDataX, py::call_guard<py::gil_scoped_release>())
+            .def("getFlippedDataY", &Detector::getFlippedDataY, py::call_guard<py::gil_scoped_release>())
+            .def("setFlippedDataX", &Detector::setFlippedDataX, py::call_guard<py::gil_scoped_release>())
+            .def("setFlippedDataY", &Detector::setFlippedDataY, py::call_guard<py::gil_scoped_release>())
 
-            .def("getServerLock", &Detector::getServerLock)
-            .def("setServerLock", &Detector::setServerLock)
-            .def("getReceiverLock", &Detector::getReceiverLock)
-            .def("setReceiverLock", &Detector::setReceiverLock)
+            .def("getServerLock", &Detector::getServerLock, py::call_guard<py::gil_scoped_release>())
+            .def("setServerLock", &Detector::setServerLock, py::call_guard<py::gil_scoped_release>())
+            .def("getReceiverLock", &Detector::getReceiverLock, py::call_guard<py::gil_scoped_release>())
+            .def("setReceiverLock", &Detector::setReceiverLock, py::call_guard<py::gil_scoped_release>())
 
-            .def("getReadoutFlags", &Detector::getReadoutFlags)
-            .def("setReadoutFlag", &Detector::setReadoutFlag)
+            .def("getReadoutFlags", &Detector::getReadoutFlags, py::call_guard<py::gil_scoped_release>())
+            .def("setReadoutFlag", &Detector::setReadoutFlag, py::call_guard<py::gil_scoped_release>())
 
 
 
-            .def("getFileFormat", &Detector::getFileFormat)
+            .def("getFileFormat", &Detector::getFileFormat, py::call_guard<py::gil_scoped_release>())
 
-            .def("getActive", &Detector::getActive)
-            .def("setActive", &Detector::setActive)
-            .def("getThreadedProcessing", &Detector::getThreadedProcessing)
-            .def("setThreadedProcessing", &Detector::setThreadedProcessing)
+            .def("getActive", &Detector::getActive, py::call_guard<py::gil_scoped_release>())
+            .def("setActive", &Detector::setActive, py::call_guard<py::gil_scoped_release>())
+            .def("getThreadedProcessing", &Detector::getThreadedProcessing, py::call_guard<py::gil_scoped_release>())
+            .def("setThreadedProcessing", &Detector::setThreadedProcessing, py::call_guard<py::gil_scoped_release>())
 
-            .def("getTenGigabitEthernet", &Detector::getTenGigabitEthernet)
-            .def("setTenGigabitEthernet", &Detector::setTenGigabitEthernet)
+            .def("getTenGigabitEthernet", &Detector::getTenGigabitEthernet, py::call_guard<py::gil_scoped_release>())
+            .def("setTenGigabitEthernet", &Detector::setTenGigabitEthernet, py::call_guard<py::gil_scoped_release>())
 
-            .def("getImageSize", &Detector::getImageSize)
-            .def("setImageSize", &Detector::setImageSize)
-            .def("getNumberOfDetectors", &Detector::getNumberOfDetectors)
-            .def("getDetectorGeometry", &Detector::getDetectorGeometry);
+            .def("getImageSize", &Detector::getImageSize, py::call_guard<py::gil_scoped_release>())
+            .def("setImageSize", &Detector::setImageSize, py::call_guard<py::gil_scoped_release>())
+            .def("getNumberOfDetectors", &Detector::getNumberOfDetectors, py::call_guard<py::gil_scoped_release>())
+            .def("getDetectorGeometry", &Detector::getDetectorGeometry, py::call_guard<py::gil_scoped_release>());
 
 
 
@@ -111,58 +111,54 @@ def test_set_dac_from_element_in_numpy_array_using_slice(mocker):
 def test_set_eiger_default(mocker):
     m2= mocker.patch.object(DetectorApi, 'getNumberOfDetectors', autospec=True)
     m2.return_value = 2
-    m = mocker.patch.object(DetectorApi, 'setDac', autospec=True)
-#    m.return_value = 1560
+    m3 = mocker.patch.object(DetectorApi, 'getDacs', autospec=True)
+    m3.return_value = np.zeros((17, 2), dtype=np.int32)
+    m = mocker.patch.object(DetectorApi, 'setDacs', autospec=True)
     d = Eiger()
     d.dacs.set_default()
-    calls = [call('vsvp', 0, 0),
-             call('vsvp', 1, 0),
-             call('vtr', 0, 2500),
-             call('vtr', 1, 2500),
-             call('vrf', 0, 3300),
-             call('vrf', 1, 3300),
-             call('vrs', 0, 1400),
-             call('vrs', 1, 1400),
-             call('vsvn', 0, 4000),
-             call('vsvn', 1, 4000),
-             call('vtgstv', 0, 2556),
-             call('vtgstv', 1, 2556),
-             call('vcmp_ll', 0, 1500),
-             call('vcmp_ll', 1, 1500),
-             call('vcmp_lr', 0, 1500),
-             call('vcmp_lr', 1, 1500),
-             call('vcall', 0, 4000),
-             call('vcall', 1, 4000),
-             call('vcmp_rl', 0, 1500),
-             call('vcmp_rl', 1, 1500),
-             call('rxb_rb', 0, 1100),
-             call('rxb_rb', 1, 1100),
-             call('rxb_lb', 0, 1100),
-             call('rxb_lb', 1, 1100),
-             call('vcmp_rr', 0, 1500),
-             call('vcmp_rr', 1, 1500),
-             call('vcp', 0, 200),
-             call('vcp', 1, 200),
-             call('vcn', 0, 2000),
-             call('vcn', 1, 2000),
-             call('vis', 0, 1550),
-             call('vis', 1, 1550),
-             call('iodelay', 0, 660),
-             call('iodelay', 1, 660)]
+    assert m.call_count == 1
+    names, values = m.call_args[0][1:]
+    # vsvp default is 0 and already set
+    assert names == d.dacs._dacnames[1:]
+    assert values.shape == (16, 2)
+    assert (values[:,0] == [2500, 3300, 1400, 4000, 2556, 1500, 1500, 4000,
+                            1500, 1100, 1100, 1500, 200, 2000, 1550, 660]).all()
 
-    m.assert_has_calls(calls)
-    assert m.call_count == 17*2
-    
 def test_set_eiger_set_from_array_call_count(mocker):
     import numpy as np
     m2= mocker.patch.object(DetectorApi, 'getNumberOfDetectors', autospec=True)
     m2.return_value = 3
-    m = mocker.patch.object(DetectorApi, 'setDac', autospec=True)
-#    m.return_value = 1560
+    m3 = mocker.patch.object(DetectorApi, 'getDacs', autospec=True)
+    m3.return_value = np.ones((17, 3), dtype=np.int32)
+    m = mocker.patch.object(DetectorApi, 'setDacs', autospec=True)
+    m4 = mocker.patch.object(DetectorApi, 'setDac', autospec=True)
     d = Eiger()
     d.dacs.set_from_array( np.zeros((17,3)))
-    assert m.call_count == 17*3
-    
+    assert m.call_count == 1
+    assert m4.call_count == 0
+
+def test_set_from_array_only_sends_changed_values(mocker):
+    m2= mocker.patch.object(DetectorApi, 'getNumberOfDetectors', autospec=True)
+    m2.return_value = 2
+    m = mocker.patch.object(DetectorApi, 'setDacs', autospec=True)
+    d = Eiger()
+    current = np.full((17, 2), 1000, dtype=np.int32)
+    new = current.copy()
+    new[2, 1] = 3300
+    d.dacs.set_from_array(new, current)
+    names, values = m.call_args[0][1:]
+    assert names == ['vrf']
+    assert values.tolist() == [[-1, 3300]]
+
+def test_set_from_array_nothing_changed(mocker):
+    m2= mocker.patch.object(DetectorApi, 'getNumberOfDetectors', autospec=True)
+    m2.return_value = 2
+    m = mocker.patch.object(DetectorApi, 'setDacs', autospec=True)
+    d = Eiger()
+    current = np.full((17, 2), 1000, dtype=np.int32)
+    d.dacs.set_from_array(current.copy(), current)
+    assert m.call_count == 0
+
 def test_get_fpga_temp(mocker):
     m2= mocker.patch.object(DetectorApi, 'getNumberOfDetectors', autospec=True)
     m2.return_value = 2
@@ -170,4 +166,29 @@ def test_get_fpga_temp(mocker):
     m.return_value = 34253
     d = Eiger()
     t = d.temp.fpga[:]
-    assert t == [34.253, 34.253]
\ No newline at end of file
+    assert t == [34.253, 34.253]
+
+def test_adcs_as_array_uses_single_call(mocker):
+    m2= mocker.patch.object(DetectorApi, 'getNumberOfDetectors', autospec=True)
+    m2.return_value = 2
+    m = mocker.patch.object(DetectorApi, 'getAdcs', autospec=True)
+    m.return_value = np.full((8, 2), 34.253)
+    m3 = mocker.patch.object(DetectorApi, 'getAdc', autospec=True)
+    d = Eiger()
+    a = d.temp.as_array()
+    m.assert_called_once_with(d._api, [adc.name for adc in d.temp])
+    assert m3.call_count == 0
+    assert a.shape == (8, 2)
+
+def test_get_asarray_uses_single_call(mocker):
+    m2= mocker.patch.object(DetectorApi, 'getNumberOfDetectors', autospec=True)
+    m2.return_value = 2
+    m = mocker.patch.object(DetectorApi, 'getDacs', autospec=True)
+    m.return_value = np.zeros((17, 2), dtype=np.int32)
+    m3 = mocker.patch.object(DetectorApi, 'getDac', autospec=True)
+    d = Eiger()
+    a = d.dacs.get_asarray()
+    m.assert_called_once_with(d._api, d.dacs._dacnames)
+    assert m3.call_count == 0
+    assert a.shape == (17, 2)
+    assert a.dtype == np.float64
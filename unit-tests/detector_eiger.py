@@ -486,4 +486,42 @@ def test_set_trimbits_raises_outside_range(d, mocker):
     with pytest.raises(ValueError):
         d.trimbits = -5
 
-
+def test_get_trimbits_array_all_modules(d, mocker):
+    m2 = mocker.patch('_sls_detector.DetectorApi.getNumberOfDetectors')
+    m2.return_value = 2
+    m = mocker.patch('_sls_detector.DetectorApi.getTrimbits')
+    d.get_trimbits()
+    m.assert_called_once_with([0, 1])
+
+def test_get_trimbits_array_single_module(d, mocker):
+    m = mocker.patch('_sls_detector.DetectorApi.getTrimbits')
+    d.get_trimbits(1)
+    m.assert_called_once_with([1])
+
+def test_set_trimbits_array_broadcasts_single_map(d, mocker):
+    import numpy as np
+    mocker.patch('_sls_detector.DetectorApi.getModuleShape').return_value = (256, 1024)
+    m = mocker.patch('_sls_detector.DetectorApi.setTrimbits')
+    d.set_trimbits(np.full((256, 1024), 32), [0, 3])
+    modules, tb = m.call_args[0]
+    assert modules == [0, 3]
+    assert tb.shape == (2, 256, 1024)
+    assert tb.dtype == np.uint8
+
+def test_set_trimbits_array_raises_outside_range(d, mocker):
+    import numpy as np
+    from sls_detector.errors import DetectorValueError
+    mocker.patch('_sls_detector.DetectorApi.getModuleShape').return_value = (256, 1024)
+    mocker.patch('_sls_detector.DetectorApi.setTrimbits')
+    with pytest.raises(DetectorValueError):
+        d.set_trimbits(np.full((1, 256, 1024), 64), 0)
+
+def test_set_trimbits_array_raises_on_wrong_shape(d, mocker):
+    import numpy as np
+    mocker.patch('_sls_detector.DetectorApi.getModuleShape').return_value = (256, 1024)
+    m = mocker.patch('_sls_detector.DetectorApi.setTrimbits')
+    with pytest.raises(ValueError):
+        d.set_trimbits(np.full((256, 512), 32), 0)
+    with pytest.raises(ValueError):
+        d.set_trimbits(np.full((1, 256, 1024), 32), [0, 1])
+    m.assert_not_called()
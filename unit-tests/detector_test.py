@@ -27,6 +27,27 @@ def test_acq_call(d, mocker):
     d.acq()
     m.assert_called_once_with()
 
+def test_start_and_wait(d, mocker):
+    m = mocker.patch('_sls_detector.DetectorApi.acq')
+    f = d.start()
+    d.wait()
+    assert f.done()
+    m.assert_called_once_with()
+
+def test_acq_async_reports_progress(d, mocker):
+    import asyncio
+    m = mocker.patch('_sls_detector.DetectorApi.acq')
+    m2 = mocker.patch('_sls_detector.DetectorApi.getReceiverCurrentFrameIndex')
+    m2.return_value = 9
+    m3 = mocker.patch('_sls_detector.DetectorApi.getFramesCaughtByReceiver')
+    m3.return_value = 10
+    loop = asyncio.new_event_loop()
+    p = loop.run_until_complete(d.acq_async(interval=0.01))
+    loop.close()
+    m.assert_called_once_with()
+    assert p.frame_index == 9
+    assert p.frames_caught == 10
+
 
 
 def test_busy_call(d, mocker):
@@ -470,3 +491,60 @@ def test_set_vthreshold(d, mocker):
 
 
 
+
+
+def test_cache_disabled_by_default(d, mocker):
+    m = mocker.patch('_sls_detector.DetectorApi.getHostname')
+    m.return_value = 'beb059+beb058+'
+    d.hostname
+    d.hostname
+    assert m.call_count == 2
+
+def test_cache_hit(d, mocker):
+    m = mocker.patch('_sls_detector.DetectorApi.getHostname')
+    m.return_value = 'beb059+beb058+'
+    d.cache.enabled = True
+    assert d.hostname == ['beb059', 'beb058']
+    assert d.hostname == ['beb059', 'beb058']
+    assert m.call_count == 1
+    assert d.cache.hits == 1
+    assert d.cache.misses == 1
+
+def test_cache_invalidated_by_setter(d, mocker):
+    m = mocker.patch('_sls_detector.DetectorApi.getImageSize')
+    m.return_value = (512, 1024)
+    mocker.patch('_sls_detector.DetectorApi.setImageSize')
+    d.cache.enabled = True
+    d.image_size
+    d.image_size = (256, 1024)
+    d.image_size
+    assert m.call_count == 2
+
+def test_cache_ttl(d, mocker):
+    m = mocker.patch('_sls_detector.DetectorApi.getNumberOfDetectors')
+    m.return_value = 2
+    d.cache.enabled = True
+    d.cache.ttl['n_modules'] = 0
+    d.n_modules
+    d.n_modules
+    assert m.call_count == 2
+
+
+def test_batch_checks_error_mask_once(d, mocker):
+    mocker.patch('_sls_detector.DetectorApi.setFileIndex')
+    mocker.patch('_sls_detector.DetectorApi.setFileName')
+    m = mocker.patch('_sls_detector.DetectorApi.getErrorMask')
+    m.return_value = 0
+    with d.batch():
+        d.file_index = 3
+        d.file_name = 'run'
+    assert m.call_count == 1
+
+def test_batch_raises_aggregated_error(d, mocker):
+    mocker.patch('_sls_detector.DetectorApi.setFileIndex')
+    with pytest.raises(DetectorError) as e:
+        with d.batch():
+            d.file_index = 3
+            d._api.setErrorMask(1)
+    assert 'file_index(3)' in str(e.value)
+    assert d.error_mask == 0
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testing the sls-detector command line tool and daemon using the simulated api
+"""
+import os
+import stat
+import threading
+import pytest
+
+from sls_detector import Eiger
+from sls_detector import cli
+from sls_detector.cli import DetectorServer, execute, main, send, socket_path
+from sls_detector.sim import SimulatedDetectorApi
+
+
+@pytest.fixture
+def d():
+    return Eiger(api=SimulatedDetectorApi(n_modules=2))
+
+@pytest.fixture
+def daemon(d, tmpdir):
+    """Serve d on a socket in a thread, returns the socket path"""
+    path = str(tmpdir.join('sls.sock'))
+    server = DetectorServer(path, d)
+    t = threading.Thread(target=server.serve_forever, args=(0.05,))
+    t.start()
+    yield path
+    server.shutdown()
+    server.server_close()
+    t.join()
+
+
+def test_get_and_set(d):
+    assert execute(d, 'set', ['exposure_time', '0.5']) == ''
+    assert execute(d, 'get', ['exposure_time']) == '0.5'
+    assert execute(d, 'get', ['n_modules', 'exposure_time']) == 'n_modules: 2\nexposure_time: 0.5'
+
+def test_dotted_names(d):
+    execute(d, 'set', ['dacs.vrf', '3000'])
+    assert d.dacs.vrf[:] == [3000, 3000]
+    assert execute(d, 'get', ['dacs.vrf']) == repr(d.dacs.vrf)
+
+def test_rejects_private_and_functions(d):
+    with pytest.raises(ValueError):
+        execute(d, 'get', ['_api'])
+    with pytest.raises(ValueError):
+        execute(d, 'get', ['acq'])
+    with pytest.raises(ValueError):
+        execute(d, 'set', ['no_such_property', '1'])
+
+def test_set_refuses_methods_and_read_only(d):
+    for name in ['acq', 'start', 'dacs', 'n_modules', 'dacs.get_asarray']:
+        with pytest.raises(ValueError):
+            execute(d, 'set', [name, '1'])
+    assert callable(d.acq)
+    assert callable(d.dacs.get_asarray)
+
+def test_dacs_and_status(d):
+    assert execute(d, 'dacs', []) == repr(d.dacs)
+    assert execute(d, 'status', []) == d.status
+
+def test_daemon(d, daemon):
+    send(daemon, 'set', ['n_frames', '10'])
+    assert d.n_frames == 10
+    assert send(daemon, 'get', ['n_frames']) == '10'
+    with pytest.raises(RuntimeError):
+        send(daemon, 'get', ['no_such_property'])
+
+def test_daemon_serializes_clients(d, daemon):
+    api = d._api
+    results = []
+
+    def client():
+        results.append(send(daemon, 'get', ['n_modules'], timeout=10))
+    threads = [threading.Thread(target=client) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == ['2'] * 8
+    assert api.calls['getNumberOfDetectors'] >= 8
+
+def test_main_uses_daemon(daemon, capsys):
+    assert main(['--socket', daemon, 'set', 'exposure_time', '2']) == 0
+    assert main(['--socket', daemon, 'get', 'exposure_time']) == 0
+    assert capsys.readouterr().out == '2.0\n'
+    assert main(['--socket', daemon, 'get', 'no_such_property']) == 1
+    assert 'sls-detector:' in capsys.readouterr().err
+
+def test_second_daemon_refused(d, daemon):
+    with pytest.raises(RuntimeError):
+        DetectorServer(daemon, d)
+
+def test_socket_in_private_dir(tmpdir, monkeypatch):
+    monkeypatch.delenv('SLS_DETECTOR_SOCKET', raising=False)
+    monkeypatch.delenv('XDG_RUNTIME_DIR', raising=False)
+    monkeypatch.setattr(cli.tempfile, 'tempdir', str(tmpdir))
+    path = socket_path(3)
+    assert os.path.basename(path) == 'sls_detector_3.sock'
+    assert stat.S_IMODE(os.stat(os.path.dirname(path)).st_mode) == 0o700
+
+    os.chmod(os.path.dirname(path), 0o777)
+    with pytest.raises(PermissionError):
+        socket_path(3)
+
+def test_socket_in_runtime_dir(tmpdir, monkeypatch):
+    monkeypatch.delenv('SLS_DETECTOR_SOCKET', raising=False)
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmpdir))
+    assert socket_path(1) == str(tmpdir.join('sls_detector_1.sock'))
+
+def test_send_refuses_socket_of_other_user(daemon, monkeypatch):
+    monkeypatch.setattr(cli.os, 'getuid', lambda: os.stat(daemon).st_uid + 1)
+    with pytest.raises(PermissionError):
+        send(daemon, 'get', ['n_frames'])
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testing the offline rate correction
+"""
+import pytest
+import numpy as np
+
+from sls_detector.corrections import rate_correct
+from sls_detector.utils import stream_regions
+
+
+def paralyzable(n, tau, t):
+    """Measured counts for true counts n"""
+    rate = n / t
+    return rate * np.exp(-rate * tau * 1e-9) * t
+
+
+def test_non_paralyzable():
+    m = np.array([[0., 1e2, 1e3, 5e3]])
+    t, tau = 1e-3, 100.
+    expected = m / (1 - m / t * tau * 1e-9)
+    assert rate_correct(m, tau, t, model='non-paralyzable') == pytest.approx(expected)
+
+def test_non_paralyzable_saturated_is_inf():
+    m = np.array([[5e5, 2e7]])
+    c = rate_correct(m, 100., 1e-3, model='non-paralyzable')
+    assert np.isinf(c[0, 1])
+
+def test_paralyzable_inverts_model():
+    n = np.linspace(0, 8e3, 1000).reshape(10, 100)
+    t, tau = 1e-3, 125.
+    c = rate_correct(paralyzable(n, tau, t), tau, t)
+    assert c == pytest.approx(n, rel=1e-6, abs=1e-6)
+
+def test_paralyzable_clips_above_maximum():
+    t, tau = 1e-3, 125.
+    m_max = t / (tau * 1e-9) / np.e
+    c = rate_correct(np.array([[m_max * 1.5]]), tau, t)
+    assert c[0, 0] == pytest.approx(m_max * 1.5 * np.e)
+
+def test_zero_tau_leaves_counts():
+    m = np.arange(12, dtype=np.uint32).reshape(3, 4)
+    assert (rate_correct(m, 0, 1e-3) == m).all()
+
+def test_in_place_and_chunked():
+    rng = np.random.RandomState(0)
+    frames = rng.uniform(0, 1e5, size=(5, 16, 32))
+    expected = rate_correct(frames, 125., 1e-3)
+    out = frames.copy()
+    result = rate_correct(out, 125., 1e-3, out=out, chunk_size=100)
+    assert result is out
+    assert out == pytest.approx(expected)
+
+def test_rejects_integer_out():
+    frames = np.ones((4, 4), dtype=np.uint16)
+    with pytest.raises(ValueError):
+        rate_correct(frames, 125., 1e-3, out=frames)
+
+def test_tau_per_module():
+    frames = np.full((3, 8, 16), 1e2)
+    geometry = (2, 2)
+    c = rate_correct(frames, [0, 100., 200., 0], 1e-3, model='non-paralyzable',
+                     geometry=geometry)
+    regions = stream_regions((8, 16), geometry, 4)
+    assert (c[:, regions[0][0], regions[0][1]] == 1e2).all()
+    assert c[0, regions[1][0], regions[1][1]] == pytest.approx(np.full((4, 8), 1e2 / 0.99))
+    assert c[2, regions[2][0], regions[2][1]] == pytest.approx(np.full((4, 8), 1e2 / 0.98))
+    with pytest.raises(ValueError):
+        rate_correct(frames, [100., 200.], 1e-3)
+
+def test_one_region_per_module():
+    regions = stream_regions((512, 2048), (2, 1), 2)
+    assert regions == [(slice(0, 512), slice(0, 1024)), (slice(0, 512), slice(1024, 2048))]
+    regions = stream_regions((1024, 1024), (1, 2), 2)
+    assert regions[1] == (slice(512, 1024), slice(0, 1024))
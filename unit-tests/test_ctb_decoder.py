@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testing the decoding of chip test board data
+"""
+import pytest
+import numpy as np
+
+from sls_detector import JungfrauCTB
+from sls_detector.ctb_decoder import CTBDecoder
+from sls_detector.sim import SimulatedDetectorApi
+
+
+def make_frames(n_frames, samples, n_adc, layout):
+    """Raw frames where adc value = 100*sample + column and word = sample"""
+    analog = (100 * np.arange(samples)[:, None] + np.arange(n_adc)).astype('<u2')
+    analog = np.broadcast_to(analog, (n_frames, samples, n_adc))
+    words = np.broadcast_to(np.arange(samples, dtype='<u8') * 0x0101, (n_frames, samples))
+    if layout == 'sample':
+        parts = [analog.view(np.uint8).reshape(n_frames, samples, -1),
+                 words.reshape(n_frames, samples, 1).view(np.uint8)]
+        return np.concatenate(parts, axis=2).tobytes()
+    parts = [analog.reshape(n_frames, -1).view(np.uint8), words.view(np.uint8)]
+    return np.concatenate(parts, axis=1).tobytes()
+
+
+@pytest.mark.parametrize('layout', ['sample', 'block'])
+def test_decode_frame(layout):
+    decoder = CTBDecoder(10, adc_mask=0b1011, layout=layout)
+    assert decoder.adcs == [0, 1, 3]
+    buffer = make_frames(1, 10, 3, layout)
+    assert len(buffer) == decoder.frame_size
+    data = decoder.decode(buffer)
+    assert data.analog.shape == (10, 3)
+    assert data.analog[4].tolist() == [400, 401, 402]
+    assert data.analog[:, decoder.column(3)].tolist() == list(range(2, 1002, 100))
+    assert data.words.tolist() == [0x0101 * i for i in range(10)]
+    assert data.digital.shape == (10, 64)
+    assert data.digital[5, :10].tolist() == [1, 0, 1, 0, 0, 0, 0, 0, 1, 0]
+
+def test_analog_is_a_view():
+    buffer = bytearray(make_frames(1, 4, 2, 'sample'))
+    data = CTBDecoder(4, adc_mask=0b11).decode(buffer)
+    buffer[0] = 7
+    assert data.analog[0, 0] == 7
+
+def test_decode_frames_and_selected_bits():
+    decoder = CTBDecoder(6, adc_mask=0xf, layout='block', bits=[8, 1])
+    data = decoder.decode_frames(make_frames(3, 6, 4, 'block'))
+    assert data.analog.shape == (3, 6, 4)
+    assert data.digital.shape == (3, 6, 2)
+    assert data.digital[2, 3].tolist() == [1, 1]
+
+def test_analog_only():
+    samples = np.arange(12, dtype='<u2')
+    data = CTBDecoder(3, adc_mask=0xf000, digital=False).decode(samples)
+    assert data.analog.tolist() == samples.reshape(3, 4).tolist()
+    assert data.digital is None and data.words is None
+
+def test_errors():
+    decoder = CTBDecoder(4, adc_mask=0b1)
+    with pytest.raises(ValueError):
+        decoder.decode(bytes(decoder.frame_size + 1))
+    with pytest.raises(ValueError):
+        decoder.decode_frames(bytes(decoder.frame_size * 2 + 1))
+    with pytest.raises(ValueError):
+        decoder.column(5)
+    with pytest.raises(ValueError):
+        CTBDecoder(4, bits=[64])
+
+def test_decoder_from_detector():
+    d = JungfrauCTB(api=SimulatedDetectorApi(detector_type='JungfrauCTB'))
+    d.samples = 100
+    decoder = d.decoder(adc_mask=0xff, digital=False)
+    assert decoder.frame_size == 100 * 8 * 2
@@ -74,3 +74,55 @@ def test_set_by_iter_single_val(p):
 
 def test_print_values(p):
     assert repr(p) == 'prop: [0, 1, 2, 3, 4]'
+
+
+@pytest.fixture
+def pc():
+    h = Holder(5)
+    return DetectorProperty(h.get, h.set, h.nmod, 'prop', max_workers=4)
+
+def test_concurrent_get_all_values(pc):
+    assert pc[:] == [0, 1, 2, 3, 4]
+
+def test_concurrent_set_all(pc):
+    pc[:] = 10
+    assert pc[:] == [10,10,10,10,10]
+
+def test_concurrent_set_by_iter(pc):
+    pc[[2,4]] = [18,23]
+    assert pc[:] == [0,1,18,3,23]
+
+def test_concurrent_set_by_iter_single_val(pc):
+    pc[[2,4]] = 9
+    assert pc[:] == [0,1,9,3,9]
+
+def test_change_max_workers(pc):
+    pc[:] = 3
+    pc.max_workers = None
+    assert pc[:] == [3]*5
+
+def test_set_calls_are_serial(pc):
+    import threading
+    threads = set()
+    set_value = pc.set
+
+    def record(i, v):
+        threads.add(threading.get_ident())
+        set_value(i, v)
+    pc.set = record
+    pc[:] = 7
+    assert threads == {threading.get_ident()}
+    assert pc[:] == [7]*5
+
+def test_pool_shut_down_with_property():
+    import gc
+    h = Holder(5)
+    prop = DetectorProperty(h.get, h.set, h.nmod, 'prop', max_workers=4)
+    assert prop[:] == [0, 1, 2, 3, 4]
+    threads = list(prop._pool._threads)
+    assert threads
+    del prop
+    gc.collect()
+    for t in threads:
+        t.join(1)
+        assert not t.is_alive()
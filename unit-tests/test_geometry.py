@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testing the client side insertion of gap pixels
+"""
+import pytest
+import numpy as np
+
+from sls_detector import Eiger, Jungfrau
+from sls_detector.geometry import GapPixelMap, insert_gap_pixels
+from sls_detector.sim import SimulatedDetectorApi
+
+
+@pytest.fixture
+def frame():
+    return np.arange(512 * 1024, dtype=np.uint32).reshape(512, 1024)
+
+
+def test_module_shape_and_chips(frame):
+    image = insert_gap_pixels(frame)
+    assert image.shape == (514, 1030)
+    assert image.dtype == np.uint32
+    assert (image[:256, :256] == frame[:256, :256]).all()
+    assert (image[:256, 258:514] == frame[:256, 256:512]).all()
+    assert (image[258:, 774:] == frame[256:, 768:]).all()
+
+def test_gaps_are_empty_without_split(frame):
+    image = insert_gap_pixels(frame)
+    assert (image[256:258] == 0).all()
+    assert (image[:, 256:258] == 0).all()
+    assert image.sum() == frame.sum()
+
+def test_split_conserves_counts():
+    frame = np.full((512, 1024), 4.)
+    image = insert_gap_pixels(frame, split=True)
+    assert image.sum() == pytest.approx(frame.sum())
+    assert image[0, 255] == image[0, 256] == image[0, 257] == image[0, 258] == 2
+    assert image[255:259, 255:259].tolist() == [[1, 1, 1, 1]] * 4
+    assert image[0, 255:259].tolist() == [2, 2, 2, 2]
+    assert image[100, 100] == 4
+
+@pytest.mark.parametrize('dtype', [np.uint16, np.uint32])
+def test_split_integer_frames(dtype):
+    frame = np.full((512, 1024), 4, dtype=dtype)
+    image = insert_gap_pixels(frame, split=True)
+    assert image.dtype == np.float64
+    assert image.sum() == pytest.approx(frame.sum())
+    assert image[0, 255:259].tolist() == [2, 2, 2, 2]
+    out = np.empty((514, 1030), dtype=np.float32)
+    assert insert_gap_pixels(frame, split=True, out=out) is out
+    assert out[255:259, 255:259].tolist() == [[1, 1, 1, 1]] * 4
+    with pytest.raises(ValueError):
+        insert_gap_pixels(frame, split=True, out=np.empty((514, 1030), dtype=dtype))
+
+@pytest.mark.parametrize('dtype', [np.uint16, np.uint32])
+def test_out_of_other_type(frame, dtype):
+    frame = frame.astype(dtype)
+    out = np.empty((514, 1030), dtype=np.float64)
+    insert_gap_pixels(frame, out=out)
+    assert (out == insert_gap_pixels(frame)).all()
+
+def test_stack_and_out(frame):
+    frames = np.stack([frame, frame * 2])
+    out = np.empty((2, 514, 1030), dtype=np.uint32)
+    result = insert_gap_pixels(frames, out=out)
+    assert result is out
+    assert (out[1] == 2 * insert_gap_pixels(frame)).all()
+    with pytest.raises(ValueError):
+        insert_gap_pixels(frames, out=out[0])
+
+def test_module_gap():
+    frames = np.ones((3, 1024, 1024), dtype=np.uint16)
+    image = insert_gap_pixels(frames, module_gap=(36, 8))
+    assert image.shape == (3, 514 * 2 + 36, 1030)
+    assert (image[:, 514:550] == 0).all()
+    assert image[0].sum() == 1024 * 1024
+
+def test_map_from_detector():
+    d = Eiger(api=SimulatedDetectorApi(n_modules=2))
+    m = GapPixelMap.from_detector(d)
+    assert m.shape == (514, 1030)
+
+def test_map_from_single_half_module():
+    d = Eiger(api=SimulatedDetectorApi(n_modules=1))
+    m = GapPixelMap.from_detector(d)
+    assert m.shape == (256, 1030)
+    image = m(np.ones((256, 1024), dtype=np.uint16))
+    assert image.sum() == 256 * 1024
+
+def test_map_from_jungfrau():
+    d = Jungfrau(api=SimulatedDetectorApi(n_modules=2, detector_type='Jungfrau'))
+    m = GapPixelMap.from_detector(d, module_gap=(36, 0))
+    assert m.shape == (2 * 514 + 36, 1030)
+
+def test_rejects_bad_geometry():
+    with pytest.raises(ValueError):
+        insert_gap_pixels(np.zeros((512, 1000)))
+    with pytest.raises(ValueError):
+        insert_gap_pixels(np.zeros((512, 1024)), module_size=(512, 1000))
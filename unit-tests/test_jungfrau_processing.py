@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testing the conversion of raw Jungfrau frames
+"""
+import pytest
+import numpy as np
+
+from sls_detector import jungfrau_processing
+from sls_detector.jungfrau_processing import JungfrauCalibration, decode_gain, decode_adc
+
+shape = (4, 6)
+
+
+def raw(gain_bits, adc):
+    return np.asarray((np.asarray(gain_bits) << 14) | np.asarray(adc), dtype=np.uint16)
+
+def reference(frames, pedestal, gain):
+    g = decode_gain(frames)
+    rows, cols = np.indices(shape)
+    return (decode_adc(frames) - pedestal[g, rows, cols]) / gain[g, rows, cols]
+
+@pytest.fixture
+def gain():
+    g = np.empty((3,) + shape)
+    g[0], g[1], g[2] = 40, 1.5, 0.1
+    g += np.arange(np.prod(shape)).reshape(shape) / 100
+    return g
+
+@pytest.fixture
+def pedestal():
+    p = np.empty((3,) + shape)
+    p[0], p[1], p[2] = 1000, 12000, 14000
+    return p
+
+
+def test_decode():
+    frames = raw([0, 1, 2, 3], [5, 0x3fff, 0, 100])
+    assert decode_gain(frames).tolist() == [0, 1, 2, 2]
+    assert decode_adc(frames).tolist() == [5, 0x3fff, 0, 100]
+
+@pytest.mark.parametrize('chunk_size', [1 << 16, 8, 5])
+def test_correct_mixed_gains(gain, pedestal, monkeypatch, chunk_size):
+    monkeypatch.setattr(jungfrau_processing, '_chunk_size', chunk_size)
+    rng = np.random.RandomState(0)
+    bits = np.zeros((10,) + shape, dtype=np.uint16)
+    bits[1] = 1
+    bits[2] = 3
+    bits[3:, 0, :3] = [1, 2, 3]
+    frames = raw(bits, rng.randint(0, 0x4000, bits.shape))
+    cal = JungfrauCalibration(gain, pedestal)
+    energy = cal.correct(frames)
+    assert energy.dtype == np.float32
+    assert np.allclose(energy, reference(frames, pedestal, gain), rtol=1e-5)
+
+def test_correct_into_out_with_threads(gain, pedestal):
+    frames = raw(0, np.full((7,) + shape, 1400))
+    cal = JungfrauCalibration(gain, pedestal)
+    out = np.empty(frames.shape, dtype=np.float32)
+    assert cal.correct(frames, out=out, n_threads=3) is out
+    assert np.allclose(out, reference(frames, pedestal, gain))
+    with pytest.raises(ValueError):
+        cal.correct(frames, out=np.empty(frames.shape))
+    with pytest.raises(TypeError):
+        cal.correct(frames.astype(np.int32))
+
+def test_pedestal_mean_then_running_average(gain):
+    cal = JungfrauCalibration(gain, alpha=0.25)
+    for value in [100, 200, 300, 400]:
+        cal.update_pedestal(raw(0, np.full(shape, value)))
+    assert np.allclose(cal.pedestal[0], 250)
+    assert (cal.n_dark[0] == 4).all()
+    cal.update_pedestal(raw(0, np.full(shape, 650)))
+    assert np.allclose(cal.pedestal[0], 350)
+    assert (cal.pedestal[1:] == 0).all()
+
+def test_pedestal_per_gain(gain):
+    cal = JungfrauCalibration(gain)
+    frames = raw([[[1]], [[3]], [[2]]], [[[10]], [[20]], [[40]]]) * np.ones(shape, dtype=np.uint16)
+    cal.update_pedestal(frames)
+    assert np.allclose(cal.pedestal[1], 10)
+    assert np.allclose(cal.pedestal[2], 30)
+    assert cal.n_dark.sum(axis=(1, 2)).tolist() == [0, 24, 48]
+    #pixels in G2 are corrected with the updated pedestal
+    energy = cal.correct(raw(3, np.full(shape, 30)))
+    assert np.allclose(energy, 0)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testing the parallel reader against the RawFileReader
+"""
+import glob
+import pytest
+import numpy as np
+
+from sls_detector.io import RawFileReader, ParallelRawReader
+from sls_detector.io.parallel import _shared_dir
+
+from test_raw_files import write_part, image_size
+
+
+def shared_files():
+    return glob.glob('{}/sls_detector_*'.format(_shared_dir() or '/tmp'))
+
+@pytest.fixture
+def reader(tmpdir):
+    write_part(tmpdir, 0, list(range(1, 21)), frames_per_file=6)
+    write_part(tmpdir, 1, list(range(1, 21)), frames_per_file=6)
+    write_part(tmpdir, 2, [n for n in range(1, 21) if n != 9], frames_per_file=6)
+    write_part(tmpdir, 3, list(range(1, 21)), frames_per_file=6)
+    return RawFileReader(str(tmpdir), 'run', (8, 12), geometry=(1, 2))
+
+@pytest.fixture
+def parallel(reader):
+    before = shared_files()
+    with ParallelRawReader(reader, max_workers=2) as p:
+        yield p
+    assert shared_files() == before
+
+
+def test_batches_in_order(reader, parallel):
+    numbers = []
+    for frame_numbers, images in parallel.batches(batch_size=3, start=1, prefetch=2):
+        assert (images == reader.read_frames(frame_numbers)).all()
+        numbers += frame_numbers.tolist()
+    assert numbers == list(range(2, 21))
+
+def test_missing_frame_is_zeroed_in_reused_buffer(reader, parallel):
+    batches = list(b.copy() for _, b in parallel.batches(batch_size=4, prefetch=0))
+    assert batches[2][0, 4:, :6].max() == 0
+    assert batches[2][1, 4:, :6].min() > 0
+
+def test_stop_early(parallel):
+    for frame_numbers, images in parallel.batches(batch_size=2):
+        break
+    assert frame_numbers.tolist() == [1, 2]
+
+def test_read(reader, parallel):
+    images = parallel.read(2, 17, chunk_size=4)
+    assert images.shape == (15,) + reader.image_size
+    assert (images == reader[2:17]).all()
+
+def test_read_larger_than_shared_memory(parallel, monkeypatch):
+    import os
+    from collections import namedtuple
+    statvfs = namedtuple('statvfs', ['f_bavail', 'f_frsize'])
+    monkeypatch.setattr(os, 'statvfs', lambda path: statvfs(2, 4096))
+    with pytest.raises(MemoryError):
+        parallel.read()
+    assert parallel.read(0, 2, chunk_size=2).shape == (2,) + parallel.reader.image_size
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testing the reader for the raw files written by the receiver
+"""
+import pytest
+import numpy as np
+
+from sls_detector import Jungfrau
+from sls_detector.io import RawFileReader
+from sls_detector.io.raw import header_dtype, raw_fname, find_raw_files
+from sls_detector.sim import SimulatedDetectorApi
+
+image_size = (8, 6)
+part_shape = (4, 6)
+
+
+def write_part(path, part, frame_numbers, frames_per_file=3, dtype=np.uint16, name='run'):
+    """Write frames with value frame_number * 10 + part, split in sub files"""
+    for sub, i in enumerate(range(0, len(frame_numbers), frames_per_file)):
+        numbers = frame_numbers[i:i+frames_per_file]
+        data = np.zeros(len(numbers), dtype=[('header', header_dtype),
+                                             ('data', dtype, part_shape)])
+        data['header']['frameNumber'] = numbers
+        data['header']['row'] = part
+        data['data'] = (np.array(numbers) * 10 + part)[:, None, None]
+        data['data'][:, 0, 0] = 1
+        data.tofile(raw_fname(str(path), name, part, sub, 0))
+
+@pytest.fixture
+def reader(tmpdir):
+    write_part(tmpdir, 0, list(range(1, 8)))
+    write_part(tmpdir, 1, [1, 2, 3, 5, 6, 7])
+    return RawFileReader(str(tmpdir), 'run', image_size, geometry=(1, 2))
+
+
+def test_find_files(tmpdir, reader):
+    files = find_raw_files(str(tmpdir), 'run')
+    assert [len(f) for f in files] == [3, 2]
+    assert files[0][1].endswith('run_d0_f1_0.raw')
+    with pytest.raises(FileNotFoundError):
+        find_raw_files(str(tmpdir), 'run', file_index=1)
+
+def test_index_and_random_access(reader):
+    assert len(reader) == 7
+    assert reader.frame_numbers.tolist() == list(range(1, 8))
+    image = reader[5]
+    assert image.shape == image_size
+    assert image[1, 1] == 60 and image[5, 1] == 61
+
+def test_missing_frame_in_part(reader):
+    images = reader.read_frames([4, 5])
+    assert images[0, :4, 1:].min() == 40
+    assert (images[0, 4:] == 0).all()
+    assert images[1, 5, 1] == 51
+    assert reader.headers(1, slice(2, 5))['frameNumber'].tolist() == [3, 0, 5]
+    with pytest.raises(KeyError):
+        reader.read_frames([9])
+
+def test_slice_into_out(reader):
+    out = np.empty((3,) + image_size, dtype=np.uint16)
+    reader._read(np.arange(4, 7), out)
+    assert out[:, 1, 1].tolist() == [50, 60, 70]
+    assert reader[-1][1, 1] == 70
+    assert reader[::3][:, 7, 1].tolist() == [11, 0, 71]
+    with pytest.raises(IndexError):
+        reader[7]
+
+def test_flipped_part(tmpdir):
+    write_part(tmpdir, 0, [1, 2])
+    write_part(tmpdir, 1, [1, 2])
+    f = RawFileReader(str(tmpdir), 'run', image_size, geometry=(1, 2),
+                      flipped=[(False, False), (True, False)])
+    image = f[0]
+    assert image[0, 0] == 1 and image[7, 0] == 1 and image[4, 0] == 11
+
+def test_4_bit_and_single_file_names(tmpdir):
+    packed = np.zeros(1, dtype=[('header', header_dtype), ('data', np.uint8, (12,))])
+    packed['header']['frameNumber'] = 1
+    packed['data'] = 0x21
+    packed.tofile(str(tmpdir.join('run_d0_0.raw')))
+    f = RawFileReader(str(tmpdir), 'run', part_shape, dynamic_range=4)
+    assert f[0].dtype == np.uint8
+    assert f[0][0, :4].tolist() == [1, 2, 1, 2]
+
+def test_from_detector(tmpdir):
+    d = Jungfrau(api=SimulatedDetectorApi(n_modules=1, detector_type='Jungfrau'))
+    d.file_path = str(tmpdir)
+    d.file_name = 'jf'
+    d.file_index = 1
+    data = np.zeros(2, dtype=[('header', header_dtype), ('data', np.uint16, (512 * 1024,))])
+    data['header']['frameNumber'] = [1, 2]
+    data['data'][1] = 5
+    data.tofile(raw_fname(str(tmpdir), 'jf', 0, 0, 0))
+    with RawFileReader.from_detector(d) as f:
+        assert f.image_size == (512, 1024)
+        assert f[1].sum() == 5 * 512 * 1024
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testing record and replay of DetectorApi traces using the simulated api
+"""
+import pytest
+import numpy as np
+
+from sls_detector import Eiger
+from sls_detector.replay import (ReplayApi, ReplayError, TraceWriter, read_trace,
+                                 replay)
+from sls_detector.sim import SimulatedDetectorApi
+
+
+@pytest.fixture
+def d():
+    return Eiger(api=SimulatedDetectorApi(n_modules=2))
+
+@pytest.fixture
+def recorded(d, tmpdir):
+    """Record a short session and return the file name"""
+    fname = str(tmpdir.join('session.trace'))
+    d.start_trace(record=fname)
+    d.exposure_time = 0.5
+    assert d.exposure_time == 0.5
+    d.dacs.vrf[1] = 3000
+    d.dacs.get_asarray()
+    with pytest.raises(RuntimeError):
+        d.active[7]
+    d.stop_trace()
+    return fname
+
+
+def test_values_round_trip(tmpdir):
+    fname = str(tmpdir.join('values.trace.gz'))
+    values = [None, True, -5, np.int64(7), 1.5, 'vrf', [1, 'a', (2.0, False)],
+              np.arange(6, dtype=np.int32).reshape(2, 3)]
+    w = TraceWriter(fname)
+    for v in values:
+        w.write('getValue', (v,), 0., 1e-3, v)
+    w.close()
+    calls = read_trace(fname)
+    assert [c.result for c in calls[:7]] == values[:7]
+    assert calls[2].args == (-5,)
+    assert (calls[7].result == values[7]).all()
+    assert calls[7].result.dtype == np.int32
+
+def test_unencodable_values_stored_as_repr(tmpdir):
+    fname = str(tmpdir.join('repr.trace'))
+    w = TraceWriter(fname)
+    w.write('getValue', (object(), 3), 0., 1e-3, {1: 2})
+    w.write('getValue', (1,), 0., 1e-3, 5)
+    w.close()
+    assert w.n_repr == 2
+    calls = read_trace(fname)
+    assert calls[0].args[0].startswith('<object object')
+    assert calls[0].args[1] == 3
+    assert calls[0].result == '{1: 2}'
+    assert calls[1].result == 5
+
+def test_recording_does_not_change_the_call(d, tmpdir):
+    class Broken:
+        def write(self, *args):
+            raise TypeError('Cannot store value in a trace')
+        def close(self):
+            pass
+    tracer = d.start_trace(record=str(tmpdir.join('broken.trace')))
+    tracer._writer.close()
+    tracer._writer = Broken()
+    d.exposure_time = 0.5
+    assert d.exposure_time == 0.5
+    with pytest.raises(RuntimeError):
+        d.active[7]
+    assert tracer.record_errors > 0
+    assert isinstance(tracer.last_record_error, TypeError)
+    d.stop_trace()
+
+def test_read_rejects_other_files(tmpdir):
+    fname = tmpdir.join('other.trace')
+    fname.write(b'not a trace')
+    with pytest.raises(ValueError):
+        read_trace(str(fname))
+
+def test_recorded_calls(recorded):
+    calls = read_trace(recorded)
+    names = [c.name for c in calls]
+    assert names.index('setExposureTime') < names.index('getDacs')
+    c = calls[names.index('setExposureTime')]
+    assert c.args == (500000000,)
+    assert c.duration >= 0
+    errors = [c for c in calls if c.error is not None]
+    assert errors[0].name == 'getActive'
+
+def test_replay_python_layer(recorded):
+    d = Eiger(api=ReplayApi(recorded))
+    assert d.exposure_time == 0.5
+    a = d.dacs.get_asarray()
+    assert a.shape == (17, 2)
+    assert a[2].tolist() == [3300, 3000]
+    with pytest.raises(RuntimeError):
+        d.active[7]
+
+def test_replay_counts_missing_functions(recorded):
+    api = ReplayApi(recorded)
+    assert api.getTemperatureEvent() is None
+    assert api.missing['getTemperatureEvent'] == 1
+
+def test_strict_replay_checks_order(recorded):
+    api = ReplayApi(recorded, strict=True)
+    first = read_trace(recorded)[0]
+    assert api.__getattr__(first.name)(*first.args) == first.result
+    with pytest.raises(ReplayError):
+        api.getDacs(['vrf'])
+
+def test_replay_into_simulated_detector(recorded):
+    api = SimulatedDetectorApi(n_modules=2)
+    elapsed, errors = replay(recorded, api, timing='recorded')
+    assert api.getExposureTime() == 500000000
+    assert api.getDac('vrf', 1) == 3000
+    assert [c.name for c, e in errors] == ['getActive']
+    assert elapsed >= read_trace(recorded)[-1].start
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testing scans using the simulated api and a stand in for the StreamReceiver
+"""
+import pytest
+import numpy as np
+
+from sls_detector import Eiger
+from sls_detector.scan import ScanPlan, run_scan
+from sls_detector.sim import SimulatedDetectorApi
+from sls_detector.stream import Frame
+
+
+class FakeReceiver:
+    """Sends n_frames frames filled with the point number, then the end"""
+    image_size = (4, 6)
+    dtype = np.uint16
+
+    def __init__(self, n_frames):
+        self.n_frames = n_frames
+        self.image = np.zeros(self.image_size, dtype=self.dtype)
+        self.point = 0
+        self.frame = 0
+
+    def read_frame(self, out=None):
+        if self.frame == self.n_frames:
+            self.point += 1
+            self.frame = 0
+            return None
+        if out is None:
+            out = self.image
+        out[:] = self.point + 1
+        self.frame += 1
+        return Frame(self.frame, out, [])
+
+
+@pytest.fixture
+def api():
+    return SimulatedDetectorApi(n_modules=2)
+
+@pytest.fixture
+def d(api):
+    return Eiger(api=api)
+
+
+def test_scan_sets_values_and_acquires(d, api):
+    values = []
+    plan = ScanPlan('vthreshold', range(1000, 1500, 100), frames=3)
+    result = run_scan(d, plan, callback=lambda i, v, data: values.append((i, v)))
+    assert values == list(enumerate(range(1000, 1500, 100)))
+    assert d.vthreshold == 1400
+    assert d.n_frames == 3
+    assert api.calls['acq'] == 5
+    assert result.data is None
+
+def test_dotted_parameter_and_file_name(d):
+    plan = ScanPlan('dacs.vrf', [2000, 2500], file_name='vrf_{value}')
+    run_scan(d, plan)
+    assert d.dacs.vrf[:] == [2500, 2500]
+    assert d.file_name == 'vrf_2500'
+
+def test_callable_parameter(d):
+    plan = ScanPlan(lambda det, v: setattr(det, 'exposure_time', v), [0.1, 0.2])
+    run_scan(d, plan)
+    assert d.exposure_time == 0.2
+
+def test_unknown_parameter(d):
+    with pytest.raises(ValueError):
+        run_scan(d, ScanPlan('no_such_property', [1]))
+
+def test_collect_sum(d):
+    plan = ScanPlan('exposure_time', [0.1, 0.2, 0.3], frames=4)
+    result = run_scan(d, plan, receiver=FakeReceiver(4))
+    assert result.data.shape == (3, 4, 6)
+    assert result.data[:, 0, 0].tolist() == [4, 8, 12]
+
+def test_collect_frames_into_out(d):
+    plan = ScanPlan('exposure_time', [0.1, 0.2], frames=2)
+    out = np.zeros((2, 2, 4, 6), dtype=np.uint16)
+    result = run_scan(d, plan, receiver=FakeReceiver(2), collect='frames', out=out)
+    assert result.data is out
+    assert out[1, 1].min() == 2
+    with pytest.raises(ValueError):
+        run_scan(d, plan, receiver=FakeReceiver(2), collect='frames', out=out[0])
+
+def test_timing(d):
+    plan = ScanPlan('vthreshold', [1000, 1200])
+    result = run_scan(d, plan, callback=lambda i, v, data: None)
+    assert [s.value for s in result.timing] == [1000, 1200]
+    assert all(s.configure >= 0 and s.acquire >= 0 and s.process >= 0 for s in result.timing)
+    assert result.elapsed >= sum(s.acquire for s in result.timing)
+    assert result.summary().splitlines()[-2].split()[0] == 'total'
+
+def test_error_in_callback_stops_scan(d, api):
+    def fail(i, v, data):
+        raise RuntimeError('processing failed')
+    with pytest.raises(RuntimeError):
+        run_scan(d, ScanPlan('vthreshold', range(10)), callback=fail)
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testing the detector classes against the simulated DetectorApi
+"""
+import os
+import re
+import sys
+import pytest
+import numpy as np
+
+from sls_detector import Detector, Eiger, Jungfrau, JungfrauCTB
+from sls_detector.errors import DetectorError
+from sls_detector.sim import SimulatedDetectorApi
+
+here = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture
+def api():
+    return SimulatedDetectorApi(n_modules=4)
+
+@pytest.fixture
+def d(api):
+    return Eiger(api=api)
+
+
+def test_implements_all_bound_functions():
+    with open(os.path.join(here, '..', 'src', 'main.cpp')) as f:
+        names = set(re.findall(r'^\s*\.def\("(\w+)"', f.read(), re.MULTILINE))
+    missing = [n for n in names if not hasattr(SimulatedDetectorApi, n)]
+    assert missing == []
+
+def test_eiger_geometry(d):
+    assert d.n_modules == 4
+    assert d.hostname == ['beb000', 'beb001', 'beb002', 'beb003']
+    assert d.image_size == (1024, 1024)
+    assert d.module_geometry == (1, 4)
+    assert d.detector_type == 'Eiger'
+
+def test_set_hostname_changes_modules(d):
+    d.hostname = ['beb083', 'beb098']
+    assert d.n_modules == 2
+    assert d.detector_number == [83, 98]
+    assert d.image_size == (512, 1024)
+
+def test_dacs_as_array(d, api):
+    d.dacs.vtr[2] = 1800
+    api.reset_calls()
+    a = d.dacs.get_asarray()
+    assert a.shape == (17, 4)
+    assert a.dtype == np.float64
+    assert a[1].tolist() == [2500, 2500, 1800, 2500]
+    assert api.calls['getDacs'] == 1
+
+def test_vthreshold_sets_all_vcmp(d):
+    d.vthreshold = 1200
+    assert d.vthreshold == 1200
+    assert d.dacs.vcmp_rr[:] == [1200] * 4
+
+def test_temperatures(d):
+    assert d.temp.fpga[:] == [40.0, 40.1, 40.2, 40.3]
+
+def test_adcs_as_array(d, api):
+    a = d.temp.as_array()
+    assert a.shape == (8, 4)
+    assert a[0].tolist() == d.temp.fpga[:]
+    assert a[1].tolist() == d.temp.fpgaext[:]
+    api.reset_calls()
+    repr(d.temp)
+    assert api.calls['getAdcs'] == 1
+    assert api.calls['getAdc'] == 0
+
+def test_trimbits_round_trip(d):
+    tb = np.random.randint(0, 64, size=(4, 256, 1024))
+    d.set_trimbits(tb)
+    assert (d.get_trimbits() == tb).all()
+    d.trimbits = 32
+    assert d.trimbits == 32
+
+def test_udp_ports_per_module(d):
+    d.rx_udpport = [50010, 50011, 50004, 50005, 50006, 50007, 50008, 50009]
+    assert d.rx_udpport[:4] == [50010, 50011, 50004, 50005]
+
+def test_injected_error_raises_once(d, api):
+    api.inject_error('getExposureTime', 'Could not read exptime')
+    with pytest.raises(DetectorError, match='Could not read exptime'):
+        d.exposure_time
+    d.exposure_time
+
+def test_bad_module_index_raises(d):
+    with pytest.raises(RuntimeError):
+        d.active[7]
+
+def test_latency_is_added_per_call(api):
+    api.latency = 0.01
+    d = Detector(api=api)
+    api.reset_calls()
+    d.exposure_time
+    assert sum(api.calls.values()) > 1
+
+def test_acq_counts_frames(d):
+    d.n_frames = 5
+    d.n_cycles = 2
+    d.acq()
+    assert d.frames_caught == 10
+    assert d.busy is False
+
+def test_start_thread_exits_after_acquisition(d):
+    import threading
+    import time
+    n_threads = threading.active_count()
+    for i in range(3):
+        d.start()
+        d.wait()
+    for i in range(100):
+        if threading.active_count() == n_threads:
+            break
+        time.sleep(0.01)
+    assert threading.active_count() == n_threads
+
+def test_acq_async_reads_progress_outside_the_loop(d, api):
+    import asyncio
+    import threading
+    threads = []
+    read = api.getReceiverCurrentFrameIndex
+
+    def frame_index():
+        threads.append(threading.get_ident())
+        return read()
+    api.getReceiverCurrentFrameIndex = frame_index
+    d.n_frames = 5
+    loop = asyncio.new_event_loop()
+    p = loop.run_until_complete(d.acq_async(interval=0.001, callback=lambda p: None))
+    loop.close()
+    assert p.frames_caught == 5
+    assert threads and threading.get_ident() not in threads
+
+def test_batch_only_covers_its_own_thread(d, api):
+    import threading
+    api.inject_error('setExposureTime')
+    errors = []
+
+    def other():
+        try:
+            d.exposure_time = 1
+        except DetectorError as e:
+            errors.append(e)
+    with d.batch():
+        d.n_frames = 3
+        t = threading.Thread(target=other)
+        t.start()
+        t.join(5)
+        assert not t.is_alive()
+    assert len(errors) == 1
+
+def test_batch_of_other_thread_waits(d):
+    import threading
+    order = []
+
+    def other():
+        with d.batch():
+            order.append('other')
+    with d.batch():
+        t = threading.Thread(target=other)
+        t.start()
+        t.join(0.1)
+        with d.batch():
+            order.append('nested')
+    t.join()
+    assert order == ['nested', 'other']
+
+def test_trimbits_of_numpy_module_index(d):
+    d.set_trimbits(np.full((256, 1024), 5), np.int64(1))
+    tb = d.get_trimbits(np.int64(1))
+    assert tb.shape == (1, 256, 1024)
+    assert (tb == 5).all()
+    assert d.get_trimbits(np.arange(2)).shape == (2, 256, 1024)
+
+def test_free_shared_memory_keeps_api(d, api):
+    d.free_shared_memory()
+    assert d._api is api
+    assert d.n_modules == 0
+
+def test_helper_objects_built_on_first_use(d, api):
+    assert '_dacs' not in vars(d)
+    assert '_temp' not in vars(d)
+    dacs = d.dacs
+    assert d.dacs is dacs
+    d.free_shared_memory()
+    assert '_dacs' not in vars(d)
+    assert d.dacs is not dacs
+
+def test_import_skips_detector_classes(monkeypatch):
+    if sys.version_info < (3, 7):
+        pytest.skip('lazy import requires Python 3.7')
+    for name in [m for m in sys.modules if m.startswith('sls_detector')]:
+        monkeypatch.delitem(sys.modules, name)
+    import sls_detector
+    assert 'sls_detector.eiger' not in sys.modules
+    assert sls_detector.Eiger.__module__ == 'sls_detector.eiger'
+
+def test_load_trimbit_file(d):
+    d.hostname = ['beb083', 'beb098']
+    d.load_trimbits(os.path.join(here, '..', 'simple-integration-tests', 'eiger',
+                                 'settingsdir', 'standard', '5000eV', 'noise'))
+    assert d.get_trimbits().shape == (2, 256, 1024)
+    assert d.dacs.vrf[:] == [500, 500]
+
+def test_jungfrau(api):
+    d = Jungfrau(api=SimulatedDetectorApi(n_modules=2, detector_type='Jungfrau'))
+    assert d.image_size == (1024, 1024)
+    assert d.dacs.get_asarray().shape == (8, 2)
+    d.temperature_threshold = 70
+    assert d.temperature_threshold == 70
+
+def test_ctb():
+    d = JungfrauCTB(api=SimulatedDetectorApi(n_modules=1, detector_type='JungfrauCTB'))
+    d.dacs.dac3 = 1000
+    assert d.dacs.dac3[0] == 1000
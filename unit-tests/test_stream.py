@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testing assembly of frames from the receiver zmq streams using fake
+detector and socket objects
+"""
+import json
+from collections import namedtuple
+import pytest
+import numpy as np
+
+from sls_detector import Detector, Jungfrau
+from sls_detector.sim import SimulatedDetectorApi
+from sls_detector.stream import StreamReceiver, FrameRingBuffer
+from sls_detector.stream.receiver import stream_regions
+
+Geometry = namedtuple('Geometry', ['horizontal', 'vertical'])
+
+class FakeApi:
+    def getNetworkParameter(self, name):
+        return ['30001', '30003']
+
+class FakeDetector:
+    """Holds the values that StreamReceiver reads from the detector"""
+    def __init__(self, dr=16):
+        self._api = FakeApi()
+        self.detector_type = 'Eiger'
+        self.rx_hostname = 'localhost'
+        self.image_size = (8, 8)
+        self.dynamic_range = dr
+        self.n_modules = 2
+        self.module_geometry = Geometry(1, 2)
+        self.flipped_data_x = [False, True]
+        self.flipped_data_y = [False, False]
+
+class FakeMessage:
+    def __init__(self, data):
+        self.bytes = data
+        self.buffer = memoryview(data)
+
+class FakeSocket:
+    def __init__(self, messages):
+        self.messages = messages
+    def recv_multipart(self, copy=True):
+        return [FakeMessage(m) for m in self.messages.pop(0)]
+
+def message(frame_number, data):
+    header = json.dumps({'data': 1, 'frameNumber': frame_number}).encode()
+    return [header, data.tobytes()]
+
+def end_message():
+    return [json.dumps({'data': 0}).encode(), b'']
+
+
+def test_regions_eiger_500k():
+    r = stream_regions((512, 1024), (1, 2), 4)
+    assert r[0] == (slice(0, 256), slice(0, 512))
+    assert r[1] == (slice(0, 256), slice(512, 1024))
+    assert r[2] == (slice(256, 512), slice(0, 512))
+    assert r[3] == (slice(256, 512), slice(512, 1024))
+
+def test_regions_raises_on_bad_geometry():
+    with pytest.raises(ValueError):
+        stream_regions((512, 1024), (1, 2), 3)
+
+def test_assemble_frame_with_flipped_module():
+    s = StreamReceiver(FakeDetector())
+    parts = [np.arange(16, dtype=np.uint16).reshape(4, 4) + 100 * i for i in range(4)]
+    s._sockets = [FakeSocket([message(7, p), end_message()]) for p in parts]
+    frame = s.read_frame()
+    assert frame.frame_number == 7
+    assert (frame.data[0:4, 0:4] == parts[0]).all()
+    assert (frame.data[0:4, 4:8] == parts[1]).all()
+    assert (frame.data[4:8, 0:4] == parts[2][::-1]).all()
+    assert (frame.data[4:8, 4:8] == parts[3][::-1]).all()
+    assert s.read_frame() is None
+
+def test_read_frame_discards_parts_of_older_frames():
+    s = StreamReceiver(FakeDetector())
+    p = np.ones((4, 4), dtype=np.uint16)
+    s._sockets = [FakeSocket([message(7, p * 7), message(8, p * 8)])]
+    s._sockets += [FakeSocket([message(8, p * 8)]) for i in range(3)]
+    frame = s.read_frame()
+    assert frame.frame_number == 8
+    assert (frame.data == 8).all()
+    assert s.discarded == 1
+
+def test_two_streams_per_eiger_module():
+    d = Detector(api=SimulatedDetectorApi(n_modules=2))
+    s = StreamReceiver(d)
+    assert s.ports == [30001, 30002, 30003, 30004]
+    assert s.regions == stream_regions((512, 1024), (1, 2), 4)
+    assert FrameRingBuffer.from_detector(d, 2).n_parts == 4
+
+def test_one_stream_per_jungfrau_module():
+    d = Jungfrau(api=SimulatedDetectorApi(n_modules=2, detector_type='Jungfrau'))
+    s = StreamReceiver(d)
+    assert s.ports == [30001, 30003]
+    assert len(s.regions) == 2
+
+def test_assemble_4bit_frame():
+    s = StreamReceiver(FakeDetector(dr=4))
+    packed = np.full(8, 0x21, dtype=np.uint8)
+    s._sockets = [FakeSocket([message(1, packed)]) for i in range(4)]
+    frame = s.read_frame()
+    assert frame.data.dtype == np.uint8
+    assert (frame.data[0, 0:4] == [1, 2, 1, 2]).all()
+
+def test_iterate_until_end():
+    s = StreamReceiver(FakeDetector())
+    p = np.zeros((4, 4), dtype=np.uint16)
+    s._sockets = [FakeSocket([message(0, p), message(1, p), end_message()])
+                  for i in range(4)]
+    assert [f.frame_number for f in s] == [0, 1]
+
+
+def test_ring_buffer_from_detector():
+    ring = FrameRingBuffer.from_detector(FakeDetector(dr=32), 5)
+    assert ring.frames.shape == (5, 8, 8)
+    assert ring.frames.dtype == np.uint32
+    assert ring.n_parts == 4
+    assert ring.parts_per_module == 2
+
+def test_fill_ring_buffer_from_stream():
+    d = FakeDetector()
+    s = StreamReceiver(d)
+    ring = FrameRingBuffer.from_detector(d, 3)
+    p = np.ones((4, 4), dtype=np.uint16)
+    s._sockets = [FakeSocket([message(fn, p*fn) for fn in range(1, 6)] + [end_message()])
+                  for i in range(4)]
+    s.fill(ring)
+    fn, frame = ring.latest()
+    assert fn == 5
+    assert (frame == 5).all()
+    assert ring.get(2) is None
+    assert ring.stats().frames_complete == 5
+
+def test_ring_buffer_counts_missing_and_late_parts():
+    ring = FrameRingBuffer(2, (4, 4), np.uint16, 2)
+    for fn in range(3):
+        ring.claim(fn, 0)
+        ring.commit(fn, 0)
+    # part 1 of frame 0 arrives after the slot was reused
+    assert ring.claim(0, 1) is None
+    stats = ring.stats()
+    assert stats.frames_incomplete == 1
+    assert stats.missing.tolist() == [0, 1]
+    assert stats.late.tolist() == [0, 1]
+    assert ring.latest() is None
+
+def test_reader_reports_overruns():
+    ring = FrameRingBuffer(4, (2, 2), np.uint8, 1)
+    reader = ring.reader()
+    assert reader.read() is None
+    for fn in range(10):
+        ring.claim(fn, 0)[:] = fn
+        ring.commit(fn, 0)
+        if fn == 1:
+            assert [f[0] for f in reader] == [0, 1]
+    assert [f[0] for f in reader] == [6, 7, 8, 9]
+    assert reader.overruns == 4
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testing the TelemetrySampler using the simulated api
+"""
+import time
+import pytest
+import numpy as np
+
+from sls_detector import Eiger, Jungfrau
+from sls_detector.sim import SimulatedDetectorApi
+from sls_detector.telemetry import TelemetrySampler
+
+
+@pytest.fixture
+def api():
+    return SimulatedDetectorApi(n_modules=2)
+
+@pytest.fixture
+def d(api):
+    return Eiger(api=api)
+
+
+def test_sample_shape_and_units(d):
+    s = TelemetrySampler(d)
+    values = s.sample()
+    assert s.names[0] == 'fpga'
+    assert values.shape == (8, 2)
+    assert values[0].tolist() == d.temp.fpga[:]
+    t, data = s.data()
+    assert data.shape == (1, 8, 2)
+
+def test_ring_buffer_wraps_in_order(d, api):
+    s = TelemetrySampler(d, size=3, adcs=['fpga'])
+    for i in range(5):
+        api._module(0).adcs['temp_fpga'] = 1000 * i
+        s.sample()
+    t, data = s.data()
+    assert len(s) == 3
+    assert data[:, 0, 0].tolist() == [2., 3., 4.]
+    assert (np.diff(t) >= 0).all()
+
+def test_limit_called_once_per_crossing(d, api):
+    s = TelemetrySampler(d, adcs=['fpga', 'dcdc'])
+    events = []
+    s.add_limit('dcdc', events.append, high=60)
+    for value in [50000, 65000, 70000, 55000, 61000]:
+        api._module(1).adcs['temp_dcdc'] = value
+        s.sample()
+    assert [(e.name, e.module, e.value) for e in events] == [('dcdc', 1, 65.), ('dcdc', 1, 61.)]
+    with pytest.raises(ValueError):
+        s.add_limit('sodl', events.append, high=60)
+
+def test_downsample(d):
+    s = TelemetrySampler(d, adcs=['fpga'])
+    for i in range(6):
+        s.sample()
+    t, data = s.data()
+    s._time[:6] = t[0] + np.arange(6)
+    s._values[:6, 0, 0] = [1, 2, 3, 4, 5, 6]
+    t, low, high, mean = s.downsample(2)
+    assert len(t) == 3
+    assert low[:, 0, 0].tolist() == [1, 3, 5]
+    assert high[:, 0, 0].tolist() == [2, 4, 6]
+    assert mean[:, 0, 0].tolist() == [1.5, 3.5, 5.5]
+
+def test_errors_are_counted(d, api):
+    s = TelemetrySampler(d, interval=0.01)
+    api.inject_error('getAdcs', count=1)
+    s.start()
+    time.sleep(0.1)
+    s.stop()
+    assert not s.running
+    assert s.errors == 1
+    assert len(s) > 1
+
+def test_jungfrau_temperature_event():
+    api = SimulatedDetectorApi(n_modules=1, detector_type='Jungfrau')
+    d = Jungfrau(api=api)
+    d.temperature_threshold = 65
+    s = TelemetrySampler(d)
+    calls = []
+    s.on_temperature_event(lambda t, threshold: calls.append(threshold))
+    s.sample()
+    api._temperature['event'] = True
+    s.sample()
+    s.sample()
+    t, event, threshold = s.temperature_events()
+    assert event.tolist() == [False, True, True]
+    assert threshold.tolist() == [65, 65, 65]
+    assert calls == [65]
+
+def test_eiger_has_no_temperature_event(d):
+    s = TelemetrySampler(d)
+    with pytest.raises(TypeError):
+        s.on_temperature_event(print)
+
+def test_construction_does_not_query_temperature_event():
+    api = SimulatedDetectorApi(n_modules=1, detector_type='Jungfrau')
+    d = Jungfrau(api=api)
+    api.reset_calls()
+    TelemetrySampler(d)
+    assert api.calls['getTemperatureEvent'] == 0
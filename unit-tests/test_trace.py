@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testing the tracing of DetectorApi calls using the simulated api
+"""
+import json
+import pytest
+
+from sls_detector import Eiger
+from sls_detector.sim import SimulatedDetectorApi
+from sls_detector.trace import ApiTracer, LatencyHistogram
+
+
+@pytest.fixture
+def d():
+    return Eiger(api=SimulatedDetectorApi(n_modules=2))
+
+
+def test_start_and_stop_trace(d):
+    api = d._api
+    t = d.start_trace()
+    assert isinstance(d._api, ApiTracer)
+    assert d.start_trace() is t
+    assert d.stop_trace() is t
+    assert d._api is api
+    assert d.stop_trace() is None
+
+def test_records_calls_with_module_index(d):
+    t = d.start_trace()
+    d.dacs.vtr[1] = 1700
+    c = [c for c in t.calls if c.name == 'setDac'][0]
+    assert c.module == 1
+    assert c.args == ('vtr', 1, 1700)
+    assert c.duration >= 0
+
+def test_attributes_calls_to_property(d):
+    t = d.start_trace()
+    d.exposure_time
+    assert {c.caller for c in t.calls} == {'Eiger.exposure_time'}
+
+def test_attributes_detector_property_with_name(d):
+    t = d.start_trace()
+    d.active[:]
+    assert 'DetectorProperty(active).__getitem__' in t.callers
+
+def test_histograms(d):
+    t = d.start_trace()
+    for i in range(10):
+        d.n_frames
+    h = t.histograms['getNumberOfFrames']
+    assert h.count == 10
+    assert 0 < h.percentile(50) <= h.percentile(99) <= h.max
+
+def test_percentile_accuracy():
+    h = LatencyHistogram()
+    for i in range(1, 101):
+        h.add(i * 1e-3)
+    assert h.percentile(50) == pytest.approx(50e-3, rel=0.1)
+    assert h.percentile(99) == pytest.approx(99e-3, rel=0.1)
+    assert h.percentile(100) == pytest.approx(0.1)
+
+def test_summary_table(d):
+    t = d.start_trace()
+    repr(d.dacs)
+    lines = t.summary().splitlines()
+    assert lines[0].split()[0] == 'function'
+    assert 'getDac' in [line.split()[0] for line in lines[1:]]
+    assert 'EigerDacs.__repr__' in t.summary(by='caller')
+    with pytest.raises(ValueError):
+        t.summary(by='module')
+
+def test_chrome_trace(d, tmpdir):
+    t = d.start_trace(maxlen=5)
+    for i in range(10):
+        d.n_frames
+    fname = str(tmpdir.join('trace.json'))
+    t.to_chrome_trace(fname)
+    with open(fname) as f:
+        events = json.load(f)['traceEvents']
+    assert len(events) == 5
+    assert events[0]['ph'] == 'X'
+    assert events[0]['name'] == 'getNumberOfFrames'
+
+def test_free_shared_memory_keeps_tracing(d):
+    t = d.start_trace()
+    d.free_shared_memory()
+    assert d._api is t
+    assert d.n_modules == 0
+
+def test_trace_keeps_running_acquisition():
+    api = SimulatedDetectorApi(n_modules=2, time_scale=1)
+    d = Eiger(api=api)
+    d.exposure_time = 0.1
+    d.n_frames = 2
+    f = d.start()
+    api.reset_calls()
+    d.start_trace()
+    assert d._acq_future is f
+    d.wait()
+    assert f.done()
+    d.stop_trace()
+    assert api.calls['setOnline'] == 0
+    assert api.calls['setReceiverOnline'] == 0
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testing reading and writing of Eiger trimbit files
+"""
+import os
+import pytest
+import numpy as np
+
+from sls_detector.io.trimbits import (read_trimbit_file, write_trimbit_file,
+                                      load_trimbits, interpolate_trimbits,
+                                      trimbit_fname)
+
+settings_path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             '..', 'simple-integration-tests', 'eiger', 'settingsdir')
+
+
+def test_trimbit_fname():
+    assert trimbit_fname('/sdir', 'standard', 5000, 83) == os.path.join('/sdir', 'standard',
+                                                                        '5000eV', 'noise.sn083')
+
+def test_read_trimbit_file():
+    dacs, tb = read_trimbit_file(trimbit_fname(settings_path, 'standard', 6000, 83))
+    assert dacs.tolist() == [0, 4000, 1000, 1400, 4000, 2556, 1400, 1500, 4000,
+                             1500, 1100, 1100, 1500, 1500, 2000, 1550, 660, 0]
+    assert tb.shape == (256, 1024)
+
+def test_write_and_read_back(tmpdir):
+    fname = str(tmpdir.join('noise.sn001'))
+    tb = np.random.randint(0, 64, (256, 1024))
+    dacs = np.arange(18)
+    write_trimbit_file(fname, tb, dacs)
+    assert os.path.getsize(fname) == 1048648
+    d, t = read_trimbit_file(fname)
+    assert (d == dacs).all()
+    assert (t == tb).all()
+
+def test_write_raises_on_wrong_shape(tmpdir):
+    with pytest.raises(ValueError):
+        write_trimbit_file(str(tmpdir.join('x')), np.zeros((256, 512)), np.zeros(18))
+
+def test_load_all_energies_and_modules():
+    dacs, tb = load_trimbits(settings_path, [83, 98], [5000, 6000, 7000])
+    assert dacs.shape == (3, 2, 18)
+    assert tb.shape == (3, 2, 256, 1024)
+    assert dacs[:, 1, 2].tolist() == [500, 1000, 1500]
+
+def test_interpolate_between_energies():
+    dacs, tb = load_trimbits(settings_path, [83, 98], [5000, 6000, 7000])
+    d, t = interpolate_trimbits(6500, [5000, 6000, 7000], dacs, tb)
+    assert d[:, 2].tolist() == [1250, 1250]
+    assert t.shape == (2, 256, 1024)
+
+def test_interpolate_outside_range_raises():
+    dacs, tb = load_trimbits(settings_path, [83], [5000, 6000])
+    with pytest.raises(ValueError):
+        interpolate_trimbits(8000, [5000, 6000], dacs, tb)